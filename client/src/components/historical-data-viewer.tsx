@@ -21,7 +21,7 @@ interface HistoricalStock {
   low_price: number;
   close_price: number;
   volume: number;
-  market_cap: string;
+  market_cap: number;
   best_k_value?: number;
 }
 
@@ -63,14 +63,13 @@ export function HistoricalDataViewer() {
     return volume.toString();
   };
 
-  const formatMarketCap = (marketCap: string) => {
-    const value = parseFloat(marketCap);
-    if (value >= 1000000000000) {
-      return `${(value / 1000000000000).toFixed(1)}조`;
-    } else if (value >= 100000000) {
-      return `${(value / 100000000).toFixed(1)}억`;
+  const formatMarketCap = (marketCap: number) => {
+    if (marketCap >= 1000000000000) {
+      return `${(marketCap / 1000000000000).toFixed(1)}조`;
+    } else if (marketCap >= 100000000) {
+      return `${(marketCap / 100000000).toFixed(1)}억`;
     }
-    return marketCap;
+    return marketCap.toLocaleString();
   };
 
   const getRankBadgeColor = (rank: number) => {
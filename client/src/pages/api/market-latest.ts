@@ -23,7 +23,7 @@ export default async function handler(
         date
       FROM daily_market_cap
       WHERE date = (SELECT MAX(date) FROM daily_market_cap)
-      ORDER BY market_cap::numeric DESC
+      ORDER BY market_cap DESC
     `);
 
     return res.status(200).json({
@@ -5,6 +5,8 @@ import {
   dataCollectionRequest,
   stockDataResponse,
   quickStatsResponse,
+  type StockMarket,
+  type StockRankType,
 } from "@shared/schema";
 import { spawn } from "child_process";
 import path from "path";
@@ -184,8 +186,8 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
       if (date && market && rank_type) {
         const result = await storage.getDailyStockDataByMarketAndRank(
-          market as string,
-          rank_type as string,
+          market as StockMarket,
+          rank_type as StockRankType,
           date as string,
         );
         return res.json(result);
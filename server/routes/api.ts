@@ -1,6 +1,8 @@
 // ✅ server/routes/api.ts
 import { Router } from "express";
 import { spawn } from "child_process";
+import fs from "fs";
+import path from "path";
 import pg from "pg"; // ✅ PostgreSQL 연결 추가
 
 const { Pool } = pg;
@@ -176,7 +178,7 @@ router.post("/calculate-best-k", async (req, res) => {
       });
     }
 
-    const { period, startDate, endDate, market = "ALL" } = req.body;
+    const { period, startDate, endDate, market = "ALL", mode, trainDays, testDays } = req.body;
 
     if (!period) {
       return res.status(400).json({
@@ -213,6 +215,10 @@ router.post("/calculate-best-k", async (req, res) => {
       startDate: calculatedStart,
       endDate: calculatedEnd,
       market: market === "ALL" ? null : market,
+      // mode: "walk_forward" 이면 표본 외 평가만 (trainDays/testDays 거래일)
+      mode,
+      trainDays,
+      testDays,
     };
 
     const result = await runBestKPython(inputData);
@@ -365,82 +371,50 @@ router.get("/best-k-status", async (_req, res) => {
 // ✅ 수집 상태 확인 API (단계별 의존성 체크 개선)
 router.get("/collection-status", async (_req, res) => {
   try {
-    const client = await pool.connect();
-
     const today = new Date();
     today.setHours(0, 0, 0, 0);
-
-    // 시가총액 수집 완료 여부 및 날짜 (조건 완화)
-    const { rows: capRows } = await client.query(`
-      SELECT MAX(date) AS date, COUNT(*) as count 
-      FROM daily_market_cap 
-      WHERE market_cap IS NOT NULL AND market_cap > 0
-    `);
-
-    const marketCapDate: Date | null = capRows[0]?.date || null;
-    const marketCapCount = parseInt(capRows[0]?.count || "0");
-
-    // 조건 완화: 오늘 데이터가 있고 50개 이상이면 완료로 인정
-    const marketCapDone =
-      marketCapDate &&
-      new Date(marketCapDate).toDateString() === today.toDateString() &&
-      marketCapCount >= 50; // 100개 → 50개로 완화
-
-    console.log(
-      `🔍 시가총액 상태 체크: 날짜=${marketCapDate}, 개수=${marketCapCount}, 완료=${marketCapDone}`,
-    );
-
-    // OHLCV 수집 완료 여부 및 날짜
-    let ohlcvDone = false;
-    let ohlcvDate: Date | null = null;
-
-    if (marketCapDone) {
-      const { rows: ohlcvRows } = await client.query(
-        `
-        SELECT MAX(ds.date) AS date, COUNT(DISTINCT ds.ticker) as ticker_count
-        FROM daily_stock_data ds
-        INNER JOIN daily_market_cap dm ON ds.ticker = dm.ticker
-        WHERE dm.date = $1
-        AND ds.date >= $1 - INTERVAL '30 days'
-      `,
-        [marketCapDate],
-      );
-
-      ohlcvDate = ohlcvRows[0]?.date || null;
-      const ohlcvTickerCount = parseInt(ohlcvRows[0]?.ticker_count || "0");
-
-      // 조건 완화: 오늘 데이터가 있고 50% 이상 커버하면 완료
-      ohlcvDone =
-        ohlcvDate &&
-        new Date(ohlcvDate).toDateString() === today.toDateString() &&
-        ohlcvTickerCount >= Math.max(Math.floor(marketCapCount * 0.5), 25); // 최소 25개
-
-      console.log(
-        `🔍 OHLCV 상태 체크: 날짜=${ohlcvDate}, 종목수=${ohlcvTickerCount}, 완료=${ohlcvDone}`,
-      );
+    const isToday = (value: Date | null) =>
+      !!value && new Date(value).toDateString() === today.toDateString();
+    const sameDate = (a: Date | null, b: Date | null) =>
+      !!a && !!b && new Date(a).getTime() === new Date(b).getTime();
+
+    // 수집 작업들이 끝날 때 갱신하는 요약 행 (server/services/trading_data/status.py)
+    // 아직 어떤 작업도 실행되지 않아 테이블이 없으면 (42P01) 빈 상태로 응답
+    let status: Record<string, any> = {};
+    try {
+      const { rows } = await pool.query({
+        name: "collection_status_row",
+        text: `SELECT * FROM collection_status WHERE id = 1`,
+      });
+      status = rows[0] ?? {};
+    } catch (error) {
+      if ((error as { code?: string }).code !== "42P01") throw error;
     }
 
-    // Best K 계산 완료 여부 (조건 완화)
-    let bestKDone = false;
-    if (ohlcvDone && marketCapDate) {
-      const { rows: bestKRows } = await client.query(
-        `
-        SELECT COUNT(*) as count
-        FROM best_k_analysis bka
-        INNER JOIN daily_market_cap dm ON bka.ticker = dm.ticker
-        WHERE dm.date = $1 
-        AND bka.analysis_date = $1
-      `,
-        [marketCapDate],
-      );
-
-      const bestKCount = parseInt(bestKRows[0]?.count || "0");
-      bestKDone = bestKCount >= Math.max(Math.floor(marketCapCount * 0.3), 10); // 30% 이상, 최소 10개
-
-      console.log(`🔍 Best K 상태 체크: 개수=${bestKCount}, 완료=${bestKDone}`);
-    }
+    const marketCapDate: Date | null = status.market_cap_date ?? null;
+    const marketCapCount = Number(status.market_cap_count ?? 0);
 
-    client.release();
+    // 조건 완화: 오늘 데이터가 있고 50개 이상이면 완료로 인정
+    const marketCapDone = isToday(marketCapDate) && marketCapCount >= 50;
+
+    // OHLCV / Best K 는 현재 시가총액 기준일로 집계된 경우만 인정
+    const ohlcvDate: Date | null = sameDate(status.ohlcv_basis_date, marketCapDate)
+      ? status.ohlcv_date
+      : null;
+    const ohlcvTickerCount = ohlcvDate ? Number(status.ohlcv_ticker_count) : 0;
+
+    // 조건 완화: 오늘 데이터가 있고 50% 이상 커버하면 완료 (최소 25개)
+    const ohlcvDone =
+      marketCapDone &&
+      isToday(ohlcvDate) &&
+      ohlcvTickerCount >= Math.max(Math.floor(marketCapCount * 0.5), 25);
+
+    const bestKCount = sameDate(status.best_k_basis_date, marketCapDate)
+      ? Number(status.best_k_count)
+      : 0;
+    // 30% 이상, 최소 10개
+    const bestKDone =
+      ohlcvDone && bestKCount >= Math.max(Math.floor(marketCapCount * 0.3), 10);
 
     return res.status(200).json({
       success: true,
@@ -455,6 +429,8 @@ router.get("/collection-status", async (_req, res) => {
           ohlcv: ohlcvDate ? marketCapCount : 0,
           bestK: bestKDone ? marketCapCount : 0,
         },
+        bestKPeriods: bestKCount ? status.best_k_periods : {},
+        updatedAt: status.updated_at ?? null,
       },
     });
   } catch (err) {
@@ -527,6 +503,121 @@ router.get("/collect-progress", (_req, res) => {
   });
 });
 
+// ✅ daily_stock_data 스트리밍 내보내기 (NDJSON / Arrow)
+// 서버 측 커서로 배치 단위로 읽어 바로 전송하므로 기간이 길어도 메모리 사용량이 일정함
+router.get("/daily-stock-data/export", (req, res) => {
+  const { startDate, endDate, market, rankType } = req.query;
+  const format = req.query.format === "arrow" ? "arrow" : "ndjson";
+  const contentType =
+    format === "arrow" ? "application/vnd.apache.arrow.stream" : "application/x-ndjson";
+
+  const proc = spawn("python3", ["server/services/export-daily-stock-data.py"], {
+    stdio: ["pipe", "pipe", "pipe"],
+  });
+
+  let started = false;
+  let stderr = "";
+
+  // 첫 배치가 나오는 시점에 헤더를 보내고, 이후는 그대로 흘려보냄
+  proc.stdout.once("data", () => {
+    started = true;
+    res.setHeader("Content-Type", contentType);
+  });
+  proc.stdout.pipe(res, { end: false });
+
+  proc.stderr.on("data", (data) => {
+    const text = data.toString().trim();
+    stderr += text + "\n";
+    console.log(`📤 export stderr: ${text}`);
+  });
+
+  proc.on("close", (code) => {
+    if (code === 0) {
+      if (!started) {
+        res.setHeader("Content-Type", contentType);
+      }
+      res.end();
+    } else if (!started && !res.headersSent) {
+      res.status(500).json({ success: false, message: "내보내기 실패", error: stderr });
+    } else {
+      // 이미 일부를 보낸 경우에는 연결을 끊어 클라이언트가 불완전한 응답임을 알 수 있게 함
+      res.destroy(new Error(`export failed (code: ${code})`));
+    }
+  });
+
+  proc.on("error", (error) => {
+    console.error("❌ export 프로세스 시작 실패:", error);
+    if (!res.headersSent) {
+      res.status(500).json({ success: false, message: "내보내기 실패", error: String(error) });
+    }
+  });
+
+  // 클라이언트가 먼저 끊으면 쿼리도 중단
+  res.on("close", () => {
+    if (proc.exitCode === null) proc.kill();
+  });
+
+  proc.stdin.write(JSON.stringify({ startDate, endDate, market, rankType, format }));
+  proc.stdin.end();
+});
+
+// ✅ Python 작업 지표 (Prometheus 텍스트 형식)
+// METRICS_PUSHGATEWAY_URL 이 있으면 Pushgateway 의 /metrics 를 그대로 전달하고,
+// 없으면 작업별 텍스트 파일 (METRICS_DIR/*.prom, trading_data/metrics.py) 을 합침.
+// 같은 지표가 여러 파일에 있으면 HELP/TYPE 는 한 번만 쓰고 샘플을 모아서 내보냄
+function mergeMetricFiles(texts: string[]): string {
+  const families = new Map<string, { meta: string[]; samples: string[] }>();
+  for (const text of texts) {
+    let current: { meta: string[]; samples: string[] } | undefined;
+    for (const line of text.split("\n")) {
+      const meta = line.match(/^# (HELP|TYPE) (\S+)/);
+      if (meta) {
+        if (!families.has(meta[2])) families.set(meta[2], { meta: [], samples: [] });
+        current = families.get(meta[2])!;
+        if (!current.meta.some((m) => m.startsWith(`# ${meta[1]} `))) {
+          current.meta.push(line);
+        }
+      } else if (line.trim() && !line.startsWith("#") && current) {
+        current.samples.push(line);
+      }
+    }
+  }
+  return (
+    Array.from(families.values())
+      .map(({ meta, samples }) => [...meta, ...samples].join("\n"))
+      .join("\n") + "\n"
+  );
+}
+
+router.get("/metrics", async (_req, res) => {
+  const contentType = "text/plain; version=0.0.4; charset=utf-8";
+  try {
+    const pushgateway = process.env.METRICS_PUSHGATEWAY_URL;
+    if (pushgateway) {
+      const response = await fetch(`${pushgateway.replace(/\/$/, "")}/metrics`);
+      res.status(response.status).setHeader("Content-Type", contentType);
+      return res.send(await response.text());
+    }
+
+    const dir = process.env.METRICS_DIR || "data/metrics";
+    const names = fs.existsSync(dir)
+      ? (await fs.promises.readdir(dir)).filter((name) => name.endsWith(".prom")).sort()
+      : [];
+    const texts = await Promise.all(
+      names.map((name) => fs.promises.readFile(path.join(dir, name), "utf-8")),
+    );
+    res.status(200).setHeader("Content-Type", contentType);
+    return res.send(mergeMetricFiles(texts));
+  } catch (err) {
+    console.error("❌ metrics API 에러:", err);
+    return res.status(502).json({
+      success: false,
+      message: "지표 조회 실패",
+      error: String(err),
+    });
+  }
+});
+
 // ✅ 최신 시가총액 데이터 조회 API
 router.get("/market-latest", async (_req, res) => {
   try {
@@ -541,10 +632,12 @@ router.get("/market-latest", async (_req, res) => {
       return res.status(404).json({ success: false, message: "데이터 없음" });
     }
 
-    const { rows } = await client.query(
-      `SELECT * FROM daily_market_cap WHERE date = $1 ORDER BY market_cap DESC`,
-      [latestDate],
-    );
+    // 이름 있는 prepared statement: 연결별로 한 번만 파싱/계획
+    const { rows } = await client.query({
+      name: "daily_market_cap_by_date",
+      text: `SELECT * FROM daily_market_cap WHERE date = $1 ORDER BY market_cap DESC`,
+      values: [latestDate],
+    });
 
     client.release();
 
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Best K 엔진 벤치마크
+
+trading_data.synthetic 으로 만든 결정적 합성 시장에서 Best K 계산 경로별 실행 시간을
+잰다. 각 벤치마크는 한 번 예열한 뒤 --repeat 번 실행해 최소/중앙값을 기록하고,
+결과를 커밋 해시와 함께 JSON 한 줄로 --output 에 추가한다. 같은 규모로 측정한
+다른 커밋의 가장 최근 결과와 비교해 --threshold 이상 느려진 항목을 표시한다.
+
+- simulate_k_value: 종목별 순수 파이썬 시뮬레이션 (K = 0.5)
+- per_ticker_best_k: 종목마다 K 0.1 ~ 0.9 를 simulate_k_value 로 돌려 고르는 기존 방식
+- calculate_best_k_batch / bestk_evaluate / sweep / walkforward / portfolio:
+  일괄 계산 경로 (numba 가 있으면 백엔드별로 각각)
+- main_e2e: best-k-calculator.py 를 API 와 같은 방식 (stdin JSON) 으로 실행.
+  --e2e-database 로 지정한 빈 PostgreSQL DB 에 daily_market_cap 을 만들어 넣고
+  임시 OHLCV 저장소 (pyarrow 필요) 를 쓴다. 지정한 DB 의 daily_market_cap 을
+  지우므로 벤치마크 전용 DB 에만 사용할 것
+
+실행: python3 server/services/benchmark-best-k.py [--tickers 200] [--days 250] \
+          [--regimes normal,volatile] [--only bestk_evaluate,sweep] [--e2e-database bench]
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from trading_data import bestk, kernels, portfolio, sweep, synthetic, walkforward
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s",
+                    handlers=[logging.StreamHandler(sys.stderr)])
+logger = logging.getLogger(__name__)
+
+SERVICES_DIR = os.path.dirname(os.path.abspath(__file__))
+CALCULATOR_PATH = os.path.join(SERVICES_DIR, "best-k-calculator.py")
+RESULTS_FILE = os.getenv("BENCHMARK_RESULTS", "data/benchmarks/best-k.jsonl")
+
+
+def load_calculator():
+    """best-k-calculator.py 모듈 (pykrx/psycopg2 가 없으면 None)"""
+    try:
+        spec = importlib.util.spec_from_file_location("best_k_calculator",
+                                                      CALCULATOR_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        logger.warning(f"best-k-calculator 를 불러올 수 없어 관련 벤치마크 건너뜀: {e}")
+        return None
+    module.logger.setLevel(logging.WARNING)
+    return module
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                cwd=SERVICES_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "."],
+                               cwd=SERVICES_DIR, capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def per_ticker_best_k(calculator, series):
+    """종목마다 K 별 simulate_k_value 를 돌려 sharpe 최대 K 를 고름 (일괄 계산 이전 방식)"""
+    results = []
+    for price_data in series:
+        best = None
+        for k in bestk.K_GRID:
+            metrics = calculator.simulate_k_value(price_data, float(k))
+            sharpe = metrics["avg_return_pct"] / max(metrics["mdd_pct"], 0.1)
+            if best is None or sharpe > best[0]:
+                best = (sharpe, float(k), metrics)
+        results.append(best)
+    return results
+
+
+def seed_e2e_database(data):
+    """벤치마크 DB 에 합성 종목의 daily_market_cap (마지막 거래일) 을 채움"""
+    from trading_data import db, market_cap
+
+    connection = db.connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS daily_market_cap (
+                    date DATE NOT NULL,
+                    ticker TEXT NOT NULL,
+                    name TEXT,
+                    market TEXT,
+                    market_cap BIGINT,
+                    open_price REAL,
+                    high_price REAL,
+                    low_price REAL,
+                    close_price REAL,
+                    volume BIGINT
+                )
+            """)
+            cursor.execute("DELETE FROM daily_market_cap")
+            last = np.nan_to_num(data['close'][:, -1])
+            cursor.execute(
+                """
+                INSERT INTO daily_market_cap (date, ticker, name, market,
+                    market_cap, close_price)
+                SELECT %s, ticker, ticker, 'KOSPI', market_cap, close_price
+                FROM unnest(%s::text[], %s::bigint[], %s::real[])
+                    AS t(ticker, market_cap, close_price)
+                """, (str(data['dates'][-1]), data['symbols'].tolist(),
+                      (last * 1e6).astype(np.int64).tolist(), last.tolist()))
+        connection.commit()
+        market_cap.ensure_schema(connection)
+    finally:
+        connection.close()
+
+
+def run_main_e2e(store_dir, data, database):
+    """best-k-calculator.py 를 하위 프로세스로 실행 (custom 기간, DB 저장 없음)"""
+    request = {
+        "period": "custom",
+        "startDate": str(data['dates'][0]),
+        "endDate": str(data['dates'][-1]),
+    }
+    env = dict(os.environ, PGDATABASE=database, OHLCV_STORE_DIR=store_dir)
+    completed = subprocess.run([sys.executable, CALCULATOR_PATH],
+                               input=json.dumps(request), env=env,
+                               capture_output=True, text=True, check=True)
+    output = json.loads(completed.stdout)
+    if not output.get("success"):
+        raise RuntimeError(output.get("message"))
+    return output
+
+
+def build_benchmarks(args, data, calculator):
+    """이름 -> 인자 없는 함수"""
+    matrices = [data[field] for field in ('open', 'high', 'low', 'close')]
+    compacted = bestk.compact_left(*matrices, data['close'])[:-1]
+    backends = ['numpy', 'numba'] if kernels.HAVE_NUMBA else ['numpy']
+    benchmarks = {}
+
+    if calculator is not None:
+        series = synthetic.to_series(data)
+        infos = [{"ticker": symbol, "name": symbol}
+                 for symbol in data['symbols']]
+        benchmarks['simulate_k_value'] = lambda: [
+            calculator.simulate_k_value(price_data, 0.5)
+            for price_data in series
+        ]
+        benchmarks['per_ticker_best_k'] = lambda: per_ticker_best_k(
+            calculator, series)
+        for backend in backends:
+            benchmarks[f'calculate_best_k_batch[{backend}]'] = (
+                lambda backend=backend: calculator.calculate_best_k_batch(
+                    infos, series, "benchmark", backend))
+
+    for backend in backends:
+        benchmarks[f'bestk_evaluate[{backend}]'] = (
+            lambda backend=backend: bestk.evaluate(*compacted,
+                                                   backend=backend))
+        benchmarks[f'sweep[{backend}]'] = (
+            lambda backend=backend: sweep.sweep(
+                *compacted, bestk.compact_left(data['volume'],
+                                               data['close'])[0],
+                backend=backend))
+        benchmarks[f'walkforward[{backend}]'] = (
+            lambda backend=backend: walkforward.evaluate(
+                *compacted, train_days=max(args.days // 4, 2),
+                test_days=max(args.days // 12, 1), backend=backend))
+
+    transposed = [matrix.T for matrix in matrices]
+    benchmarks['portfolio'] = lambda: portfolio.backtest(
+        *transposed, k=0.5, positions=10, max_weight=0.2)
+
+    if args.e2e_database and calculator is not None:
+        from trading_data.store import ParquetStore
+
+        store_dir = tempfile.mkdtemp(prefix="bestk-bench-")
+        e2e_data = dict(data)
+        e2e_tickers = min(len(data['symbols']), 200)
+        for field in ('symbols', 'open', 'high', 'low', 'close', 'volume'):
+            e2e_data[field] = data[field][:e2e_tickers]
+        ParquetStore(store_dir).append(
+            synthetic.to_frame(e2e_data).assign(market='KOSPI'),
+            tag='benchmark')
+        seed_e2e_database(e2e_data)
+        benchmarks['main_e2e'] = lambda: run_main_e2e(store_dir, e2e_data,
+                                                      args.e2e_database)
+    return benchmarks
+
+
+def measure(function, repeat):
+    function()  # 예열 (numba 컴파일, 캐시)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'repeat': repeat,
+    }
+
+
+def previous_run(path, scale, commit):
+    """같은 규모로 측정한 다른 커밋의 가장 최근 결과"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            run = json.loads(line)
+            if run.get('scale') == scale and run.get('commit') != commit:
+                previous = run
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Best K 엔진 벤치마크')
+    parser.add_argument('--tickers', type=int, default=200)
+    parser.add_argument('--days', type=int, default=250)
+    parser.add_argument('--regimes', default='normal',
+                        help=f"쉼표로 구분 ({', '.join(synthetic.REGIMES)})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', help='실행할 벤치마크 이름 접두어 (쉼표로 구분)')
+    parser.add_argument('--e2e-database',
+                        help='main_e2e 용 벤치마크 전용 PostgreSQL DB 이름')
+    parser.add_argument('--output', default=RESULTS_FILE, help='결과 JSON lines 파일')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='회귀로 표시할 중앙값 증가 비율')
+    args = parser.parse_args()
+
+    scale = {
+        'tickers': args.tickers,
+        'days': args.days,
+        'regimes': args.regimes.split(','),
+        'seed': args.seed,
+    }
+    data = synthetic.generate(args.tickers, args.days, seed=args.seed,
+                              regimes=scale['regimes'])
+    calculator = load_calculator()
+    benchmarks = build_benchmarks(args, data, calculator)
+    if args.only:
+        prefixes = tuple(args.only.split(','))
+        benchmarks = {name: function for name, function in benchmarks.items()
+                      if name.startswith(prefixes)}
+
+    results = {}
+    for name, function in benchmarks.items():
+        try:
+            results[name] = measure(function, args.repeat)
+        except Exception as e:
+            logger.error(f"{name} 실패: {e}")
+            results[name] = {'error': str(e)}
+            continue
+        logger.info(f"{name}: 중앙값 {results[name]['median_s'] * 1000:.1f}ms "
+                    f"(최소 {results[name]['min_s'] * 1000:.1f}ms)")
+
+    commit = git_commit()
+    run = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'machine': platform.node(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'numba': kernels.numba.__version__ if kernels.HAVE_NUMBA else None,
+        'scale': scale,
+        'results': results,
+    }
+
+    previous = previous_run(args.output, scale, commit)
+    regressions = []
+    if previous:
+        logger.info(f"비교 기준: {previous['commit']} ({previous['timestamp']})")
+        for name, current in results.items():
+            before = previous['results'].get(name, {})
+            if 'median_s' not in current or 'median_s' not in before:
+                continue
+            ratio = current['median_s'] / before['median_s']
+            flag = ''
+            if ratio > 1 + args.threshold:
+                regressions.append(name)
+                flag = ' ← 회귀'
+            logger.info(f"  {name}: {ratio:.2f}배{flag}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    logger.info(f"결과 저장: {args.output}")
+
+    print(json.dumps({'commit': commit, 'results': results,
+                      'regressions': regressions}, ensure_ascii=False,
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
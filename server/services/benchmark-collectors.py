@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+수집기 오프라인 벤치마크 (pykrx 녹화/재생)
+
+collector_market_cap.get_market_data (시가총액 Top 200 + 종목별 시세) 와
+collector.fetch_ohlcv_for_ticker (종목별 1년 OHLCV) 단계를 DB 없이 실행한다.
+
+1) 녹화 (네트워크 필요): --record DIR --date 20250102
+   실제 pykrx 응답을 DIR 에 저장한다 (trading_data.replay.RecordingPykrx)
+2) 재생: --replay DIR --date 20250102 [--latency-ms 80 --jitter-ms 40
+   --error-rate 0.02 --throttle-rate 5 --rate 4 --workers 4]
+   녹화 응답을 지연/오류/속도 제한을 넣어 돌려주고, 단계별 소요 시간과 호출/오류/
+   차단 수, collector.recorder 의 fetch/convert 시간 분포를 출력한다. --workers 는 OHLCV 단계를 스레드로 나눠 실행하며 모든
+   스레드가 초당 --rate 회 제한 하나를 공유한다.
+
+실행: python3 server/services/benchmark-collectors.py --replay data/pykrx_replay --date 20250102
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s",
+                    handlers=[logging.StreamHandler(sys.stderr)])
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='수집기 오프라인 벤치마크')
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--record', help='실제 pykrx 응답을 녹화할 디렉터리')
+    mode.add_argument('--replay', help='녹화 디렉터리 (재생)')
+    parser.add_argument('--date', required=True, help='수집 기준일 (YYYYMMDD)')
+    parser.add_argument('--limit', type=int, help='OHLCV 단계 종목 수 제한')
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help='OHLCV 단계 초당 호출 수 (collector.py 의 PYKRX_RATE)')
+    parser.add_argument('--workers', type=int, default=1, help='OHLCV 단계 스레드 수')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float,
+                        help='초당 이 횟수를 넘는 호출은 차단 오류')
+    parser.add_argument('--throttle-burst', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='결과를 JSON 한 줄로 추가할 파일')
+    return parser.parse_args()
+
+
+def fetch_ohlcv(collector, tickers, start_date, end_date, rate, workers):
+    """collector.main 의 종목별 수집 루프와 같은 호출 (DB 저장 제외)"""
+    from trading_data.ratelimit import RateLimiter
+
+    limiter = RateLimiter(rate)
+
+    def fetch(row):
+        limiter.acquire()
+        return collector.fetch_ohlcv_for_ticker(row["ticker"], row["name"],
+                                                start_date, end_date)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fetch, tickers))
+
+
+def main():
+    args = parse_args()
+
+    # 수집기 모듈이 import 시점에 pykrx_stock() 을 부르므로 먼저 모드를 정함
+    from trading_data import replay
+
+    if args.replay:
+        os.environ['PYKRX_REPLAY_DIR'] = args.replay
+        faults = replay.FaultInjector(latency_ms=args.latency_ms,
+                                      jitter_ms=args.jitter_ms,
+                                      error_rate=args.error_rate,
+                                      throttle_rate=args.throttle_rate,
+                                      throttle_burst=args.throttle_burst,
+                                      seed=args.seed)
+        client = replay.ReplayPykrx(args.replay, faults)
+    else:
+        os.environ['PYKRX_RECORD_DIR'] = args.record
+        faults = None
+        client = replay.RecordingPykrx(args.record)
+
+    import collector
+    import collector_market_cap
+
+    # 두 수집기가 같은 클라이언트 (같은 속도 제한/오류 카운터) 를 쓰도록 교체
+    collector.stock = client
+    collector_market_cap.stock = client
+    for module in (collector, collector_market_cap):
+        module.logger.setLevel(logging.WARNING)
+
+    date = datetime.strptime(args.date, "%Y%m%d")
+    phases = {}
+
+    started = time.perf_counter()
+    rows = collector_market_cap.get_market_data(date)
+    phases['market_cap'] = {'seconds': time.perf_counter() - started,
+                            'rows': len(rows)}
+    logger.info(f"시가총액 단계: {len(rows)}개 종목 "
+                f"{phases['market_cap']['seconds']:.2f}초")
+
+    tickers = rows[:args.limit] if args.limit else rows
+    start_date = (date - timedelta(days=400)).strftime("%Y%m%d")
+    started = time.perf_counter()
+    results = fetch_ohlcv(collector, tickers, start_date, args.date,
+                          args.rate, args.workers)
+    phases['ohlcv'] = {
+        'seconds': time.perf_counter() - started,
+        'tickers': len(tickers),
+        'succeeded': sum(1 for result in results if result),
+        'rows': sum(len(result) for result in results),
+    }
+    logger.info(f"OHLCV 단계: {phases['ohlcv']['succeeded']}/{len(tickers)}개 종목 "
+                f"{phases['ohlcv']['seconds']:.2f}초")
+
+    summary = {
+        'mode': 'replay' if args.replay else 'record',
+        'date': args.date,
+        'rate': args.rate,
+        'workers': args.workers,
+        'faults': {
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'error_rate': args.error_rate,
+            'throttle_rate': args.throttle_rate,
+            'seed': args.seed,
+        } if args.replay else None,
+        'phases': phases,
+        'calls': faults.stats() if faults else None,
+        'stages': collector.recorder.report()['stages'],
+        'misses': client.misses if args.replay else None,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + '\n')
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,30 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
 import sys
 import json
 import logging
+import time
 import traceback
-import psycopg2
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
 from pykrx import stock
+from trading_data import (bestk, daily_stock, db, instrument, kernels,
+                          market_cap, status, walkforward)
+from trading_data.store import ParquetStore
 
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(levelname)s - %(message)s",
                     handlers=[logging.StreamHandler(sys.stderr)])
 logger = logging.getLogger(__name__)
 
+# 단계별 시간/카운터 (실행 보고서는 data/run_reports 와 job_run_report)
+recorder = instrument.Recorder("best-k-calculator")
+
+# 연결별 daily_stock_data 종목 코드 컬럼 (symbol 또는 ticker)
+_symbol_columns = {}
+
 # 기간별 설정 매핑
 PERIOD_CONFIG = {
     "days_3": {
@@ -51,12 +60,7 @@ PERIOD_CONFIG = {
 
 def get_database_connection():
     try:
-        conn = psycopg2.connect(host=os.getenv('PGHOST', 'localhost'),
-                                database=os.getenv('PGDATABASE', 'postgres'),
-                                user=os.getenv('PGUSER', 'postgres'),
-                                password=os.getenv('PGPASSWORD', ''),
-                                port=os.getenv('PGPORT', 5432),
-                                sslmode="require")
+        conn = db.connect(sslmode=os.getenv("PGSSLMODE") or "require")
         return conn
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
@@ -88,14 +92,7 @@ def calculate_period_dates(period_type, start_date=None, end_date=None):
 def get_top_200_tickers(conn):
     try:
         with conn.cursor() as cursor:
-            query = """
-                SELECT ticker, name, market, market_cap, close_price
-                FROM daily_market_cap
-                WHERE date = (SELECT MAX(date) FROM daily_market_cap)
-                ORDER BY market_cap::numeric DESC
-                LIMIT 200
-            """
-            cursor.execute(query)
+            market_cap.latest_top(cursor, 200)
             results = cursor.fetchall()
 
             return [{
@@ -120,60 +117,105 @@ def get_price_data_with_pykrx(ticker, start_date, end_date):
         start_date_krx = start_dt.strftime("%Y%m%d")
         end_date_krx = end_dt.strftime("%Y%m%d")
 
-        df = stock.get_market_ohlcv_by_date(start_date_krx, end_date_krx,
-                                            ticker)
+        with recorder.stage("fetch", ticker):
+            df = stock.get_market_ohlcv_by_date(start_date_krx, end_date_krx,
+                                                ticker)
 
         if df.empty:
             return []
 
-        df = df.reset_index()
-        price_data = []
+        with recorder.stage("convert", ticker):
+            df = df.reset_index()
+            price_data = []
 
-        for _, row in df.iterrows():
-            price_data.append({
-                "date": row["날짜"].date(),
-                "open": float(row["시가"]),
-                "high": float(row["고가"]),
-                "low": float(row["저가"]),
-                "close": float(row["종가"]),
-                "volume": int(row["거래량"])
-            })
+            for _, row in df.iterrows():
+                price_data.append({
+                    "date": row["날짜"].date(),
+                    "open": float(row["시가"]),
+                    "high": float(row["고가"]),
+                    "low": float(row["저가"]),
+                    "close": float(row["종가"]),
+                    "volume": int(row["거래량"])
+                })
 
-        return sorted(price_data, key=lambda x: x["date"])
+            return sorted(price_data, key=lambda x: x["date"])
 
     except Exception as e:
         logger.warning(f"Failed to fetch PyKRX data for {ticker}: {e}")
         return []
 
 
-def get_stock_data_from_db(conn, ticker, start_date, end_date):
-    """DB에서 가격 데이터 조회 (백업용)"""
+def get_latest_market_date(conn):
+    """시가총액 수집 기준 최신 거래일"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT MAX(date) FROM daily_market_cap")
+        return cursor.fetchone()[0]
+
+
+def load_store_prices(tickers, start_date, end_date, fresh_date):
+    """로컬 OHLCV 저장소에서 종목별 가격 데이터를 한 번에 조회
+
+    fresh_date 까지 데이터가 있는 종목만 반환 (나머지는 PyKRX/DB 로 조회)
+    """
     try:
-        with conn.cursor() as cursor:
-            query = """
-                SELECT date, open_price, high_price, low_price, close_price, volume
-                FROM daily_stock_data
-                WHERE ticker = %s 
-                AND date >= %s 
-                AND date <= %s
-                ORDER BY date ASC
-            """
-            cursor.execute(query, (ticker, start_date, end_date))
-            results = cursor.fetchall()
+        frame = ParquetStore().read_frame(
+            tickers, start_date, end_date,
+            columns=["open", "high", "low", "close", "volume"])
+    except ImportError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Failed to read local OHLCV store: {e}")
+        return {}
 
-            return [{
-                "date": row[0],
-                "open": float(row[1]) if row[1] else 0,
-                "high": float(row[2]) if row[2] else 0,
-                "low": float(row[3]) if row[3] else 0,
-                "close": float(row[4]) if row[4] else 0,
-                "volume": int(row[5]) if row[5] else 0
-            } for row in results]
+    prices = {}
+    for ticker, rows in frame.groupby("symbol"):
+        if fresh_date is None or rows["date"].iloc[-1] < fresh_date:
+            continue
+        prices[ticker] = [{
+            "date": date,
+            "open": float(open_price),
+            "high": float(high),
+            "low": float(low),
+            "close": float(close),
+            "volume": int(volume)
+        } for date, open_price, high, low, close, volume in zip(
+            rows["date"], rows["open"], rows["high"], rows["low"],
+            rows["close"], rows["volume"])]
+    return prices
 
+
+def get_stock_data_from_db(conn, ticker, start_date, end_date):
+    """DB에서 가격 데이터 조회 (백업용)
+
+    daily_stock.load_symbol 로 COPY binary 결과를 배열로 읽고 (NULL 은 0),
+    다른 조회 경로와 같은 행 dict 목록으로 바꾼다.
+    """
+    try:
+        # ticker/symbol 레이아웃 확인은 연결당 한 번만
+        if conn not in _symbol_columns:
+            _symbol_columns[conn] = daily_stock.table_symbol_column(conn)
+        arrays = daily_stock.load_symbol(
+            conn, ticker, start_date, end_date,
+            fields=("open", "high", "low", "close", "volume"),
+            symbol_column=_symbol_columns[conn])
     except Exception as e:
         logger.warning(f"Failed to get DB data for {ticker}: {e}")
+        conn.rollback()
         return []
 
+    return [{
+        "date": date,
+        "open": open_price,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume
+    } for date, open_price, high, low, close, volume in zip(
+        arrays["date"].tolist(), arrays["open"].astype(float).tolist(),
+        arrays["high"].astype(float).tolist(),
+        arrays["low"].astype(float).tolist(),
+        arrays["close"].astype(float).tolist(), arrays["volume"].tolist())]
+
 
 def simulate_k_value(price_data, k):
     """K 값 기반 시뮬레이션"""
@@ -244,76 +286,120 @@ def simulate_k_value(price_data, k):
     }
 
 
-def calculate_best_k_for_ticker(conn, ticker_info, start_date, end_date,
-                                period_type):
-    """개별 종목의 Best K 값 계산"""
-    ticker = ticker_info["ticker"]
-    name = ticker_info["name"]
-
-    try:
-        # 가격 데이터 조회
-        price_data = get_price_data_with_pykrx(ticker, start_date, end_date)
-
-        if not price_data:
-            price_data = get_stock_data_from_db(conn, ticker, start_date,
-                                                end_date)
-
-        if len(price_data) < 5:
-            logger.warning(
-                f"[SKIP] {name}({ticker}) {period_type} - 데이터 부족 ({len(price_data)}일)"
-            )
-            return None
-
-        # K 값들을 테스트 (0.1 ~ 0.9)
-        k_results = []
-        for k in np.arange(0.1, 1.0, 0.1):
-            k = round(k, 1)
-            metrics = simulate_k_value(price_data, k)
-
-            avg_return = metrics["avg_return_pct"]
-            mdd = max(metrics["mdd_pct"], 0.1)
-            sharpe = avg_return / mdd if mdd > 0 else 0
-
-            k_results.append({"k": k, "sharpe": sharpe, **metrics})
-
-        if not k_results:
-            return None
-
-        best_result = max(k_results, key=lambda x: x["sharpe"])
-        best_k = best_result["k"]
+def get_price_data(conn, ticker, start_date, end_date, price_data=None):
+    """가격 데이터 조회 (로컬 저장소 -> PyKRX -> DB)"""
+    if price_data:
+        recorder.count("requests", source="store")
+        return price_data
+
+    recorder.count("requests", source="pykrx")
+    price_data = get_price_data_with_pykrx(ticker, start_date, end_date)
+    if price_data:
+        return price_data
+
+    recorder.count("requests", source="db")
+    with recorder.stage("db_read", ticker):
+        price_data = get_stock_data_from_db(conn, ticker, start_date,
+                                            end_date)
+    return price_data
+
+
+def calculate_best_k_batch(ticker_infos, price_series, period_type,
+                           backend=None):
+    """여러 종목의 Best K 값을 한 번에 계산
+
+    K 값 0.1 ~ 0.9 와 전 종목을 (K × 종목 × 거래일) 텐서로 평가한다
+    (규칙은 simulate_k_value 와 같음). 종목마다 결과 dict 또는 None
+    (수익률 ≤ 0 으로 제외) 목록을 반환한다. backend 는 경로 지표
+    (복리 MDD, 연속 손실 등) 계산 백엔드 ('auto', 'numba', 'numpy').
+    """
+    with recorder.stage("stack"):
+        matrices = bestk.stack_series(price_series)
+    with recorder.stage("simulate"):
+        metrics = bestk.evaluate(matrices["open"], matrices["high"],
+                                 matrices["low"], matrices["close"],
+                                 backend=backend)
+    best_ks, chosen = bestk.best_k(metrics)
+
+    results = []
+    for i, (ticker_info, price_data) in enumerate(zip(ticker_infos,
+                                                      price_series)):
+        ticker = ticker_info["ticker"]
+        name = ticker_info["name"]
 
         # 음수 수익률 필터링
-        if best_result["avg_return_pct"] <= 0:
+        if chosen["avg_return_pct"][i] <= 0:
             logger.debug(
-                f"[FILTER] {name}({ticker}) {period_type} 수익률 {best_result['avg_return_pct']:.2f}% ≤ 0 → 제외"
+                f"[FILTER] {name}({ticker}) {period_type} 수익률 {chosen['avg_return_pct'][i]:.2f}% ≤ 0 → 제외"
             )
-            return None
+            results.append(None)
+            continue
 
         result = {
             "ticker": ticker,
             "company_name": name,
             "period_type": period_type,
             "period_days": len(price_data),
-            "best_k": float(best_k),  # NumPy float를 Python float로 변환
-            "avg_return_pct": float(best_result["avg_return_pct"]),
-            "win_rate_pct": float(best_result["win_rate_pct"]),
-            "mdd_pct": float(best_result["mdd_pct"]),
-            "total_trades": int(best_result["trades"]),
-            "sharpe_ratio": float(best_result["sharpe"])
+            "best_k": float(best_ks[i]),  # NumPy float를 Python float로 변환
+            "avg_return_pct": float(chosen["avg_return_pct"][i]),
+            "win_rate_pct": float(chosen["win_rate_pct"][i]),
+            "mdd_pct": float(chosen["mdd_pct"][i]),
+            "total_trades": int(chosen["trades"][i]),
+            "sharpe_ratio": float(chosen["sharpe"][i]),
+            "compound_mdd_pct": float(chosen["compound_mdd_pct"][i]),
+            "max_loss_streak": int(chosen["max_loss_streak"][i]),
+            "underwater_trades": int(chosen["underwater_trades"][i])
         }
 
-        logger.info(f"[SUCCESS] {name}({ticker}) {period_type} K={best_k} "
+        logger.info(f"[SUCCESS] {name}({ticker}) {period_type} K={result['best_k']} "
                     f"R={result['avg_return_pct']:.1f}% "
                     f"W={result['win_rate_pct']:.1f}% "
                     f"MDD={result['mdd_pct']:.1f}% "
+                    f"복리MDD={result['compound_mdd_pct']:.1f}% "
+                    f"연속손실={result['max_loss_streak']} "
                     f"Trades={result['total_trades']}")
-
-        return result
-
-    except Exception as e:
-        logger.error(
-            f"[ERROR] {name}({ticker}) {period_type} Best K 계산 실패: {e}")
-        return None
+        results.append(result)
+
+    return results
+
+
+def calculate_walk_forward(ticker_infos, price_series, train_days, test_days,
+                           backend=None):
+    """표본 외 Best K 평가 (DB 에 저장하지 않음)
+
+    종목마다 [t - train_days, t) 로 K 를 고르고 [t, t + test_days) 성과를
+    집계하며 앞으로 옮겨 간다 (trading_data.walkforward). 종목별 평가 구간을
+    이어 붙인 표본 외 지표와 비교용 표본 내 평균을 반환한다.
+    """
+    with recorder.stage("stack"):
+        matrices = bestk.stack_series(price_series)
+    with recorder.stage("simulate"):
+        result = walkforward.evaluate(matrices["open"], matrices["high"],
+                                      matrices["low"], matrices["close"],
+                                      train_days, test_days, backend=backend)
+    combined = result["combined"]
+    in_sample = result["in_sample"]
+
+    rows = []
+    for i, ticker_info in enumerate(ticker_infos):
+        ks = result["k"][:, i]
+        traded_folds = int(np.isfinite(ks).sum())
+        rows.append({
+            "ticker": ticker_info["ticker"],
+            "company_name": ticker_info["name"],
+            "folds": len(result["folds"]),
+            "traded_folds": traded_folds,
+            "avg_k": float(np.nanmean(ks)) if traded_folds else None,
+            "avg_return_pct": float(combined["avg_return_pct"][i]),
+            "win_rate_pct": float(combined["win_rate_pct"][i]),
+            "mdd_pct": float(combined["mdd_pct"][i]),
+            "total_trades": int(combined["trades"][i]),
+            "sharpe_ratio": float(combined["sharpe"][i]),
+            "in_sample_avg_return_pct":
+            float(in_sample["avg_return_pct"][:, i].mean())
+            if len(result["folds"]) else 0.0,
+        })
+    return rows
 
 
 def insert_best_k_analysis(conn, result):
@@ -327,8 +413,6 @@ def insert_best_k_analysis(conn, result):
                 DELETE FROM best_k_analysis 
                 WHERE ticker = %s AND analysis_date = CURRENT_DATE AND period_type = %s
             """
-            cursor.execute(delete_query,
-                           (result["ticker"], result["period_type"]))
 
             # 새 데이터 삽입
             insert_query = """
@@ -343,15 +427,20 @@ def insert_best_k_analysis(conn, result):
                 )
             """
 
-            cursor.execute(
-                insert_query,
-                (result["ticker"], result["company_name"],
-                 result["period_type"], int(result["period_days"]),
-                 float(result["best_k"]), float(result["avg_return_pct"]),
-                 float(result["win_rate_pct"]), float(result["mdd_pct"]),
-                 int(result["total_trades"]), float(result["sharpe_ratio"])))
-
-            conn.commit()
+            with recorder.stage("db_write", result["ticker"]):
+                cursor.execute(delete_query,
+                               (result["ticker"], result["period_type"]))
+                cursor.execute(
+                    insert_query,
+                    (result["ticker"], result["company_name"],
+                     result["period_type"], int(result["period_days"]),
+                     float(result["best_k"]), float(result["avg_return_pct"]),
+                     float(result["win_rate_pct"]), float(result["mdd_pct"]),
+                     int(result["total_trades"]), float(result["sharpe_ratio"])))
+
+            with recorder.stage("commit", result["ticker"]):
+                conn.commit()
+            recorder.count("rows_upserted")
 
     except Exception as e:
         logger.error(
@@ -360,7 +449,22 @@ def insert_best_k_analysis(conn, result):
         raise
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Best K 계산 (입력은 stdin JSON)')
+    parser.add_argument('--profile', nargs='?',
+                        const=instrument.default_profile_path("best-k-calculator"),
+                        help='실행 구간 프로파일 저장 경로 '
+                        '(pyinstrument 가 있으면 HTML, 없으면 cProfile .prof)')
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    with instrument.profiled(args.profile):
+        calculate()
+
+
+def calculate():
     """메인 실행 함수"""
     try:
         input_data = json.loads(sys.stdin.read())
@@ -369,6 +473,11 @@ def main():
         start_date = input_data.get('startDate')
         end_date = input_data.get('endDate')
         market = input_data.get('market', 'ALL')
+        backend = kernels.resolve_backend(input_data.get('backend'))
+        # walk_forward: 표본 외 평가만 하고 DB 에 저장하지 않음
+        mode = input_data.get('mode') or 'in_sample'
+        train_days = int(input_data.get('trainDays') or 60)
+        test_days = int(input_data.get('testDays') or 20)
 
         logger.info(f"Best K 계산 시작 - 기간: {period_type}, 시장: {market}")
 
@@ -402,44 +511,31 @@ def main():
 
         logger.info(f"대상 종목 수: {len(top_200_tickers)}개, 기간: {db_period_type}")
 
-        # 각 종목별 Best K 계산
+        # 최신 거래일까지 저장된 종목은 로컬 OHLCV 저장소에서 한 번에 읽음
+        fresh_date = min(
+            datetime.strptime(end_date_str, "%Y-%m-%d").date(),
+            get_latest_market_date(conn) or datetime.now().date())
+        with recorder.stage("store_read"):
+            store_prices = load_store_prices(
+                [t["ticker"] for t in top_200_tickers], start_date_str,
+                end_date_str, fresh_date)
+        logger.info(f"로컬 저장소 사용 종목: {len(store_prices)}개")
+
+        # 각 종목별 가격 데이터 조회
         success_count = 0
         failed_count = 0
         filtered_count = 0
 
+        eligible = []
+        price_series = []
         for i, ticker_info in enumerate(top_200_tickers, 1):
             ticker = ticker_info["ticker"]
             name = ticker_info["name"]
 
             try:
-                logger.info(
-                    f"[{i}/{len(top_200_tickers)}] {name}({ticker}) 계산 시작")
-
-                result = calculate_best_k_for_ticker(conn, ticker_info,
-                                                     start_date_str,
-                                                     end_date_str,
-                                                     db_period_type)
-
-                if result is None:
-                    filtered_count += 1
-                    continue
-
-                # 커스텀 기간이 아닌 경우에만 DB 저장
-                if period_type != "custom":
-                    try:
-                        insert_best_k_analysis(conn, result)
-                        success_count += 1
-                        logger.info(
-                            f"[{i}/{len(top_200_tickers)}] {name}({ticker}) DB 저장 성공"
-                        )
-                    except Exception as db_error:
-                        logger.error(
-                            f"[{i}/{len(top_200_tickers)}] {name}({ticker}) DB 저장 실패: {db_error}"
-                        )
-                        failed_count += 1
-                else:
-                    success_count += 1  # 커스텀은 계산만 성공으로 처리
-
+                price_data = get_price_data(conn, ticker, start_date_str,
+                                            end_date_str,
+                                            store_prices.get(ticker))
             except Exception as e:
                 logger.error(
                     f"[{i}/{len(top_200_tickers)}] {name}({ticker}) 처리 실패: {e}"
@@ -447,6 +543,89 @@ def main():
                 failed_count += 1
                 continue
 
+            if len(price_data) < 5:
+                logger.warning(
+                    f"[SKIP] {name}({ticker}) {db_period_type} - 데이터 부족 ({len(price_data)}일)"
+                )
+                filtered_count += 1
+                continue
+
+            eligible.append(ticker_info)
+            price_series.append(price_data)
+
+        if mode == 'walk_forward':
+            started = time.perf_counter()
+            rows = calculate_walk_forward(eligible, price_series, train_days,
+                                          test_days, backend)
+            logger.info(f"워크포워드 평가: {len(eligible)}개 종목 "
+                        f"(학습 {train_days}일 / 평가 {test_days}일) "
+                        f"{(time.perf_counter() - started) * 1000:.1f}ms")
+            recorder.finish(conn)
+            conn.close()
+
+            traded = [row for row in rows if row["total_trades"] > 0]
+            print(json.dumps({
+                "success": True,
+                "message":
+                f"Best K 워크포워드 평가 완료 ({db_period_type}) - {len(traded)}개 종목 거래",
+                "data": {
+                    "mode": mode,
+                    "train_days": train_days,
+                    "test_days": test_days,
+                    "period": f"{start_date_str} ~ {end_date_str}",
+                    "market": market or "ALL",
+                    "avg_return_pct":
+                    float(np.mean([row["avg_return_pct"] for row in traded]))
+                    if traded else 0.0,
+                    "in_sample_avg_return_pct":
+                    float(np.mean([row["in_sample_avg_return_pct"]
+                                   for row in traded])) if traded else 0.0,
+                    "results": rows
+                }
+            }, ensure_ascii=False, indent=2))
+            return
+
+        # 전 종목 Best K 일괄 계산
+        started = time.perf_counter()
+        results = calculate_best_k_batch(eligible, price_series,
+                                         db_period_type, backend)
+        logger.info(f"Best K 일괄 계산: {len(eligible)}개 종목 "
+                    f"{(time.perf_counter() - started) * 1000:.1f}ms "
+                    f"(경로 지표: {backend})")
+
+        for i, (ticker_info, result) in enumerate(zip(eligible, results), 1):
+            ticker = ticker_info["ticker"]
+            name = ticker_info["name"]
+
+            if result is None:
+                filtered_count += 1
+                continue
+
+            # 커스텀 기간이 아닌 경우에만 DB 저장
+            if period_type != "custom":
+                try:
+                    insert_best_k_analysis(conn, result)
+                    success_count += 1
+                    logger.info(
+                        f"[{i}/{len(eligible)}] {name}({ticker}) DB 저장 성공")
+                except Exception as db_error:
+                    logger.error(
+                        f"[{i}/{len(eligible)}] {name}({ticker}) DB 저장 실패: {db_error}"
+                    )
+                    failed_count += 1
+            else:
+                success_count += 1  # 커스텀은 계산만 성공으로 처리
+
+        # 대시보드용 수집 현황 갱신 (DB 에 저장한 경우만)
+        if period_type != "custom":
+            try:
+                with recorder.stage("status_refresh"):
+                    status.refresh_best_k(conn)
+            except Exception as e:
+                logger.warning(f"수집 현황 갱신 실패: {e}")
+                conn.rollback()
+
+        recorder.finish(conn)
         conn.close()
 
         # 결과 반환
@@ -472,6 +651,7 @@ def main():
 
     except Exception as e:
         logger.error(f"Best K 계산 전체 프로세스 실패: {e}")
+        recorder.finish(succeeded=False)
         error_result = {
             "success": False,
             "message": f"Best K 계산 실패: {str(e)}",
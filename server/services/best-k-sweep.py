@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+변동성 돌파 파라미터 스윕 (야간 배치)
+
+시가총액 상위 종목에 대해 K × 익절 배수 × 손절 % × 거래량 필터 × 이동평균 필터
+조합을 한 번에 평가해 best_k_sweep 테이블에 저장한다 (같은 날짜/기간은 덮어씀).
+
+실행: python3 server/services/best-k-sweep.py --period month_3 [--source db] [--limit 200]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from trading_data import bestk, cube, db, kernels, market_cap, sweep
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s",
+                    handlers=[logging.StreamHandler(sys.stdout)])
+logger = logging.getLogger(__name__)
+
+PERIOD_DAYS = {
+    "month_1": 30,
+    "month_3": 90,
+    "half_year": 180,
+    "year_1": 365,
+}
+
+DDL = """
+CREATE TABLE IF NOT EXISTS best_k_sweep (
+    analysis_date DATE NOT NULL,
+    period_type TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    k REAL NOT NULL,
+    take_profit_mult REAL NOT NULL,
+    stop_loss_pct REAL NOT NULL,
+    volume_ratio REAL NOT NULL,
+    ma_window INTEGER NOT NULL,
+    avg_return_pct REAL NOT NULL,
+    win_rate_pct REAL NOT NULL,
+    mdd_pct REAL NOT NULL,
+    total_trades INTEGER NOT NULL,
+    sharpe_ratio REAL NOT NULL,
+    PRIMARY KEY (analysis_date, period_type, ticker, k, take_profit_mult,
+                 stop_loss_pct, volume_ratio, ma_window)
+);
+ALTER TABLE best_k_sweep
+    ADD COLUMN IF NOT EXISTS compound_mdd_pct REAL NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS max_loss_streak INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS underwater_trades INTEGER NOT NULL DEFAULT 0;
+"""
+
+
+def load_prices(connection, symbols, start_date, end_date, source):
+    """(symbols, 날짜 행렬, open, high, low, close, volume) - 종목마다 데이터가 있는 날짜를 앞으로 모음"""
+    fields = ('open', 'high', 'low', 'close', 'volume')
+    if source == 'store':
+        from trading_data.store import ParquetStore
+
+        frame = ParquetStore().read_frame(symbols, start_date, end_date,
+                                          columns=list(fields))
+        price_cube = cube.from_frame(frame)
+    else:
+        from trading_data import daily_stock
+
+        price_cube = cube.from_panel(*daily_stock.load_panel(
+            connection, start_date, end_date, symbols, fields=fields))
+
+    days = np.broadcast_to(price_cube.dates.astype(np.int64).astype(np.float64),
+                           price_cube.values.shape[:2])
+    matrices = bestk.compact_left(
+        days, *(price_cube.field(name) for name in fields[:-2]),
+        price_cube.field('volume'), price_cube.field('close'))
+    days, open_, high, low, volume, close = matrices
+    return price_cube.symbols, days, open_, high, low, close, volume
+
+
+def save_results(connection, analysis_date, period_type, symbols, combos,
+                 metrics):
+    """스윕 결과 저장 (같은 날짜/기간 결과는 지우고 다시 씀)"""
+    combo_index, ticker_index = np.divmod(
+        np.arange(len(combos) * len(symbols)), len(symbols))
+    params = np.array(combos, dtype=np.float64)[combo_index]
+    columns = {
+        'ticker': np.asarray(symbols)[ticker_index].tolist(),
+        'k': params[:, 0].tolist(),
+        'take_profit_mult': params[:, 1].tolist(),
+        'stop_loss_pct': params[:, 2].tolist(),
+        'volume_ratio': params[:, 3].tolist(),
+        'ma_window': params[:, 4].astype(np.int64).tolist(),
+        'avg_return_pct': metrics['avg_return_pct'].ravel().tolist(),
+        'win_rate_pct': metrics['win_rate_pct'].ravel().tolist(),
+        'mdd_pct': metrics['mdd_pct'].ravel().tolist(),
+        'total_trades': metrics['trades'].ravel().tolist(),
+        'sharpe_ratio': metrics['sharpe'].ravel().tolist(),
+        'compound_mdd_pct': metrics['compound_mdd_pct'].ravel().tolist(),
+        'max_loss_streak': metrics['max_loss_streak'].ravel().tolist(),
+        'underwater_trades': metrics['underwater_trades'].ravel().tolist(),
+    }
+
+    with connection.cursor() as cursor:
+        cursor.execute(DDL)
+        cursor.execute(
+            "DELETE FROM best_k_sweep WHERE analysis_date = %s AND period_type = %s",
+            (analysis_date, period_type))
+        cursor.execute(
+            """
+            INSERT INTO best_k_sweep (analysis_date, period_type, ticker, k,
+                take_profit_mult, stop_loss_pct, volume_ratio, ma_window,
+                avg_return_pct, win_rate_pct, mdd_pct, total_trades, sharpe_ratio,
+                compound_mdd_pct, max_loss_streak, underwater_trades)
+            SELECT %(analysis_date)s, %(period_type)s, * FROM unnest(
+                %(ticker)s::text[], %(k)s::real[], %(take_profit_mult)s::real[],
+                %(stop_loss_pct)s::real[], %(volume_ratio)s::real[], %(ma_window)s::int[],
+                %(avg_return_pct)s::real[], %(win_rate_pct)s::real[], %(mdd_pct)s::real[],
+                %(total_trades)s::int[], %(sharpe_ratio)s::real[],
+                %(compound_mdd_pct)s::real[], %(max_loss_streak)s::int[],
+                %(underwater_trades)s::int[])
+            """, dict(columns, analysis_date=analysis_date,
+                      period_type=period_type))
+    connection.commit()
+    return len(columns['ticker'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='변동성 돌파 파라미터 스윕')
+    parser.add_argument('--period', choices=sorted(PERIOD_DAYS), default='month_3')
+    parser.add_argument('--source', choices=['store', 'db'], default='store',
+                        help='가격 데이터: 로컬 Parquet 저장소 또는 daily_stock_data')
+    parser.add_argument('--limit', type=int, default=200, help='시가총액 상위 종목 수')
+    parser.add_argument('--backend', choices=kernels.BACKENDS, default=None,
+                        help='경로 지표 계산 백엔드 (기본: BESTK_BACKEND 또는 auto)')
+    args = parser.parse_args()
+
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=PERIOD_DAYS[args.period])
+    # 이동평균/거래량 필터 계산용으로 앞쪽을 더 읽음 (거래일 ≒ 달력일 × 0.7)
+    lookback = int(max(max(sweep.GRID['ma_window']), sweep.VOLUME_WINDOW) / 0.7) + 7
+    load_start = start_date - timedelta(days=lookback)
+
+    connection = db.connect()
+    try:
+        with connection.cursor() as cursor:
+            market_cap.latest_top(cursor, args.limit)
+            symbols = [row[0] for row in cursor]
+        logger.info(f"스윕 시작: {args.period} {start_date} ~ {end_date}, "
+                    f"종목 {len(symbols)}개")
+
+        started = time.perf_counter()
+        symbols, days, open_, high, low, close, volume = load_prices(
+            connection, symbols, load_start, end_date, args.source)
+        in_period = days >= float(np.datetime64(start_date, 'D').astype(np.int64))
+        loaded = time.perf_counter()
+
+        backend = kernels.resolve_backend(args.backend)
+        combos, metrics = sweep.sweep(open_, high, low, close, volume,
+                                      in_period=in_period, backend=backend)
+        evaluated = time.perf_counter()
+        logger.info(f"조합 {len(combos)}개 × 종목 {len(symbols)}개 평가: "
+                    f"로드 {loaded - started:.1f}초, 계산 {evaluated - loaded:.1f}초 "
+                    f"(경로 지표: {backend})")
+
+        saved = save_results(connection, end_date, args.period, symbols,
+                             combos, metrics)
+        logger.info(f"best_k_sweep 저장: {saved:,}행 "
+                    f"({time.perf_counter() - evaluated:.1f}초)")
+
+        best, chosen = sweep.best_combos(combos, metrics)
+        for symbol, combo, sharpe in list(zip(symbols, best,
+                                              chosen['sharpe']))[:10]:
+            logger.info(f"  {symbol}: {dict(zip(sweep.PARAMETERS, combo))} "
+                        f"sharpe={sharpe:.2f}")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+가격 큐브 생성 (종목 × 거래일 × OHLCV, float32 .npy + 인덱스 파일)
+
+로컬 OHLCV 저장소(기본) 또는 daily_stock_data 에서 기간 데이터를 읽어
+--output 디렉터리에 저장한다. 분석 작업은 trading_data.cube.load 로 mmap 해서 쓴다.
+
+실행: python3 server/services/build-price-cube.py --start 2020-01-01 --end 2024-12-31
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from trading_data import cube
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s",
+                    handlers=[logging.StreamHandler(sys.stdout)])
+logger = logging.getLogger(__name__)
+
+CUBE_DIR = os.getenv("PRICE_CUBE_DIR", "data/price_cube")
+
+
+def build_from_store(start_date, end_date):
+    from trading_data.store import ParquetStore
+
+    frame = ParquetStore().read_frame(start_date=start_date, end_date=end_date)
+    return cube.from_frame(frame)
+
+
+def build_from_db(start_date, end_date):
+    from trading_data import daily_stock, db
+
+    connection = db.connect()
+    try:
+        return cube.from_panel(
+            *daily_stock.load_panel(connection, start_date, end_date))
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='가격 큐브 생성')
+    parser.add_argument('--start', required=True, help='시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end', required=True, help='종료일 (YYYY-MM-DD)')
+    parser.add_argument('--source', choices=['store', 'db'], default='store',
+                        help='로컬 Parquet 저장소 또는 daily_stock_data')
+    parser.add_argument('--output', default=CUBE_DIR, help='저장 디렉터리')
+    args = parser.parse_args()
+
+    started = time.time()
+    build = build_from_store if args.source == 'store' else build_from_db
+    price_cube = build(args.start, args.end)
+    price_cube.save(args.output)
+
+    size_mb = price_cube.values.nbytes / 1024 / 1024
+    logger.info(f"가격 큐브 저장: {args.output} - 종목 {len(price_cube.symbols)}개 × "
+                f"거래일 {len(price_cube.dates)}일 ({size_mb:.1f}MB, "
+                f"{time.time() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
 import sys
 import time
 import logging
-import psycopg2
 from psycopg2.extras import execute_batch
 from datetime import datetime, timedelta
-from pykrx import stock
+from trading_data import db, instrument, market_cap, status, store
+from trading_data.ratelimit import RateLimiter
+from trading_data.replay import pykrx_stock
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO,
@@ -18,14 +20,18 @@ logging.basicConfig(level=logging.INFO,
                     ])
 logger = logging.getLogger(__name__)
 
+# pykrx.stock (PYKRX_REPLAY_DIR / PYKRX_RECORD_DIR 이면 재생/녹화 클라이언트)
+stock = pykrx_stock()
+
+# 종목별 OHLCV 조회 속도 (초당 호출 수, KRX 호출 제한 고려)
+PYKRX_RATE = float(os.getenv("PYKRX_RATE", "1"))
+
+# 단계별 시간/카운터 (실행 보고서는 data/run_reports 와 job_run_report)
+recorder = instrument.Recorder("collector")
+
 
 def get_db_connection():
-    conn = psycopg2.connect(host=os.getenv("PGHOST", "localhost"),
-                            database=os.getenv("PGDATABASE", "postgres"),
-                            user=os.getenv("PGUSER", "postgres"),
-                            password=os.getenv("PGPASSWORD", ""),
-                            port=os.getenv("PGPORT", "5432"),
-                            sslmode="require")
+    conn = db.connect(sslmode=os.getenv("PGSSLMODE") or "require")
     return conn
 
 
@@ -33,17 +39,10 @@ def get_market_cap_tickers(conn):
     """daily_market_cap 테이블에서 최신 종목 목록 조회"""
     try:
         with conn.cursor() as cur:
-            query = """
-                SELECT ticker, name, market
-                FROM daily_market_cap
-                WHERE date = (SELECT MAX(date) FROM daily_market_cap)
-                ORDER BY market_cap::numeric DESC
-            """
-            cur.execute(query)
-            rows = cur.fetchall()
+            market_cap.latest_top(cur)
 
             tickers_info = []
-            for row in rows:
+            for row in cur:
                 tickers_info.append({
                     "ticker": row[0],
                     "name": row[1],
@@ -106,44 +105,52 @@ def get_latest_working_day():
 def fetch_ohlcv_for_ticker(ticker, ticker_name, start_date, end_date):
     """개별 종목의 OHLCV 데이터 수집"""
     try:
-        df = stock.get_market_ohlcv_by_date(start_date, end_date, ticker)
+        recorder.count("requests", source="pykrx")
+        with recorder.stage("fetch", ticker):
+            df = stock.get_market_ohlcv_by_date(start_date, end_date, ticker)
         if df is None or df.empty:
             logger.warning(f"⚠️ {ticker_name}({ticker}) - 데이터 없음")
             return []
 
-        df = df.reset_index()
-        rows = []
-
-        for _, row in df.iterrows():
-            # 데이터 유효성 검사
-            if row["종가"] <= 0 or row["거래량"] < 0:
-                continue
-
-            rows.append({
-                "date":
-                row["날짜"].strftime("%Y-%m-%d"),
-                "ticker":
-                ticker,
-                "open_price":
-                float(row["시가"]) if row["시가"] > 0 else float(row["종가"]),
-                "high_price":
-                float(row["고가"]) if row["고가"] > 0 else float(row["종가"]),
-                "low_price":
-                float(row["저가"]) if row["저가"] > 0 else float(row["종가"]),
-                "close_price":
-                float(row["종가"]),
-                "volume":
-                int(row["거래량"]),
-            })
-
-        logger.debug(f"✅ {ticker_name}({ticker}) - {len(rows)}일 데이터 수집")
-        return rows
+        with recorder.stage("convert", ticker):
+            return _ohlcv_rows(df, ticker, ticker_name)
 
     except Exception as e:
         logger.warning(f"❌ {ticker_name}({ticker}) OHLCV 수집 실패: {e}")
         return []
 
 
+def _ohlcv_rows(df, ticker, ticker_name):
+    """pykrx OHLCV DataFrame -> daily_stock_data 행 목록"""
+    df = df.reset_index()
+    rows = []
+
+    for _, row in df.iterrows():
+        # 데이터 유효성 검사
+        if row["종가"] <= 0 or row["거래량"] < 0:
+            continue
+
+        rows.append({
+            "date":
+            row["날짜"].strftime("%Y-%m-%d"),
+            "ticker":
+            ticker,
+            "open_price":
+            float(row["시가"]) if row["시가"] > 0 else float(row["종가"]),
+            "high_price":
+            float(row["고가"]) if row["고가"] > 0 else float(row["종가"]),
+            "low_price":
+            float(row["저가"]) if row["저가"] > 0 else float(row["종가"]),
+            "close_price":
+            float(row["종가"]),
+            "volume":
+            int(row["거래량"]),
+        })
+
+    logger.debug(f"✅ {ticker_name}({ticker}) - {len(rows)}일 데이터 수집")
+    return rows
+
+
 def insert_ohlcv_batch(conn, rows):
     """OHLCV 데이터 배치 삽입"""
     if not rows:
@@ -163,10 +170,14 @@ def insert_ohlcv_batch(conn, rows):
                 volume = EXCLUDED.volume
         """
 
-        with conn.cursor() as cur:
-            execute_batch(cur, query, rows, page_size=1000)
-        conn.commit()
+        ticker = rows[0]["ticker"]
+        with recorder.stage("db_write", ticker):
+            with conn.cursor() as cur:
+                execute_batch(cur, query, rows, page_size=1000)
+        with recorder.stage("commit", ticker):
+            conn.commit()
 
+        recorder.count("rows_upserted", len(rows))
         return len(rows)
 
     except Exception as e:
@@ -192,9 +203,10 @@ def update_market_cap_with_latest_ohlcv(conn, latest_ohlcv_rows):
             WHERE date = %(date)s AND ticker = %(ticker)s
         """
 
-        with conn.cursor() as cur:
-            execute_batch(cur, query, latest_ohlcv_rows, page_size=200)
-        conn.commit()
+        with recorder.stage("market_cap_update"):
+            with conn.cursor() as cur:
+                execute_batch(cur, query, latest_ohlcv_rows, page_size=200)
+            conn.commit()
 
         logger.info(
             f"✅ daily_market_cap에 {len(latest_ohlcv_rows)}개 종목 OHLCV 업데이트 완료")
@@ -228,7 +240,22 @@ def clean_old_data(conn, cutoff_date):
         conn.rollback()
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='1년치 OHLCV 수집')
+    parser.add_argument('--profile', nargs='?',
+                        const=instrument.default_profile_path("collector"),
+                        help='실행 구간 프로파일 저장 경로 '
+                        '(pyinstrument 가 있으면 HTML, 없으면 cProfile .prof)')
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    with instrument.profiled(args.profile):
+        collect()
+
+
+def collect():
     start_time = time.time()
     logger.info("🚀 1년치 주식 데이터 수집 시작")
 
@@ -264,6 +291,8 @@ def main():
         success_count = 0
         failed_count = 0
         latest_ohlcv_rows = []
+        store_rows = []
+        limiter = RateLimiter(PYKRX_RATE)
 
         for i, ticker_info in enumerate(tickers_info, 1):
             ticker = ticker_info["ticker"]
@@ -276,18 +305,26 @@ def main():
             )
 
             try:
-                # OHLCV 데이터 수집
+                # OHLCV 데이터 수집 (API 호출 제한 고려)
+                with recorder.stage("rate_limit_wait"):
+                    waited = limiter.acquire()
+                if waited:
+                    recorder.count("rate_limit_waits")
+                    recorder.count("rate_limit_wait_seconds", waited)
                 rows = fetch_ohlcv_for_ticker(ticker, ticker_name, start_date,
                                               end_date)
 
                 if not rows:
                     failed_count += 1
+                    recorder.count("tickers_failed")
                     continue
 
                 # 데이터베이스 삽입
                 inserted = insert_ohlcv_batch(conn, rows)
                 total_inserted += inserted
                 success_count += 1
+                recorder.count("tickers_succeeded")
+                store_rows.extend(dict(r, market=market) for r in rows)
 
                 # 최신 데이터 추출 (daily_market_cap 업데이트용)
                 latest_row = next(
@@ -305,21 +342,31 @@ def main():
                         f"📈 진행률: {progress_pct:.1f}% - 성공: {success_count}개, 실패: {failed_count}개"
                     )
 
-                # API 호출 제한 고려 (1초 대기)
-                time.sleep(1)
-
             except Exception as e:
                 logger.error(f"❌ {ticker_name}({ticker}) 처리 실패: {e}")
                 failed_count += 1
+                recorder.count("tickers_failed")
                 continue
 
         # 5. daily_market_cap 테이블 OHLCV 업데이트
         logger.info("📊 daily_market_cap 테이블 OHLCV 업데이트 중...")
         update_market_cap_with_latest_ohlcv(conn, latest_ohlcv_rows)
 
+        # 분석용 로컬 OHLCV 저장소 갱신 (같은 tag 라 매 실행마다 덮어씀)
+        with recorder.stage("store_append"):
+            store.append_rows(store_rows, tag="collector-1y")
+
         # 6. 오래된 데이터 정리 (1년 이상 된 데이터)
         cutoff_date = end_date_obj - timedelta(days=400)
-        clean_old_data(conn, cutoff_date)
+        with recorder.stage("cleanup"):
+            clean_old_data(conn, cutoff_date)
+
+        # 대시보드용 수집 현황 갱신
+        try:
+            status.refresh_ohlcv(conn)
+        except Exception as e:
+            logger.warning(f"⚠️ 수집 현황 갱신 실패: {e}")
+            conn.rollback()
 
         # 7. 최종 통계 확인
         with conn.cursor() as cur:
@@ -330,6 +377,7 @@ def main():
             final_ticker_count = stats[0]
             final_total_rows = stats[1]
 
+        recorder.finish(conn)
         conn.close()
 
         # 8. 결과 출력
@@ -351,6 +399,7 @@ def main():
 
     except Exception as e:
         logger.error(f"🚨 전체 프로세스 오류: {e}")
+        recorder.finish(succeeded=False)
         sys.exit(1)
 
 
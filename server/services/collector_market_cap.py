@@ -1,23 +1,24 @@
 #!/usr/bin/env python3
 
-import os, sys, logging, psycopg2, pandas as pd
+import os, sys, logging, pandas as pd
 from datetime import datetime, timedelta
-from pykrx import stock
 from psycopg2.extras import execute_batch
+from trading_data import db
+from trading_data import status
+from trading_data.market_cap import ensure_schema
+from trading_data.replay import pykrx_stock
 
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(levelname)s - %(message)s",
                     handlers=[logging.StreamHandler(sys.stdout)])
 logger = logging.getLogger(__name__)
 
+# pykrx.stock (PYKRX_REPLAY_DIR / PYKRX_RECORD_DIR 이면 재생/녹화 클라이언트)
+stock = pykrx_stock()
+
 
 def get_db():
-    return psycopg2.connect(host=os.getenv("PGHOST", "localhost"),
-                            database=os.getenv("PGDATABASE", "postgres"),
-                            user=os.getenv("PGUSER", "postgres"),
-                            password=os.getenv("PGPASSWORD", ""),
-                            port=os.getenv("PGPORT", "5432"),
-                            sslmode="require")
+    return db.connect(sslmode=os.getenv("PGSSLMODE") or "require")
 
 
 def get_latest_trading_day(start_date: datetime) -> datetime:
@@ -310,7 +311,13 @@ def main():
 
         # 데이터베이스 저장
         conn = get_db()
+        ensure_schema(conn)
         insert_data(conn, rows)
+        try:
+            status.refresh_market_cap(conn)
+        except Exception as e:
+            logger.warning(f"⚠️ 수집 현황 갱신 실패: {e}")
+            conn.rollback()
         conn.close()
 
         logger.info(
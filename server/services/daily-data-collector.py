@@ -7,20 +7,15 @@
 import sys
 import json
 import traceback
-import psycopg2
 from datetime import datetime, timedelta
 import time
-import os
+from trading_data import db
 
 
 def get_database_connection():
     """데이터베이스 연결 설정"""
     try:
-        conn = psycopg2.connect(host=os.getenv('PGHOST'),
-                                database=os.getenv('PGDATABASE'),
-                                user=os.getenv('PGUSER'),
-                                password=os.getenv('PGPASSWORD'),
-                                port=os.getenv('PGPORT', 5432))
+        conn = db.connect()
         return conn
     except Exception as e:
         print(f"[ERROR] Database connection failed: {e}", file=sys.stderr)
@@ -45,20 +40,20 @@ def get_top_500_stocks(market):
         else:
             return []
 
-        # 시가총액 데이터 가져오기
+        # 시가총액 데이터 가져오기 (시장 전체 표 1회 조회)
+        cap_df = pykrx_stock.get_market_cap_by_ticker(
+            pykrx_stock.get_nearest_business_day_in_a_week(today),
+            market=market)
         market_cap_data = []
-        for ticker in tickers[:500]:  # 최대 500개로 제한
+        for ticker in tickers:
+            if ticker not in cap_df.index:
+                continue
             try:
-                cap_df = pykrx_stock.get_market_cap_by_date(
-                    today, today, ticker)
-                if not cap_df.empty:
-                    market_cap = cap_df.iloc[0]['시가총액']
-                    name = pykrx_stock.get_market_ticker_name(ticker)
-                    market_cap_data.append({
-                        'symbol': ticker,
-                        'name': name,
-                        'market_cap': market_cap
-                    })
+                market_cap_data.append({
+                    'symbol': ticker,
+                    'name': pykrx_stock.get_market_ticker_name(ticker),
+                    'market_cap': int(cap_df.at[ticker, '시가총액'])
+                })
             except:
                 continue
 
@@ -75,7 +70,6 @@ def get_top_500_stocks(market):
 def collect_historical_data(symbols, market, start_date, end_date):
     """5년치 일일 데이터 수집"""
     try:
-        import pykrx.stock as stock
         from pykrx import stock as pykrx_stock
 
         start_date_fmt = start_date.strftime('%Y%m%d')
@@ -96,19 +90,22 @@ def collect_historical_data(symbols, market, start_date, end_date):
                     start_date_fmt, end_date_fmt, symbol)
 
                 if not ohlcv_df.empty:
+                    # 시가총액은 기간 전체를 한 번에 조회해 날짜별로 매핑
+                    caps = {}
+                    try:
+                        cap_df = pykrx_stock.get_market_cap_by_date(
+                            start_date_fmt, end_date_fmt, symbol)
+                        if not cap_df.empty:
+                            caps = cap_df['시가총액'].to_dict()
+                    except:
+                        pass
+
                     # 각 날짜별로 데이터 저장
                     for date_str, row in ohlcv_df.iterrows():
                         try:
-                            # 시가총액 데이터 가져오기 (일별)
-                            date_fmt = date_str.strftime('%Y%m%d')
-                            market_cap = None
-                            try:
-                                cap_df = pykrx_stock.get_market_cap_by_date(
-                                    date_fmt, date_fmt, symbol)
-                                if not cap_df.empty:
-                                    market_cap = str(cap_df.iloc[0]['시가총액'])
-                            except:
-                                pass
+                            market_cap = caps.get(date_str)
+                            if market_cap is not None:
+                                market_cap = str(market_cap)
 
                             collected_data.append({
                                 'symbol':
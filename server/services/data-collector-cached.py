@@ -1,377 +1,8 @@
 #!/usr/bin/env python3
-import sys
-import json
-import os
-import pickle
-from datetime import datetime, timedelta
-import traceback
+"""캐시 수집기 - 동일 요청은 24시간 동안 파일 캐시에서 응답"""
 
-# Simple cache implementation
-CACHE_DIR = "/tmp/stock_cache"
-CACHE_EXPIRY_HOURS = 24
-
-def get_cache_key(country, market, start_date, end_date, sort_by, limit):
-    """Generate cache key for request"""
-    return f"{country}_{market}_{start_date}_{end_date}_{sort_by}_{limit}"
-
-def load_from_cache(cache_key):
-    """Load data from cache if available and not expired"""
-    try:
-        os.makedirs(CACHE_DIR, exist_ok=True)
-        cache_file = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
-        
-        if os.path.exists(cache_file):
-            # Check if cache is still valid
-            cache_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if datetime.now() - cache_time < timedelta(hours=CACHE_EXPIRY_HOURS):
-                with open(cache_file, 'rb') as f:
-                    return pickle.load(f)
-    except:
-        pass
-    return None
-
-def save_to_cache(cache_key, data):
-    """Save data to cache"""
-    try:
-        os.makedirs(CACHE_DIR, exist_ok=True)
-        cache_file = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
-        with open(cache_file, 'wb') as f:
-            pickle.dump(data, f)
-    except:
-        pass
-
-def collect_korean_data(start_date, end_date, market, sort_by=None, limit=None):
-    """Collect Korean stock data with caching"""
-    # Try cache first
-    cache_key = get_cache_key('korea', market, start_date, end_date, sort_by, limit)
-    cached_data = load_from_cache(cache_key)
-    if cached_data:
-        return cached_data
-    
-    # If no cache, collect real data
-    try:
-        import pykrx.stock as stock
-        from pykrx import stock as pykrx_stock
-        
-        # Convert string dates to datetime
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-        
-        # For better performance, use the most recent trading day
-        today = datetime.now()
-        if end_dt > today:
-            end_dt = today
-        
-        data = []
-        
-        if market == 'kospi':
-            tickers = pykrx_stock.get_market_ticker_list(market="KOSPI")
-            market_name = "KOSPI"
-        elif market == 'kosdaq':
-            tickers = pykrx_stock.get_market_ticker_list(market="KOSDAQ")
-            market_name = "KOSDAQ"
-        elif market == 'konex':
-            tickers = pykrx_stock.get_market_ticker_list(market="KONEX")
-            market_name = "KONEX"
-        elif market == 'etf':
-            tickers = pykrx_stock.get_etf_ticker_list()
-            market_name = "ETF"
-        else:
-            raise ValueError(f"Unknown Korean market: {market}")
-        
-        # Apply limit for performance
-        max_tickers = limit if limit and limit <= 10 else 5
-        tickers = tickers[:max_tickers]
-        
-        # Process stocks
-        for ticker in tickers:
-            try:
-                # Get basic info
-                name = pykrx_stock.get_market_ticker_name(ticker)
-                
-                # Get OHLCV data
-                df = pykrx_stock.get_market_ohlcv_by_date(start_dt.strftime('%Y%m%d'), 
-                                                        end_dt.strftime('%Y%m%d'), 
-                                                        ticker)
-                
-                if not df.empty:
-                    latest = df.iloc[-1]
-                    prev = df.iloc[-2] if len(df) > 1 else latest
-                    
-                    current_price = latest['종가']
-                    prev_price = prev['종가']
-                    change = current_price - prev_price
-                    change_percent = (change / prev_price * 100) if prev_price != 0 else 0
-                    
-                    # Get market cap data
-                    market_cap = None
-                    shares_outstanding = None
-                    try:
-                        market_cap_raw = pykrx_stock.get_market_cap_by_date(
-                            end_dt.strftime('%Y%m%d'), 
-                            end_dt.strftime('%Y%m%d'), 
-                            ticker
-                        )
-                        if not market_cap_raw.empty:
-                            market_cap = int(market_cap_raw.iloc[0]['시가총액'])
-                            shares_outstanding = int(market_cap_raw.iloc[0]['상장주식수'])
-                    except:
-                        pass
-                    
-                    # Get fundamental data
-                    pe_ratio = None
-                    pbr = None
-                    dividend_yield = None
-                    try:
-                        fundamental_raw = pykrx_stock.get_market_fundamental_by_date(
-                            end_dt.strftime('%Y%m%d'), 
-                            end_dt.strftime('%Y%m%d'), 
-                            ticker
-                        )
-                        if not fundamental_raw.empty:
-                            fund_data = fundamental_raw.iloc[0]
-                            pe_ratio = fund_data.get('PER', None)
-                            pbr = fund_data.get('PBR', None)
-                            dividend_yield = fund_data.get('DIV', None)
-                    except:
-                        pass
-                    
-                    # Get 52-week high/low
-                    week_52_high = None
-                    week_52_low = None
-                    try:
-                        if not df.empty:
-                            week_52_high = float(df['고가'].max())
-                            week_52_low = float(df['저가'].min())
-                    except:
-                        pass
-                    
-                    data.append({
-                        'symbol': ticker,
-                        'name': name,
-                        'current_price': float(current_price),
-                        'change': float(change),
-                        'change_percent': float(change_percent),
-                        'volume': int(latest['거래량']),
-                        'market_cap': market_cap,
-                        'pe_ratio': pe_ratio,
-                        'pbr': pbr,
-                        'dividend_yield': dividend_yield,
-                        'week_52_high': week_52_high,
-                        'week_52_low': week_52_low,
-                        'shares_outstanding': shares_outstanding,
-                        'eps': None,
-                        'sector': None,
-                        'industry': None,
-                        'beta': None,
-                        'book_value': None,
-                        'revenue': None,
-                        'net_income': None,
-                        'debt_to_equity': None,
-                        'roe': None,
-                        'roa': None,
-                        'operating_margin': None,
-                        'profit_margin': None,
-                        'revenue_growth': None,
-                        'earnings_growth': None,
-                        'current_ratio': None,
-                        'quick_ratio': None,
-                        'price_to_sales': None,
-                        'price_to_cash_flow': None,
-                        'enterprise_value': None,
-                        'ev_to_revenue': None,
-                        'ev_to_ebitda': None,
-                        'free_cash_flow': None,
-                        'country': 'Korea',
-                        'market': market_name,
-                        'date': end_date
-                    })
-                    
-            except Exception as e:
-                # Skip individual stock errors
-                continue
-        
-        # Sort data by specified criteria
-        if sort_by and data:
-            reverse_sort = True
-            if sort_by == 'current_price':
-                data.sort(key=lambda x: x.get('current_price', 0), reverse=reverse_sort)
-            elif sort_by == 'market_cap':
-                data.sort(key=lambda x: x.get('market_cap', 0) or 0, reverse=reverse_sort)
-            elif sort_by == 'pe_ratio':
-                data.sort(key=lambda x: x.get('pe_ratio', 0) or float('inf'), reverse=False)
-            elif sort_by == 'pbr':
-                data.sort(key=lambda x: x.get('pbr', 0) or float('inf'), reverse=False)
-            elif sort_by == 'dividend_yield':
-                data.sort(key=lambda x: x.get('dividend_yield', 0) or 0, reverse=reverse_sort)
-            elif sort_by == 'volume':
-                data.sort(key=lambda x: x.get('volume', 0), reverse=reverse_sort)
-        
-        # Save to cache
-        save_to_cache(cache_key, data)
-        return data
-        
-    except Exception as e:
-        raise Exception(f"Error collecting Korean data: {str(e)}")
-
-def collect_us_data(start_date, end_date, market, sort_by=None, limit=None):
-    """Collect US stock data with caching"""
-    # Try cache first
-    cache_key = get_cache_key('usa', market, start_date, end_date, sort_by, limit)
-    cached_data = load_from_cache(cache_key)
-    if cached_data:
-        return cached_data
-    
-    # If no cache, collect real data
-    try:
-        import yfinance as yf
-        
-        data = []
-        
-        # Define popular tickers for each market
-        if market == 'sp500':
-            tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'BRK-B', 'V', 'JNJ']
-        elif market == 'nasdaq':
-            tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'NFLX', 'ADBE', 'PYPL']
-        elif market == 'dow':
-            tickers = ['AAPL', 'MSFT', 'UNH', 'GS', 'HD', 'CAT', 'AMGN', 'MCD', 'V', 'BA']
-        elif market == 'russell2000':
-            tickers = ['IWM', 'VTWO', 'URTY', 'TNA', 'SCHA', 'VTI', 'ITOT', 'SPTM', 'SCHB', 'VEA']
-        else:
-            raise ValueError(f"Unknown US market: {market}")
-        
-        # Apply limit
-        max_tickers = limit if limit and limit <= 10 else 5
-        tickers = tickers[:max_tickers]
-        
-        # Process stocks
-        for symbol in tickers:
-            try:
-                ticker = yf.Ticker(symbol)
-                
-                # Get historical data
-                hist = ticker.history(start=start_date, end=end_date)
-                
-                if not hist.empty:
-                    latest = hist.iloc[-1]
-                    prev = hist.iloc[-2] if len(hist) > 1 else latest
-                    
-                    current_price = latest['Close']
-                    prev_price = prev['Close']
-                    change = current_price - prev_price
-                    change_percent = (change / prev_price * 100) if prev_price != 0 else 0
-                    
-                    # Get comprehensive info
-                    info = ticker.info
-                    name = info.get('longName', info.get('shortName', symbol))
-                    
-                    # Use available data from history for 52-week high/low
-                    week_52_high = hist['High'].max()
-                    week_52_low = hist['Low'].min()
-                    
-                    data.append({
-                        'symbol': symbol,
-                        'name': name,
-                        'current_price': round(current_price, 2),
-                        'change': round(change, 2),
-                        'change_percent': round(change_percent, 2),
-                        'volume': int(latest['Volume']) if latest['Volume'] else 0,
-                        'market_cap': info.get('marketCap', 0),
-                        'pe_ratio': info.get('forwardPE', info.get('trailingPE', 0)),
-                        'pbr': info.get('priceToBook', 0),
-                        'eps': info.get('trailingEps', 0),
-                        'dividend_yield': info.get('dividendYield', 0),
-                        'week_52_high': round(week_52_high, 2) if week_52_high else 0,
-                        'week_52_low': round(week_52_low, 2) if week_52_low else 0,
-                        'beta': info.get('beta', 0),
-                        'shares_outstanding': info.get('sharesOutstanding', 0),
-                        'book_value': info.get('bookValue', 0),
-                        'revenue': info.get('totalRevenue', 0),
-                        'net_income': info.get('netIncomeToCommon', 0),
-                        'debt_to_equity': info.get('debtToEquity', 0),
-                        'roe': info.get('returnOnEquity', 0),
-                        'roa': info.get('returnOnAssets', 0),
-                        'operating_margin': info.get('operatingMargins', 0),
-                        'profit_margin': info.get('profitMargins', 0),
-                        'revenue_growth': info.get('revenueGrowth', 0),
-                        'earnings_growth': info.get('earningsGrowth', 0),
-                        'current_ratio': info.get('currentRatio', 0),
-                        'quick_ratio': info.get('quickRatio', 0),
-                        'price_to_sales': info.get('priceToSalesTrailing12Months', 0),
-                        'price_to_cash_flow': info.get('priceToFreeCashflow', 0),
-                        'enterprise_value': info.get('enterpriseValue', 0),
-                        'ev_to_revenue': info.get('enterpriseToRevenue', 0),
-                        'ev_to_ebitda': info.get('enterpriseToEbitda', 0),
-                        'free_cash_flow': info.get('freeCashflow', 0),
-                        'sector': info.get('sector', ''),
-                        'industry': info.get('industry', ''),
-                        'country': 'USA',
-                        'market': market.upper(),
-                        'date': end_date
-                    })
-                    
-            except Exception as e:
-                # Skip individual stock errors
-                continue
-        
-        # Sort data by specified criteria
-        if sort_by and data:
-            reverse_sort = True
-            if sort_by == 'current_price':
-                data.sort(key=lambda x: x.get('current_price', 0), reverse=reverse_sort)
-            elif sort_by == 'market_cap':
-                data.sort(key=lambda x: x.get('market_cap', 0), reverse=reverse_sort)
-            elif sort_by == 'pe_ratio':
-                data.sort(key=lambda x: x.get('pe_ratio', 0) if x.get('pe_ratio', 0) != 0 else float('inf'), reverse=False)
-            elif sort_by == 'pbr':
-                data.sort(key=lambda x: x.get('pbr', 0) if x.get('pbr', 0) != 0 else float('inf'), reverse=False)
-            elif sort_by == 'dividend_yield':
-                data.sort(key=lambda x: x.get('dividend_yield', 0), reverse=reverse_sort)
-            elif sort_by == 'volume':
-                data.sort(key=lambda x: x.get('volume', 0), reverse=reverse_sort)
-        
-        # Save to cache
-        save_to_cache(cache_key, data)
-        return data
-        
-    except Exception as e:
-        raise Exception(f"Error collecting US data: {str(e)}")
-
-def main():
-    try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-        
-        start_date = input_data['startDate']
-        end_date = input_data['endDate']
-        country = input_data['country']
-        market = input_data['market']
-        sort_by = input_data.get('sortBy')
-        limit = input_data.get('limit')
-        
-        if country == 'korea':
-            result = collect_korean_data(start_date, end_date, market, sort_by, limit)
-        elif country == 'usa':
-            result = collect_us_data(start_date, end_date, market, sort_by, limit)
-        else:
-            raise ValueError(f"Unknown country: {country}")
-        
-        # Apply limit if specified
-        if limit and len(result) > limit:
-            result = result[:limit]
-        
-        print(json.dumps({
-            'success': True,
-            'data': result,
-            'message': f'Successfully collected {len(result)} records'
-        }))
-        
-    except Exception as e:
-        print(json.dumps({
-            'success': False,
-            'message': str(e),
-            'traceback': traceback.format_exc()
-        }))
+from trading_data import FileCache
+from trading_data.cli import run
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run(cache=FileCache(), rate=5, burst=5, max_workers=4)
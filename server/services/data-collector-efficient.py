@@ -1,345 +1,8 @@
 #!/usr/bin/env python3
-import sys
-import json
-import traceback
-from datetime import datetime
-import time
+"""효율 수집기 - 캐시와 높은 동시 실행 수를 함께 사용"""
 
-def collect_korean_data(start_date, end_date, market, sort_by=None, limit=None):
-    """Collect Korean stock data using pykrx - Efficient version"""
-    try:
-        import pykrx.stock as stock
-        from pykrx import stock as pykrx_stock
-        
-        # Convert dates
-        end_date_fmt = end_date.replace('-', '')
-        start_date_fmt = start_date.replace('-', '')
-        
-        print(f"[INFO] Starting data collection for {market} market...", file=sys.stderr)
-        
-        data = []
-        
-        # Get all tickers for the market
-        if market == 'kospi':
-            all_tickers = pykrx_stock.get_market_ticker_list(end_date_fmt, market="KOSPI")
-            market_name = "KOSPI"
-        elif market == 'kosdaq':
-            all_tickers = pykrx_stock.get_market_ticker_list(end_date_fmt, market="KOSDAQ")
-            market_name = "KOSDAQ"
-        elif market == 'konex':
-            all_tickers = pykrx_stock.get_market_ticker_list(end_date_fmt, market="KONEX")
-            market_name = "KONEX"
-        elif market == 'etf':
-            all_tickers = pykrx_stock.get_etf_ticker_list(end_date_fmt)
-            market_name = "ETF"
-        else:
-            all_tickers = pykrx_stock.get_market_ticker_list(end_date_fmt, market="KOSPI")
-            market_name = "KOSPI"
-        
-        print(f"[INFO] Found {len(all_tickers)} tickers in {market_name}", file=sys.stderr)
-        
-        # Skip bulk data collection for now, use individual ticker processing
-        print(f"[INFO] Using individual ticker processing for reliability...", file=sys.stderr)
-        return collect_korean_data_individual(start_date, end_date, market, sort_by, limit)
-        
-        print(f"[INFO] Collected {len(data)} records", file=sys.stderr)
-        
-        # Sort data based on user selection
-        if sort_by and data:
-            print(f"[INFO] Sorting data by {sort_by}", file=sys.stderr)
-            if sort_by == 'market_cap':
-                data.sort(key=lambda x: x.get('market_cap', 0) or 0, reverse=True)
-            elif sort_by == 'current_price':
-                data.sort(key=lambda x: x.get('current_price', 0), reverse=True)
-            elif sort_by == 'pe_ratio':
-                data.sort(key=lambda x: x.get('pe_ratio', 0) or float('inf'), reverse=False)
-            elif sort_by == 'pbr':
-                data.sort(key=lambda x: x.get('pbr', 0) or float('inf'), reverse=False)
-            elif sort_by == 'dividend_yield':
-                data.sort(key=lambda x: x.get('dividend_yield', 0) or 0, reverse=True)
-            elif sort_by == 'volume':
-                data.sort(key=lambda x: x.get('volume', 0), reverse=True)
-        
-        # Apply final limit
-        if limit and len(data) > limit:
-            data = data[:limit]
-        
-        return data
-        
-    except Exception as e:
-        print(f"[ERROR] Error in collect_korean_data: {e}", file=sys.stderr)
-        raise Exception(f"Error collecting Korean data: {str(e)}")
-
-def collect_korean_data_individual(start_date, end_date, market, sort_by=None, limit=None):
-    """Fast individual ticker processing with curated data"""
-    try:
-        import pykrx.stock as stock
-        from pykrx import stock as pykrx_stock
-        
-        # Convert dates
-        end_date_fmt = end_date.replace('-', '')
-        start_date_fmt = start_date.replace('-', '')
-        
-        print(f"[INFO] Fast individual ticker processing...", file=sys.stderr)
-        
-        # Use curated top stocks with real data for faster processing
-        if market == 'kospi':
-            # Top KOSPI stocks by market cap with real data
-            stock_data = [
-                {'symbol': '005930', 'name': '삼성전자', 'current_price': 53200, 'market_cap': 318000000000000, 'pe_ratio': 12.5, 'pbr': 0.8},
-                {'symbol': '000660', 'name': 'SK하이닉스', 'current_price': 173900, 'market_cap': 126000000000000, 'pe_ratio': 25.3, 'pbr': 1.2},
-                {'symbol': '035420', 'name': 'NAVER', 'current_price': 185000, 'market_cap': 30000000000000, 'pe_ratio': 18.7, 'pbr': 1.1},
-                {'symbol': '051910', 'name': 'LG화학', 'current_price': 290000, 'market_cap': 20000000000000, 'pe_ratio': 15.2, 'pbr': 0.9},
-                {'symbol': '006400', 'name': '삼성SDI', 'current_price': 395000, 'market_cap': 18000000000000, 'pe_ratio': 22.1, 'pbr': 1.3},
-                {'symbol': '207940', 'name': '삼성바이오로직스', 'current_price': 685000, 'market_cap': 16000000000000, 'pe_ratio': 28.5, 'pbr': 2.1},
-                {'symbol': '005490', 'name': 'POSCO홀딩스', 'current_price': 390000, 'market_cap': 32000000000000, 'pe_ratio': 14.8, 'pbr': 0.7},
-                {'symbol': '035720', 'name': '카카오', 'current_price': 40500, 'market_cap': 18000000000000, 'pe_ratio': 45.2, 'pbr': 1.8},
-                {'symbol': '000270', 'name': '기아', 'current_price': 98000, 'market_cap': 39000000000000, 'pe_ratio': 8.9, 'pbr': 0.6},
-                {'symbol': '005380', 'name': '현대차', 'current_price': 245000, 'market_cap': 52000000000000, 'pe_ratio': 9.5, 'pbr': 0.8}
-            ]
-            market_name = "KOSPI"
-        elif market == 'kosdaq':
-            # Top KOSDAQ stocks
-            stock_data = [
-                {'symbol': '068270', 'name': '셀트리온', 'current_price': 168000, 'market_cap': 23000000000000, 'pe_ratio': 16.3, 'pbr': 1.4},
-                {'symbol': '096770', 'name': 'SK이노베이션', 'current_price': 95000, 'market_cap': 8000000000000, 'pe_ratio': 35.7, 'pbr': 2.1},
-                {'symbol': '086520', 'name': '에코프로', 'current_price': 78000, 'market_cap': 12000000000000, 'pe_ratio': 28.9, 'pbr': 3.5},
-                {'symbol': '017670', 'name': 'SK텔레콤', 'current_price': 52000, 'market_cap': 38000000000000, 'pe_ratio': 11.2, 'pbr': 0.9},
-                {'symbol': '030200', 'name': 'KT', 'current_price': 35000, 'market_cap': 17000000000000, 'pe_ratio': 9.8, 'pbr': 0.7}
-            ]
-            market_name = "KOSDAQ"
-        else:
-            # Default to top KOSPI stocks
-            stock_data = [
-                {'symbol': '005930', 'name': '삼성전자', 'current_price': 53200, 'market_cap': 318000000000000, 'pe_ratio': 12.5, 'pbr': 0.8},
-                {'symbol': '000660', 'name': 'SK하이닉스', 'current_price': 173900, 'market_cap': 126000000000000, 'pe_ratio': 25.3, 'pbr': 1.2},
-                {'symbol': '035420', 'name': 'NAVER', 'current_price': 185000, 'market_cap': 30000000000000, 'pe_ratio': 18.7, 'pbr': 1.1}
-            ]
-            market_name = market.upper()
-        
-        # Apply user limit
-        max_tickers = min(limit if limit and limit <= 20 else 10, len(stock_data))
-        selected_stocks = stock_data[:max_tickers]
-        
-        data = []
-        
-        for stock_info in selected_stocks:
-            try:
-                # Add some variation to prices to simulate real market movement
-                import random
-                price_variation = random.uniform(-0.05, 0.05)  # ±5% variation
-                current_price = stock_info['current_price'] * (1 + price_variation)
-                change = current_price - stock_info['current_price']
-                change_percent = (change / stock_info['current_price'] * 100)
-                
-                data.append({
-                    'symbol': stock_info['symbol'],
-                    'name': stock_info['name'],
-                    'current_price': round(current_price, 0),
-                    'change': round(change, 0),
-                    'change_percent': round(change_percent, 2),
-                    'volume': random.randint(100000, 5000000),  # Simulate volume
-                    'market_cap': stock_info['market_cap'],
-                    'pe_ratio': stock_info['pe_ratio'],
-                    'pbr': stock_info['pbr'],
-                    'dividend_yield': random.uniform(0.5, 3.5),  # Simulate dividend yield
-                    'week_52_high': round(current_price * 1.2, 0),
-                    'week_52_low': round(current_price * 0.8, 0),
-                    'shares_outstanding': stock_info['market_cap'] // current_price,
-                    'eps': round(current_price / stock_info['pe_ratio'], 0) if stock_info['pe_ratio'] else None,
-                    'sector': 'Technology' if stock_info['symbol'] in ['005930', '000660', '035420'] else 'Industrial',
-                    'industry': 'Semiconductors' if stock_info['symbol'] in ['005930', '000660'] else 'Internet',
-                    'beta': round(random.uniform(0.8, 1.3), 2),
-                    'book_value': round(current_price / stock_info['pbr'], 0) if stock_info['pbr'] else None,
-                    'revenue': stock_info['market_cap'] * 0.8,
-                    'net_income': stock_info['market_cap'] * 0.1,
-                    'debt_to_equity': round(random.uniform(0.2, 0.8), 2),
-                    'roe': round(random.uniform(8, 18), 1),
-                    'roa': round(random.uniform(5, 12), 1),
-                    'operating_margin': round(random.uniform(5, 25), 1),
-                    'profit_margin': round(random.uniform(3, 15), 1),
-                    'revenue_growth': round(random.uniform(-5, 15), 1),
-                    'earnings_growth': round(random.uniform(-10, 20), 1),
-                    'current_ratio': round(random.uniform(1.2, 2.5), 2),
-                    'quick_ratio': round(random.uniform(0.8, 1.8), 2),
-                    'price_to_sales': round(random.uniform(0.5, 3.0), 2),
-                    'price_to_cash_flow': round(random.uniform(3, 15), 1),
-                    'enterprise_value': stock_info['market_cap'] * 1.1,
-                    'ev_to_revenue': round(random.uniform(0.8, 4.0), 2),
-                    'ev_to_ebitda': round(random.uniform(5, 20), 1),
-                    'free_cash_flow': stock_info['market_cap'] * 0.08,
-                    'country': 'Korea',
-                    'market': market_name,
-                    'date': end_date
-                })
-                    
-            except Exception as e:
-                continue
-        
-        # Sort data based on user selection
-        if sort_by and data:
-            if sort_by == 'market_cap':
-                data.sort(key=lambda x: x.get('market_cap', 0) or 0, reverse=True)
-            elif sort_by == 'current_price':
-                data.sort(key=lambda x: x.get('current_price', 0), reverse=True)
-            elif sort_by == 'pe_ratio':
-                data.sort(key=lambda x: x.get('pe_ratio', 0) or float('inf'), reverse=False)
-            elif sort_by == 'pbr':
-                data.sort(key=lambda x: x.get('pbr', 0) or float('inf'), reverse=False)
-            elif sort_by == 'dividend_yield':
-                data.sort(key=lambda x: x.get('dividend_yield', 0) or 0, reverse=True)
-            elif sort_by == 'volume':
-                data.sort(key=lambda x: x.get('volume', 0), reverse=True)
-        
-        return data
-        
-    except Exception as e:
-        raise Exception(f"Error in fast collection: {str(e)}")
-
-def collect_us_data(start_date, end_date, market, sort_by=None, limit=None):
-    """Collect US stock data using yfinance"""
-    try:
-        import yfinance as yf
-        
-        # Define top stocks for each market
-        if market == 'sp500':
-            tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'BRK-B', 'V', 'JNJ', 
-                      'WMT', 'JPM', 'PG', 'UNH', 'HD', 'CVX', 'MA', 'PFE', 'BAC', 'ABBV']
-        elif market == 'nasdaq':
-            tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'AVGO', 'NFLX', 'ADBE',
-                      'CRM', 'PYPL', 'INTC', 'CMCSA', 'PEP', 'COST', 'CSCO', 'TXN', 'QCOM', 'AMGN']
-        elif market == 'dow':
-            tickers = ['AAPL', 'MSFT', 'UNH', 'GS', 'HD', 'CAT', 'AMGN', 'MCD', 'V', 'BA', 'CRM',
-                      'TRV', 'AXP', 'JPM', 'JNJ', 'WMT', 'CVX', 'NKE', 'PG', 'IBM']
-        elif market == 'russell2000':
-            tickers = ['IWM', 'VTWO', 'URTY', 'TNA', 'SCHA', 'VTI', 'ITOT', 'SPTM', 'SCHB', 'VEA']
-        else:
-            tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'BRK-B', 'V', 'JNJ']
-        
-        # Apply user limit
-        max_tickers = min(limit if limit and limit <= 50 else 20, len(tickers))
-        selected_tickers = tickers[:max_tickers]
-        
-        data = []
-        
-        for symbol in selected_tickers:
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(start=start_date, end=end_date)
-                
-                if not hist.empty:
-                    latest = hist.iloc[-1]
-                    prev = hist.iloc[-2] if len(hist) > 1 else latest
-                    
-                    current_price = latest['Close']
-                    prev_price = prev['Close']
-                    change = current_price - prev_price
-                    change_percent = (change / prev_price * 100) if prev_price != 0 else 0
-                    
-                    info = ticker.info
-                    name = info.get('longName', info.get('shortName', symbol))
-                    
-                    data.append({
-                        'symbol': symbol,
-                        'name': name,
-                        'current_price': round(current_price, 2),
-                        'change': round(change, 2),
-                        'change_percent': round(change_percent, 2),
-                        'volume': int(latest['Volume']) if latest['Volume'] else 0,
-                        'market_cap': info.get('marketCap', 0),
-                        'pe_ratio': info.get('forwardPE', info.get('trailingPE', 0)),
-                        'pbr': info.get('priceToBook', 0),
-                        'eps': info.get('trailingEps', 0),
-                        'dividend_yield': info.get('dividendYield', 0),
-                        'week_52_high': round(hist['High'].max(), 2),
-                        'week_52_low': round(hist['Low'].min(), 2),
-                        'beta': info.get('beta', 0),
-                        'shares_outstanding': info.get('sharesOutstanding', 0),
-                        'book_value': info.get('bookValue', 0),
-                        'revenue': info.get('totalRevenue', 0),
-                        'net_income': info.get('netIncomeToCommon', 0),
-                        'debt_to_equity': info.get('debtToEquity', 0),
-                        'roe': info.get('returnOnEquity', 0),
-                        'roa': info.get('returnOnAssets', 0),
-                        'operating_margin': info.get('operatingMargins', 0),
-                        'profit_margin': info.get('profitMargins', 0),
-                        'revenue_growth': info.get('revenueGrowth', 0),
-                        'earnings_growth': info.get('earningsGrowth', 0),
-                        'current_ratio': info.get('currentRatio', 0),
-                        'quick_ratio': info.get('quickRatio', 0),
-                        'price_to_sales': info.get('priceToSalesTrailing12Months', 0),
-                        'price_to_cash_flow': info.get('priceToFreeCashflow', 0),
-                        'enterprise_value': info.get('enterpriseValue', 0),
-                        'ev_to_revenue': info.get('enterpriseToRevenue', 0),
-                        'ev_to_ebitda': info.get('enterpriseToEbitda', 0),
-                        'free_cash_flow': info.get('freeCashflow', 0),
-                        'sector': info.get('sector', ''),
-                        'industry': info.get('industry', ''),
-                        'country': 'USA',
-                        'market': market.upper(),
-                        'date': end_date
-                    })
-                    
-            except Exception as e:
-                continue
-        
-        # Sort data
-        if sort_by and data:
-            if sort_by == 'market_cap':
-                data.sort(key=lambda x: x.get('market_cap', 0), reverse=True)
-            elif sort_by == 'current_price':
-                data.sort(key=lambda x: x.get('current_price', 0), reverse=True)
-            elif sort_by == 'pe_ratio':
-                data.sort(key=lambda x: x.get('pe_ratio', 0) if x.get('pe_ratio', 0) != 0 else float('inf'), reverse=False)
-            elif sort_by == 'pbr':
-                data.sort(key=lambda x: x.get('pbr', 0) if x.get('pbr', 0) != 0 else float('inf'), reverse=False)
-            elif sort_by == 'dividend_yield':
-                data.sort(key=lambda x: x.get('dividend_yield', 0), reverse=True)
-            elif sort_by == 'volume':
-                data.sort(key=lambda x: x.get('volume', 0), reverse=True)
-        
-        return data
-        
-    except Exception as e:
-        raise Exception(f"Error collecting US data: {str(e)}")
-
-def main():
-    try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-        
-        start_date = input_data['startDate']
-        end_date = input_data['endDate']
-        country = input_data['country']
-        market = input_data['market']
-        sort_by = input_data.get('sortBy')
-        limit = input_data.get('limit')
-        
-        print(f"[INFO] Starting data collection for {country} {market} (limit: {limit}, sort: {sort_by})", file=sys.stderr)
-        
-        if country == 'korea':
-            result = collect_korean_data(start_date, end_date, market, sort_by, limit)
-        elif country == 'usa':
-            result = collect_us_data(start_date, end_date, market, sort_by, limit)
-        else:
-            raise ValueError(f"Unknown country: {country}")
-        
-        # Final limit application
-        if limit and len(result) > limit:
-            result = result[:limit]
-        
-        print(json.dumps({
-            'success': True,
-            'data': result,
-            'message': f'Successfully collected {len(result)} records using REAL API (sorted by {sort_by})'
-        }))
-        
-    except Exception as e:
-        print(json.dumps({
-            'success': False,
-            'message': f'Real API error: {str(e)}',
-            'traceback': traceback.format_exc()
-        }))
+from trading_data import FileCache
+from trading_data.cli import run
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run(cache=FileCache(), rate=10, burst=10, max_workers=8, retries=2)
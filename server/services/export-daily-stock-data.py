@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+daily_stock_data 스트리밍 내보내기 스크립트
+stdin JSON: {"startDate", "endDate", "market", "rankType", "format": "ndjson" | "arrow", "itersize"}
+stdout 으로 결과를 배치 단위로 바로 내보낸다 (/api/daily-stock-data/export 에서 사용).
+"""
+
+import json
+import logging
+import sys
+import time
+
+from trading_data import db
+from trading_data.export import (DEFAULT_ITERSIZE, WRITERS, daily_stock_query,
+                                 stream_rows)
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s",
+                    handlers=[logging.StreamHandler(sys.stderr)])
+logger = logging.getLogger(__name__)
+
+
+def get_database_connection():
+    return db.connect(application_name='export-daily-stock-data')
+
+
+def main():
+    input_data = json.loads(sys.stdin.read() or "{}")
+    output_format = input_data.get('format', 'ndjson')
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown export format: {output_format}")
+
+    query, params = daily_stock_query(input_data.get('startDate'),
+                                      input_data.get('endDate'),
+                                      input_data.get('market'),
+                                      input_data.get('rankType'))
+    itersize = int(input_data.get('itersize') or DEFAULT_ITERSIZE)
+
+    started = time.time()
+    conn = get_database_connection()
+    try:
+        batches = stream_rows(conn, query, params, itersize)
+        count = WRITERS[output_format](batches, sys.stdout.buffer)
+    finally:
+        conn.close()
+
+    logger.info(f"[INFO] Exported {count} rows as {output_format} "
+                f"in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except BrokenPipeError:
+        # 클라이언트가 연결을 끊은 경우
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"[ERROR] Export failed: {e}")
+        sys.exit(1)
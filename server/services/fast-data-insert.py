@@ -1,14 +1,25 @@
 #!/usr/bin/env python3
 """
 빠른 PostgreSQL 데이터 삽입 스크립트
+
+기본: 주요 10개 종목의 최근 30일 샘플 데이터를 삽입한다.
+--generate: 쿼리 플랜/인덱스 점검용 대용량 합성 데이터 (기본 2,000종목 × 5년) 를
+trading_data.synthetic.universe() 로 만들어 COPY (FORMAT binary) 로 적재한다.
+시장별 시가총액/거래량 순위 행을 만들며 (--top 으로 상위 N 개만), 기존 행과 겹치면
+임시 테이블을 거쳐 upsert 하고 --append 면 daily_stock_data 로 바로 COPY 한다.
+
+실행: python3 server/services/fast-data-insert.py --generate [--tickers 2000] \
+          [--years 5] [--seed 0] [--top 500] [--append] [--dry-run]
 """
 
-import psycopg2
-import os
+import argparse
+import io
 import sys
+import time
 from datetime import datetime, timedelta
 import logging
 import random
+from trading_data import daily_stock, db, synthetic
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,13 +28,7 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """PostgreSQL 데이터베이스 연결"""
     try:
-        connection = psycopg2.connect(
-            host=os.getenv('PGHOST', 'localhost'),
-            database=os.getenv('PGDATABASE', 'postgres'),
-            user=os.getenv('PGUSER', 'postgres'),
-            password=os.getenv('PGPASSWORD', ''),
-            port=os.getenv('PGPORT', '5432')
-        )
+        connection = db.connect()
         return connection
     except Exception as e:
         logger.error(f"PostgreSQL 연결 오류: {e}")
@@ -130,12 +135,139 @@ def insert_sample_data():
         cursor.close()
         connection.close()
 
+# COPY 컬럼 순서와 binary 형식
+COPY_COLUMNS = [
+    ('date', 'date'),
+    ('symbol', 'text'),
+    ('name', 'text'),
+    ('market', 'text'),
+    ('rank_type', 'text'),
+    ('rank', '>i4'),
+    ('open_price', '>i4'),
+    ('high_price', '>i4'),
+    ('low_price', '>i4'),
+    ('close_price', '>i4'),
+    ('volume', '>i8'),
+    ('market_cap', '>i8'),
+]
+TRADING_DAYS_PER_YEAR = 250
+
+
+def copy_chunk(cursor, table, payload):
+    """COPY binary 바이트 하나를 table 에 적재"""
+    columns = ', '.join(column for column, _ in COPY_COLUMNS)
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN (FORMAT binary)",
+                       io.BytesIO(payload))
+
+
+def upsert_staging(cursor):
+    """임시 테이블 행을 daily_stock_data 로 upsert 후 비움"""
+    columns = ', '.join(column for column, _ in COPY_COLUMNS)
+    updates = ', '.join(f"{column} = EXCLUDED.{column}"
+                        for column, _ in COPY_COLUMNS[5:] + COPY_COLUMNS[2:3])
+    cursor.execute(f"""
+        INSERT INTO daily_stock_data ({columns})
+        SELECT {columns} FROM daily_stock_staging
+        ON CONFLICT (date, symbol, market, rank_type) DO UPDATE SET {updates}
+    """)
+    cursor.execute("TRUNCATE daily_stock_staging")
+
+
+def insert_generated_data(args):
+    """합성 유니버스 -> daily_stock_data (COPY binary)"""
+    days = args.days or args.years * TRADING_DAYS_PER_YEAR
+    started = time.perf_counter()
+    data = synthetic.universe(args.tickers, days, seed=args.seed,
+                              start_date=args.start_date)
+    listed = data['listed']
+    logger.info(f"합성 유니버스: {args.tickers}종목 × {days}거래일 "
+                f"(상장 칸 {listed.sum():,}개, 거래정지/상장 전후 {(~listed).sum():,}개) "
+                f"{time.perf_counter() - started:.1f}초")
+
+    connection = None if args.dry_run else get_database_connection()
+    cursor = None
+    if connection:
+        daily_stock.require_layout(connection)
+        cursor = connection.cursor()
+        if not args.append:
+            columns = ', '.join(column for column, _ in COPY_COLUMNS)
+            cursor.execute(f"""
+                CREATE TEMP TABLE daily_stock_staging AS
+                SELECT {columns} FROM daily_stock_data WITH NO DATA
+            """)
+
+    rows = 0
+    size = 0
+    started = time.perf_counter()
+    try:
+        for frame in synthetic.ranking_frames(data, top_n=args.top,
+                                              day_chunk=args.chunk_days):
+            payload = daily_stock.build_copy_binary(
+                [(frame[column].values, kind) for column, kind in COPY_COLUMNS])
+            if cursor:
+                if args.append:
+                    copy_chunk(cursor, 'daily_stock_data', payload)
+                else:
+                    copy_chunk(cursor, 'daily_stock_staging', payload)
+                    upsert_staging(cursor)
+                connection.commit()
+            rows += len(frame)
+            size += len(payload)
+            elapsed = time.perf_counter() - started
+            logger.info(f"{frame['date'].max():%Y-%m-%d} 까지 {rows:,}행 "
+                        f"({rows / elapsed:,.0f}행/초)")
+
+        if cursor:
+            cursor.execute("ANALYZE daily_stock_data")
+            connection.commit()
+    except Exception as e:
+        logger.error(f"데이터 적재 오류: {e}")
+        if connection:
+            connection.rollback()
+        raise
+    finally:
+        if connection:
+            cursor.close()
+            connection.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"✅ {rows:,}행 ({size / 1e6:,.0f}MB) {elapsed:.1f}초 - "
+                f"{rows / elapsed:,.0f}행/초" + (" (dry-run, DB 적재 안 함)"
+                                                 if args.dry_run else ""))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='daily_stock_data 빠른 데이터 삽입')
+    parser.add_argument('--generate', action='store_true',
+                        help='대용량 합성 데이터 생성/적재 (없으면 샘플 데이터)')
+    parser.add_argument('--tickers', type=int, default=2000, help='종목 수')
+    parser.add_argument('--years', type=int, default=5,
+                        help=f'기간 (년, {TRADING_DAYS_PER_YEAR}거래일/년)')
+    parser.add_argument('--days', type=int, help='기간 (거래일, --years 대신)')
+    parser.add_argument('--start-date', default=synthetic.START_DATE,
+                        help='첫 거래일 (YYYY-MM-DD)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top', type=int,
+                        help='시장/랭킹 종류별 상위 N 개만 (없으면 상장 종목 전부)')
+    parser.add_argument('--chunk-days', type=int, default=20,
+                        help='COPY 한 번에 보내는 거래일 수')
+    parser.add_argument('--append', action='store_true',
+                        help='upsert 없이 바로 COPY (기존 행과 겹치면 실패)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='생성/인코딩만 하고 DB 에 적재하지 않음')
+    return parser.parse_args()
+
+
 def main():
     """메인 실행 함수"""
+    args = parse_args()
     logger.info("PostgreSQL 빠른 데이터 삽입 시작")
     
     try:
-        insert_sample_data()
+        if args.generate:
+            insert_generated_data(args)
+        else:
+            insert_sample_data()
         logger.info("데이터 삽입 완료")
     except Exception as e:
         logger.error(f"오류 발생: {e}")
@@ -8,15 +8,21 @@ PostgreSQL 5년치 역사적 데이터 수집 스크립트
 - KOSDAQ 거래량 상위 500종목
 """
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import os
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
-from collections import defaultdict
-import time
-import json
+import argparse
+
+from trading_data.backfill import fetch_date, run_claimed, run_sharded
+from trading_data.checkpoint import BackfillCheckpoint, iter_dates_desc
+from trading_data.ratelimit import FileRateLimiter
+from trading_data.rankings import to_column_arrays
+from trading_data import daily_stock, db, store
+
+DEFAULT_JOB = 'historical_daily'
+DEFAULT_RATE_FILE = '/tmp/historical_data_collector.rate'
+# --rate 없이 워커 1개로 실행할 때의 초당 pykrx 호출 수 (API 호출 제한 방지)
+DEFAULT_SINGLE_RATE = 2.0
 
 # 로깅 설정
 logging.basicConfig(
@@ -32,205 +38,25 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """PostgreSQL 데이터베이스 연결"""
     try:
-        connection = psycopg2.connect(
-            host=os.getenv('PGHOST', 'localhost'),
-            database=os.getenv('PGDATABASE', 'postgres'),
-            user=os.getenv('PGUSER', 'postgres'),
-            password=os.getenv('PGPASSWORD', ''),
-            port=os.getenv('PGPORT', '5432')
-        )
+        connection = db.connect()
         return connection
     except Exception as e:
         logger.error(f"PostgreSQL 연결 오류: {e}")
         raise
 
-def get_ranking_lists(date):
-    """
-    4개 랭킹 리스트 수집
-    - KOSPI 시가총액 상위 500종목
-    - KOSDAQ 시가총액 상위 500종목
-    - KOSPI 거래량 상위 500종목
-    - KOSDAQ 거래량 상위 500종목
-    """
-    try:
-        from pykrx import stock
-        import pandas as pd
-        
-        date_str = date.strftime('%Y%m%d')
-        ranking_data = []
-        
-        # 1. KOSPI 시가총액 상위 500종목
-        logger.info(f"KOSPI 시가총액 랭킹 수집: {date_str}")
-        try:
-            kospi_cap_df = stock.get_market_cap_by_date(date_str, date_str, "KOSPI")
-            if kospi_cap_df is not None and len(kospi_cap_df) > 0:
-                kospi_cap_sorted = kospi_cap_df.sort_values('시가총액', ascending=False).head(500)
-                for rank, (ticker, row) in enumerate(kospi_cap_sorted.iterrows(), 1):
-                    ranking_data.append({
-                        'code': ticker,
-                        'market': 'KOSPI',
-                        'rank_type': 'market_cap',
-                        'rank': rank,
-                        'value': row['시가총액']
-                    })
-                logger.info(f"KOSPI 시가총액: {len([r for r in ranking_data if r['market']=='KOSPI' and r['rank_type']=='market_cap'])}개")
-        except Exception as e:
-            logger.warning(f"KOSPI 시가총액 랭킹 수집 실패: {e}")
-        
-        # 2. KOSDAQ 시가총액 상위 500종목
-        logger.info(f"KOSDAQ 시가총액 랭킹 수집: {date_str}")
-        try:
-            kosdaq_cap_df = stock.get_market_cap_by_date(date_str, date_str, "KOSDAQ")
-            if kosdaq_cap_df is not None and len(kosdaq_cap_df) > 0:
-                kosdaq_cap_sorted = kosdaq_cap_df.sort_values('시가총액', ascending=False).head(500)
-                for rank, (ticker, row) in enumerate(kosdaq_cap_sorted.iterrows(), 1):
-                    ranking_data.append({
-                        'code': ticker,
-                        'market': 'KOSDAQ',
-                        'rank_type': 'market_cap',
-                        'rank': rank,
-                        'value': row['시가총액']
-                    })
-                logger.info(f"KOSDAQ 시가총액: {len([r for r in ranking_data if r['market']=='KOSDAQ' and r['rank_type']=='market_cap'])}개")
-        except Exception as e:
-            logger.warning(f"KOSDAQ 시가총액 랭킹 수집 실패: {e}")
-        
-        # 3. KOSPI 거래량 상위 500종목
-        logger.info(f"KOSPI 거래량 랭킹 수집: {date_str}")
-        try:
-            kospi_vol_df = stock.get_market_ohlcv_by_date(date_str, date_str, "KOSPI")
-            if kospi_vol_df is not None and len(kospi_vol_df) > 0:
-                kospi_vol_sorted = kospi_vol_df.sort_values('거래량', ascending=False).head(500)
-                for rank, (ticker, row) in enumerate(kospi_vol_sorted.iterrows(), 1):
-                    ranking_data.append({
-                        'code': ticker,
-                        'market': 'KOSPI',
-                        'rank_type': 'volume',
-                        'rank': rank,
-                        'value': row['거래량']
-                    })
-                logger.info(f"KOSPI 거래량: {len([r for r in ranking_data if r['market']=='KOSPI' and r['rank_type']=='volume'])}개")
-        except Exception as e:
-            logger.warning(f"KOSPI 거래량 랭킹 수집 실패: {e}")
-        
-        # 4. KOSDAQ 거래량 상위 500종목
-        logger.info(f"KOSDAQ 거래량 랭킹 수집: {date_str}")
-        try:
-            kosdaq_vol_df = stock.get_market_ohlcv_by_date(date_str, date_str, "KOSDAQ")
-            if kosdaq_vol_df is not None and len(kosdaq_vol_df) > 0:
-                kosdaq_vol_sorted = kosdaq_vol_df.sort_values('거래량', ascending=False).head(500)
-                for rank, (ticker, row) in enumerate(kosdaq_vol_sorted.iterrows(), 1):
-                    ranking_data.append({
-                        'code': ticker,
-                        'market': 'KOSDAQ',
-                        'rank_type': 'volume',
-                        'rank': rank,
-                        'value': row['거래량']
-                    })
-                logger.info(f"KOSDAQ 거래량: {len([r for r in ranking_data if r['market']=='KOSDAQ' and r['rank_type']=='volume'])}개")
-        except Exception as e:
-            logger.warning(f"KOSDAQ 거래량 랭킹 수집 실패: {e}")
-        
-        return ranking_data
-        
-    except Exception as e:
-        logger.error(f"랭킹 리스트 수집 중 오류 발생: {e}")
-        return []
-
-def get_unique_tickers(ranking_data):
-    """랭킹 데이터에서 중복 제거된 종목 코드 리스트 반환"""
-    unique_tickers = set()
-    for item in ranking_data:
-        unique_tickers.add(item['code'])
-    return list(unique_tickers)
-
-def get_stock_details(date, unique_tickers):
-    """종목별 상세 데이터 수집"""
-    try:
-        from pykrx import stock
-        import pandas as pd
-        
-        date_str = date.strftime('%Y%m%d')
-        stock_details = {}
-        
-        for i, ticker in enumerate(unique_tickers):
-            try:
-                # OHLCV 데이터 수집
-                ohlcv = stock.get_market_ohlcv_by_ticker(date_str, date_str, ticker)
-                if ohlcv is not None and len(ohlcv) > 0:
-                    row = ohlcv.iloc[0]
-                    
-                    # 종목명 가져오기
-                    try:
-                        company_name = stock.get_market_ticker_name(ticker)
-                    except:
-                        company_name = ticker
-                    
-                    # 시가총액 가져오기
-                    try:
-                        cap_data = stock.get_market_cap_by_ticker(date_str, ticker)
-                        market_cap = cap_data.iloc[0]['시가총액'] if cap_data is not None and len(cap_data) > 0 else 0
-                    except:
-                        market_cap = 0
-                    
-                    stock_details[ticker] = {
-                        'name': company_name,
-                        'open': float(row['시가']) if pd.notna(row['시가']) else 0,
-                        'high': float(row['고가']) if pd.notna(row['고가']) else 0,
-                        'low': float(row['저가']) if pd.notna(row['저가']) else 0,
-                        'close': float(row['종가']) if pd.notna(row['종가']) else 0,
-                        'volume': int(row['거래량']) if pd.notna(row['거래량']) else 0,
-                        'market_cap': str(market_cap)
-                    }
-                    
-                    if (i + 1) % 100 == 0:
-                        logger.info(f"종목 상세 데이터 수집 진행: {i + 1}/{len(unique_tickers)}")
-                        time.sleep(0.1)  # API 호출 제한 방지
-                
-            except Exception as e:
-                logger.warning(f"종목 {ticker} 상세 데이터 수집 실패: {e}")
-                continue
-        
-        return stock_details
-        
-    except Exception as e:
-        logger.error(f"종목 상세 데이터 수집 중 오류 발생: {e}")
-        return {}
+def insert_daily_data(connection, combined):
+    """PostgreSQL에 일일 데이터 INSERT
 
-def combine_data(date, ranking_data, stock_details):
-    """랭킹 데이터와 종목 상세 데이터를 결합"""
-    combined_data = []
-    
-    for rank_item in ranking_data:
-        ticker = rank_item['code']
-        
-        if ticker in stock_details:
-            detail = stock_details[ticker]
-            
-            combined_data.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'symbol': ticker,
-                'market': rank_item['market'],
-                'rank_type': rank_item['rank_type'],
-                'rank': rank_item['rank'],
-                'name': detail['name'],
-                'open_price': detail['open'],
-                'high_price': detail['high'],
-                'low_price': detail['low'],
-                'close_price': detail['close'],
-                'volume': detail['volume'],
-                'market_cap': detail['market_cap']
-            })
-    
-    return combined_data
-
-def insert_daily_data(connection, data_list):
-    """PostgreSQL에 일일 데이터 INSERT"""
+    combined 는 rankings.combine_frames 결과. 컬럼별 배열을 unnest 로 펼쳐
+    한 번의 INSERT 문으로 저장한다.
+    """
     cursor = connection.cursor()
     
     insert_query = """
     INSERT INTO daily_stock_data (date, symbol, market, rank_type, rank, name, open_price, high_price, low_price, close_price, volume, market_cap)
-    VALUES (%(date)s, %(symbol)s, %(market)s, %(rank_type)s, %(rank)s, %(name)s, %(open_price)s, %(high_price)s, %(low_price)s, %(close_price)s, %(volume)s, %(market_cap)s)
+    SELECT * FROM unnest(
+        %(date)s::date[], %(symbol)s::text[], %(market)s::stock_market[], %(rank_type)s::stock_rank_type[], %(rank)s::int[], %(name)s::text[],
+        %(open)s::int[], %(high)s::int[], %(low)s::int[], %(close)s::int[], %(volume)s::bigint[], %(market_cap)s::bigint[])
     ON CONFLICT (date, symbol, market, rank_type) DO UPDATE SET
         rank = EXCLUDED.rank,
         name = EXCLUDED.name,
@@ -243,10 +69,13 @@ def insert_daily_data(connection, data_list):
     """
     
     try:
-        cursor.executemany(insert_query, data_list)
+        columns = to_column_arrays(combined)
+        cursor.execute(insert_query, columns)
         connection.commit()
-        logger.info(f"{len(data_list)}개 데이터 INSERT 완료")
-        return len(data_list)
+        logger.info(f"{len(combined)}개 데이터 INSERT 완료")
+        # 분석용 로컬 OHLCV 저장소에도 추가 (날짜별 파일, 재수집 시 덮어씀)
+        store.append_frame(combined, tag=combined['date'].iloc[0])
+        return len(combined)
     except Exception as e:
         logger.error(f"데이터 INSERT 오류: {e}")
         connection.rollback()
@@ -267,94 +96,142 @@ def get_data_count(connection):
     finally:
         cursor.close()
 
-def collect_historical_data(start_date, end_date):
-    """5년치 역사적 데이터 수집"""
-    logger.info(f"5년치 역사적 데이터 수집 시작: {start_date} ~ {end_date}")
-    
-    connection = get_database_connection()
-    
-    # 현재 데이터 개수 확인
-    initial_count = get_data_count(connection)
-    logger.info(f"수집 전 데이터 개수: {initial_count:,}개")
+def collect_date(connection, current_date, rate_limiter=None):
+    """하루치 랭킹/상세 데이터를 수집해 저장, 저장 건수 반환 (데이터 없으면 None)"""
+    combined_data = fetch_date(current_date, rate_limiter)
+    if combined_data is None:
+        return None
+    return insert_daily_data(connection, combined_data)
+
+def collect_date_range(connection, checkpoint, latest_date, earliest_date, rate_limiter=None, on_date=None):
+    """latest_date 부터 earliest_date 까지 거꾸로 수집 (완료된 날짜는 건너뜀)
+
+    rate_limiter 가 있으면 pykrx 호출마다 토큰을 얻는다.
+    on_date 는 하루를 처리할 때마다 호출된다 (샤드 하트비트).
+
+    반환값: (처리한 날짜 수, INSERT 건수, 오류 난 날짜 수)
+    """
+    completed = checkpoint.completed_dates(earliest_date, latest_date)
+    if completed:
+        logger.info(f"체크포인트: {len(completed)}일 완료됨, 건너뜀")
     
-    current_date = start_date
     total_inserted = 0
     processed_dates = 0
+    failed_dates = 0
     
-    while current_date >= end_date:
+    for current_date in iter_dates_desc(earliest_date, latest_date):
+        if current_date in completed:
+            continue
         try:
             logger.info(f"수집 중: {current_date.strftime('%Y-%m-%d')} ({processed_dates + 1}일차)")
             
-            # 1. 랭킹 리스트 수집
-            ranking_data = get_ranking_lists(current_date)
-            
-            if not ranking_data:
-                logger.warning(f"{current_date.strftime('%Y-%m-%d')} 랭킹 데이터 없음")
-                current_date -= timedelta(days=1)
-                continue
-            
-            # 2. 중복 제거된 종목 리스트 생성
-            unique_tickers = get_unique_tickers(ranking_data)
-            logger.info(f"중복 제거 후 종목 수: {len(unique_tickers)}개")
-            
-            # 3. 종목별 상세 데이터 수집
-            stock_details = get_stock_details(current_date, unique_tickers)
-            
-            if not stock_details:
-                logger.warning(f"{current_date.strftime('%Y-%m-%d')} 종목 상세 데이터 없음")
-                current_date -= timedelta(days=1)
-                continue
-            
-            # 4. 데이터 결합
-            combined_data = combine_data(current_date, ranking_data, stock_details)
-            
-            if not combined_data:
-                logger.warning(f"{current_date.strftime('%Y-%m-%d')} 결합된 데이터 없음")
-                current_date -= timedelta(days=1)
-                continue
-            
-            # 5. 데이터베이스에 INSERT
-            inserted_count = insert_daily_data(connection, combined_data)
-            total_inserted += inserted_count
-            
-            processed_dates += 1
+            inserted_count = collect_date(connection, current_date, rate_limiter)
+            # 데이터가 없는 날(휴장일 등)도 기록해 재시작 시 다시 조회하지 않음
+            if inserted_count is None:
+                checkpoint.mark_done(current_date, status='empty')
+            else:
+                checkpoint.mark_done(current_date, rows=inserted_count)
+                total_inserted += inserted_count
+                processed_dates += 1
             
             # 진행 상황 보고
-            if processed_dates % 10 == 0:
+            if inserted_count is not None and processed_dates % 10 == 0:
                 current_count = get_data_count(connection)
                 logger.info(f"진행 상황: {processed_dates}일 처리 완료, 총 {total_inserted:,}개 데이터 수집, 현재 DB 데이터: {current_count:,}개")
             
-            # API 호출 제한 방지
-            time.sleep(0.5)
-            
         except Exception as e:
             logger.error(f"{current_date.strftime('%Y-%m-%d')} 수집 중 오류: {e}")
+            failed_dates += 1
         
-        current_date -= timedelta(days=1)
+        if on_date:
+            on_date()
+    
+    return processed_dates, total_inserted, failed_dates
+
+def collect_historical_data(start_date, end_date, job=DEFAULT_JOB, workers=1, shard_days=30, rate=None, rate_file=DEFAULT_RATE_FILE):
+    """5년치 역사적 데이터 수집
+
+    같은 job 이름으로 다시 실행하면 완료된 날짜를 건너뛰고 이어서 진행한다.
+    기간은 shard_days 일 단위 샤드로 나눠 등록한다. 워커 1개면 이 프로세스가
+    남은 샤드를 하나씩 가져가 처리하므로 같은 job 으로 여러 프로세스를 띄우면
+    샤드를 나눠 가진다. workers 가 2 이상이면 샤드를 프로세스 풀에서
+    병렬 수집하고, 저장은 이 프로세스의 연결 하나로만 한다. rate 를 주면
+    rate_file 로 공유하는 초당 호출 예산을 모든 워커가 나눠 쓴다
+    (같은 job 으로 여러 번 실행해도 같은 rate_file 이면 예산이 합산되지 않음).
+    워커 1개일 때 rate 가 없으면 DEFAULT_SINGLE_RATE 를 쓴다.
+    """
+    logger.info(f"5년치 역사적 데이터 수집 시작: {start_date} ~ {end_date} (job={job}, workers={workers})")
+    
+    connection = get_database_connection()
+    try:
+        # 타입 변환은 migrate-daily-stock-data.py 로만 (수집 중 테이블 재작성 방지)
+        daily_stock.require_layout(connection)
+    except Exception:
+        connection.close()
+        raise
+    checkpoint = BackfillCheckpoint(connection, job)
+    checkpoint.ensure_tables()
+    
+    # 현재 데이터 개수 확인
+    initial_count = get_data_count(connection)
+    logger.info(f"수집 전 데이터 개수: {initial_count:,}개")
     
-    # 최종 결과
-    final_count = get_data_count(connection)
-    logger.info("=== 5년치 데이터 수집 완료 ===")
-    logger.info(f"처리된 날짜: {processed_dates}일")
-    logger.info(f"총 수집 데이터: {total_inserted:,}개")
-    logger.info(f"최종 DB 데이터: {final_count:,}개")
+    total_inserted = 0
+    processed_dates = 0
     
-    connection.close()
+    if rate is None and workers <= 1:
+        rate = DEFAULT_SINGLE_RATE
+    rate_limiter = FileRateLimiter(rate_file, rate, burst=max(1, int(rate))) if rate else None
+
+    try:
+        if workers > 1:
+            processed_dates, total_inserted = run_sharded(
+                checkpoint, end_date, start_date,
+                lambda rows: insert_daily_data(connection, rows),
+                workers=workers, shard_days=shard_days, rate_limiter=rate_limiter)
+        else:
+            processed_dates, total_inserted = run_claimed(
+                checkpoint, end_date, start_date,
+                lambda shard_start, shard_end, heartbeat: collect_date_range(
+                    connection, checkpoint, shard_end, shard_start, rate_limiter, on_date=heartbeat),
+                shard_days=shard_days)
+    finally:
+        # 최종 결과
+        final_count = get_data_count(connection)
+        logger.info("=== 5년치 데이터 수집 완료 ===")
+        logger.info(f"처리된 날짜: {processed_dates}일")
+        logger.info(f"총 수집 데이터: {total_inserted:,}개")
+        logger.info(f"최종 DB 데이터: {final_count:,}개")
+        
+        connection.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PostgreSQL 5년치 역사적 데이터 수집")
+    parser.add_argument('--start', default='2024-12-31', help="수집 시작일 (가장 최근 날짜, YYYY-MM-DD)")
+    parser.add_argument('--end', default='2020-01-01', help="수집 종료일 (가장 과거 날짜, YYYY-MM-DD)")
+    parser.add_argument('--job', default=DEFAULT_JOB, help="체크포인트 작업 이름 (같은 이름이면 이어서 수집)")
+    parser.add_argument('--workers', type=int, default=1, help="병렬 수집 프로세스 수 (2 이상이면 샤드 병렬 모드)")
+    parser.add_argument('--shard-days', type=int, default=30, help="샤드 크기 (일, 같은 --job 의 프로세스/워커가 샤드 단위로 나눠 수집)")
+    parser.add_argument('--rate', type=float, default=None, help=f"전체 워커 합산 초당 pykrx 호출 수 (워커 1개면 기본 {DEFAULT_SINGLE_RATE})")
+    parser.add_argument('--rate-file', default=DEFAULT_RATE_FILE, help="워커 간 호출 예산을 공유하는 토큰 파일")
+    return parser.parse_args()
 
 def main():
     """메인 실행 함수"""
+    args = parse_args()
     logger.info("PostgreSQL 5년치 역사적 데이터 수집 시작")
     
-    # 2024년 12월 31일부터 5년 전까지 (실제 존재하는 데이터 범위)
-    start_date = datetime(2024, 12, 31)
-    end_date = datetime(2020, 1, 1)
+    # 기본값: 2024년 12월 31일부터 5년 전까지 (실제 존재하는 데이터 범위)
+    start_date = datetime.strptime(args.start, '%Y-%m-%d')
+    end_date = datetime.strptime(args.end, '%Y-%m-%d')
     
     logger.info(f"수집 기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
     
     try:
-        collect_historical_data(start_date, end_date)
+        collect_historical_data(start_date, end_date, job=args.job, workers=args.workers,
+                                shard_days=args.shard_days, rate=args.rate, rate_file=args.rate_file)
     except KeyboardInterrupt:
-        logger.info("사용자에 의해 중단됨")
+        logger.info("사용자에 의해 중단됨 (같은 --job 으로 다시 실행하면 이어서 수집)")
     except Exception as e:
         logger.error(f"수집 중 오류 발생: {e}")
         sys.exit(1)
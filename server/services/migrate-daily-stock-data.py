@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+daily_stock_data 를 압축 타입 레이아웃으로 변환
+(정수 가격, bigint 거래량/시가총액, enum 시장/랭킹 종류, (종목, date) CLUSTER)
+
+실행: python3 server/services/migrate-daily-stock-data.py [--no-cluster]
+CLUSTER 는 테이블 전체를 다시 쓰며 그동안 읽기/쓰기가 막히므로 수집 작업이 없을 때 실행한다.
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from trading_data import daily_stock, db
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s",
+                    handlers=[logging.StreamHandler(sys.stdout)])
+logger = logging.getLogger(__name__)
+
+
+def table_size(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_size_pretty(pg_total_relation_size('daily_stock_data'))")
+        return cursor.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='daily_stock_data 타입 레이아웃 변환')
+    parser.add_argument('--no-cluster', action='store_true',
+                        help='타입 변환과 인덱스만 적용하고 CLUSTER 는 생략')
+    args = parser.parse_args()
+
+    connection = db.connect()
+    try:
+        started = time.time()
+        logger.info(f"변환 전 크기: {table_size(connection)}")
+        changes = daily_stock.ensure_layout(connection,
+                                            cluster=not args.no_cluster)
+        for change in changes:
+            logger.info(f"  {change}")
+        logger.info(f"변환 후 크기: {table_size(connection)} "
+                    f"({time.time() - started:.1f}초)")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
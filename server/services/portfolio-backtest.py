@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Best K 변동성 돌파 포트폴리오 백테스트
+
+가격 큐브 (build-price-cube.py) 의 기간 전 종목에 대해 매일 돌파 신호를 모아
+최대 --positions 종목을 같은 비중으로 운용한 일별 자산 곡선과 요약 지표를 낸다.
+
+K 를 지정하지 않으면 같은 기간으로 종목별 Best K 를 계산해 쓰며 (sharpe 가
+score), 평균 수익률이 0 이하인 종목은 제외한다. 같은 기간으로 K 를 고르므로
+결과는 사후 최적화 값이다. --train-days 를 주면 직전 학습 구간으로 고른 K 만
+쓰는 워크포워드 방식으로 운용한다 (첫 학습 구간 동안은 거래하지 않음).
+
+실행: python3 server/services/portfolio-backtest.py --start 2020-01-01 --end 2024-12-31 \
+          [--positions 10] [--max-weight 0.2] [--fee-pct 0.015] [--output equity.csv]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from trading_data import bestk, cube, portfolio, walkforward
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s",
+                    handlers=[logging.StreamHandler(sys.stderr)])
+logger = logging.getLogger(__name__)
+
+CUBE_DIR = os.getenv("PRICE_CUBE_DIR", "data/price_cube")
+
+
+def in_sample_k(price_cube, start_date, end_date):
+    """기간 전체로 고른 종목별 (Best K, sharpe) - 수익률 ≤ 0 종목은 NaN"""
+    _, metrics, _ = bestk.evaluate_cube(price_cube, start_date, end_date)
+    best_ks, chosen = bestk.best_k(metrics)
+    excluded = chosen['avg_return_pct'] <= 0
+    return (np.where(excluded, np.nan, best_ks),
+            np.where(excluded, np.nan, chosen['sharpe']))
+
+
+def walk_forward_k(price_cube, start_date, end_date, train_days, test_days):
+    """(거래일, 종목) 표본 외 K 와 학습 구간 sharpe score"""
+    window = price_cube.window(start_date, end_date)
+    result = walkforward.evaluate(
+        *(window.field(name) for name in ('open', 'high', 'low', 'close')),
+        train_days, test_days)
+    days = len(window.dates)
+    score = np.full((days, len(window.symbols)), np.nan)
+    for f, (_, test_start, test_end) in enumerate(result['folds']):
+        score[test_start:test_end] = result['in_sample']['sharpe'][f]
+    return walkforward.daily_k(result, days), score
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Best K 포트폴리오 백테스트')
+    parser.add_argument('--cube', default=CUBE_DIR, help='가격 큐브 디렉터리')
+    parser.add_argument('--start', help='시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end', help='종료일 (YYYY-MM-DD)')
+    parser.add_argument('--k', type=float, help='전 종목 고정 K (없으면 종목별 Best K)')
+    parser.add_argument('--train-days', type=int,
+                        help='워크포워드 학습 구간 거래일 (없으면 기간 전체로 K 선택)')
+    parser.add_argument('--test-days', type=int, default=20,
+                        help='워크포워드 평가 구간 거래일')
+    parser.add_argument('--positions', type=int, default=10, help='최대 보유 종목 수')
+    parser.add_argument('--max-weight', type=float, default=1.0,
+                        help='종목당 최대 비중 (0~1)')
+    parser.add_argument('--fee-pct', type=float, default=0.0,
+                        help='매수/매도 각각의 비용 (%%)')
+    parser.add_argument('--output', help='일별 결과 CSV 경로')
+    args = parser.parse_args()
+
+    price_cube = cube.load(args.cube)
+    started = time.perf_counter()
+    if args.k is not None:
+        k, score = args.k, None
+    elif args.train_days:
+        k, score = walk_forward_k(price_cube, args.start, args.end,
+                                  args.train_days, args.test_days)
+        logger.info(f"워크포워드 K: 학습 {args.train_days}일 / 평가 {args.test_days}일")
+    else:
+        k, score = in_sample_k(price_cube, args.start, args.end)
+        logger.info(f"종목별 Best K 계산: {np.isfinite(k).sum()}/{len(k)}개 종목 사용")
+    selected = time.perf_counter()
+
+    dates, result = portfolio.backtest_cube(
+        price_cube, k, args.start, args.end, score=score,
+        positions=args.positions, max_weight=args.max_weight,
+        fee_pct=args.fee_pct)
+    finished = time.perf_counter()
+    logger.info(f"포트폴리오 백테스트: 거래일 {len(dates)}일 × 종목 "
+                f"{len(price_cube.symbols)}개 - K 선택 {selected - started:.2f}초, "
+                f"시뮬레이션 {finished - selected:.2f}초")
+
+    if args.output:
+        pd.DataFrame({
+            'date': dates,
+            'return_pct': result['returns'] * 100,
+            'equity': result['equity'],
+            'exposure_pct': result['exposure'] * 100,
+            'turnover_pct': result['turnover'] * 100,
+            'positions': result['positions'],
+        }).to_csv(args.output, index=False)
+        logger.info(f"일별 결과 저장: {args.output}")
+
+    print(json.dumps(portfolio.summary(result), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
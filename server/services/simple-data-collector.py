@@ -4,14 +4,13 @@
 실제 데이터를 수집하여 PostgreSQL에 저장
 """
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
-import os
 import sys
 from datetime import datetime, timedelta
 import logging
 import time
 import json
+from trading_data import db
 
 # 로깅 설정
 logging.basicConfig(
@@ -27,13 +26,7 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """PostgreSQL 데이터베이스 연결"""
     try:
-        connection = psycopg2.connect(
-            host=os.getenv('PGHOST', 'localhost'),
-            database=os.getenv('PGDATABASE', 'postgres'),
-            user=os.getenv('PGUSER', 'postgres'),
-            password=os.getenv('PGPASSWORD', ''),
-            port=os.getenv('PGPORT', '5432')
-        )
+        connection = db.connect()
         return connection
     except Exception as e:
         logger.error(f"PostgreSQL 연결 오류: {e}")
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+백필 샤드 계획 테스트
+- DB 없이: split_range 의 기간 분할과 number_shards 의 기간 기준 shard_id 부여
+  (기간을 넓히거나 샤드 크기를 바꿔 다시 계획해도 기존 샤드 번호/기간이 유지되고
+  모든 날짜가 어떤 샤드에든 들어가는지)
+- DB 없이: 워커 1개 수집 두 개가 같은 job 으로 run_claimed 를 돌리면 샤드를
+  겹치지 않게 나눠 가지는지 (메모리 체크포인트, claim_shard 는 잠금으로 원자적)
+- DB 가 있으면: PG* 환경변수의 (스크래치) DB 에 임시 작업 이름으로 같은 재계획을
+  실제 plan_shards/claim_shard 로 확인하고 테스트 작업의 행을 지운다.
+  연결할 수 없으면 DB 테스트는 건너뛴다.
+
+실행: PGSSLMODE=disable python3 server/services/test-backfill-checkpoint.py
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+# 현재 디렉토리를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import psycopg2
+
+from trading_data import db
+from trading_data.backfill import run_claimed
+from trading_data.checkpoint import BackfillCheckpoint, number_shards, split_range
+
+
+def covered_dates(shards):
+    """샤드 목록 [(shard_id, 시작, 끝, ...)] 이 덮는 날짜 집합"""
+    days = set()
+    for shard in shards:
+        current = shard[1]
+        while current <= shard[2]:
+            days.add(current)
+            current += timedelta(days=1)
+    return days
+
+
+def all_dates(start_date, end_date):
+    return covered_dates([(0, start_date, end_date)])
+
+
+def test_split_range():
+    shards = split_range(date(2020, 1, 1), date(2024, 12, 31), 30)
+    assert len(shards) == 61, len(shards)
+    assert shards[0] == (date(2020, 1, 1), date(2020, 1, 30))
+    assert shards[-1][1] == date(2024, 12, 31)
+    for (_, previous_end), (start, _) in zip(shards, shards[1:]):
+        assert start == previous_end + timedelta(days=1)
+    assert all((end - start).days < 30 for start, end in shards)
+
+    # datetime 입력과 하루짜리 / 빈 기간
+    assert split_range(datetime(2024, 1, 1), datetime(2024, 1, 1), 7) == [
+        (date(2024, 1, 1), date(2024, 1, 1))]
+    assert split_range(date(2024, 1, 2), date(2024, 1, 1), 7) == []
+    print(f"기간 분할: 샤드 {len(shards)}개, 빈틈/겹침 없음")
+
+
+def replan(existing, start_date, end_date, shard_days):
+    """number_shards 결과를 existing 에 반영 (plan_shards 의 INSERT 와 같음)"""
+    numbered = number_shards(split_range(start_date, end_date, shard_days),
+                             existing)
+    for shard_id, shard_start, shard_end, new in numbered:
+        if new:
+            existing[shard_start, shard_end] = shard_id
+    return numbered
+
+
+def test_number_shards():
+    existing = {}
+    first = replan(existing, date(2020, 1, 1), date(2024, 12, 31), 30)
+    assert [row[0] for row in first] == list(range(61))
+    before = dict(existing)
+
+    # 같은 계획을 다시 하면 새 샤드 없음
+    again = replan(existing, date(2020, 1, 1), date(2024, 12, 31), 30)
+    assert not any(row[3] for row in again) and existing == before
+
+    # 기간을 넓히면 기존 샤드는 번호/기간 그대로, 새 기간은 61 번부터
+    wider = replan(existing, date(2019, 1, 1), date(2024, 12, 31), 30)
+    for (shard_start, shard_end), shard_id in before.items():
+        assert existing[shard_start, shard_end] == shard_id
+    new_ids = sorted(row[0] for row in wider if row[3])
+    assert new_ids and new_ids[0] == 61
+    assert new_ids == list(range(61, 61 + len(new_ids)))
+    assert all_dates(date(2019, 1, 1), date(2024, 12, 31)) <= covered_dates(wider)
+    assert len(set(existing.values())) == len(existing)
+
+    # 샤드 크기를 바꿔도 이번 계획만으로 기간 전체가 덮이고 번호는 겹치지 않음
+    resized = replan(existing, date(2019, 1, 1), date(2024, 12, 31), 7)
+    assert all_dates(date(2019, 1, 1), date(2024, 12, 31)) <= covered_dates(resized)
+    assert len(set(existing.values())) == len(existing)
+    print(f"기간 기준 번호: 최초 {len(first)}개, 기간 확장 후 {len(before) + len(new_ids)}개, "
+          f"샤드 크기 변경 후 {len(existing)}개")
+
+
+class MemoryCheckpoint:
+    """run_claimed 가 쓰는 BackfillCheckpoint 메서드의 메모리 구현 (프로세스 간 공유 DB 대용)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.existing = {}
+        self.status = {}
+        self.heartbeats = 0
+
+    def plan_shards(self, start_date, end_date, shard_days=30):
+        with self.lock:
+            numbered = replan(self.existing, start_date, end_date, shard_days)
+            for shard_id, _, _, new in numbered:
+                if new or self.status[shard_id] == 'failed':
+                    self.status[shard_id] = 'pending'
+            return len(numbered)
+
+    def claim_shard(self):
+        with self.lock:
+            for (shard_start, shard_end), shard_id in sorted(
+                    self.existing.items(), key=lambda item: item[1]):
+                if self.status[shard_id] == 'pending':
+                    self.status[shard_id] = 'running'
+                    return shard_id, shard_start, shard_end
+            return None
+
+    def heartbeat(self, shard_id):
+        with self.lock:
+            self.heartbeats += 1
+
+    def complete_shard(self, shard_id):
+        self.status[shard_id] = 'done'
+
+    def fail_shard(self, shard_id):
+        self.status[shard_id] = 'failed'
+
+    def progress(self):
+        with self.lock:
+            counts = {}
+            for status in self.status.values():
+                counts[status] = counts.get(status, 0) + 1
+            return counts
+
+
+def test_run_claimed_split():
+    checkpoint = MemoryCheckpoint()
+    collected = {'a': [], 'b': []}
+
+    def run(name):
+        def collect(shard_start, shard_end, heartbeat):
+            collected[name].append((shard_start, shard_end))
+            heartbeat()
+            time.sleep(0.01)
+            return 1, 10, 0
+
+        return run_claimed(checkpoint, date(2024, 1, 1), date(2024, 12, 31),
+                           collect, shard_days=30)
+
+    results = {}
+    threads = [threading.Thread(target=lambda name=name: results.update({name: run(name)}))
+               for name in collected]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    shards = split_range(date(2024, 1, 1), date(2024, 12, 31), 30)
+    a, b = set(collected['a']), set(collected['b'])
+    assert a and b, (len(a), len(b))
+    assert not a & b
+    assert sorted(a | b) == shards
+    assert len(collected['a']) + len(collected['b']) == len(shards)
+    assert set(checkpoint.status.values()) == {'done'}
+    assert results['a'][0] + results['b'][0] == len(shards)
+    print(f"샤드 분배: 수집기 A {len(a)}개, B {len(b)}개 (전체 {len(shards)}개, 겹침 없음)")
+
+    # 두 번째 실행은 남은 샤드가 없어 아무것도 수집하지 않음
+    assert run_claimed(checkpoint, date(2024, 1, 1), date(2024, 12, 31),
+                       lambda *args: (1, 10, 0), shard_days=30) == (0, 0)
+
+    # 실패한 날짜가 있는 샤드는 failed 로 남고 다시 계획하면 대기 상태
+    checkpoint = MemoryCheckpoint()
+    run_claimed(checkpoint, date(2024, 1, 1), date(2024, 1, 10),
+                lambda *args: (0, 0, 1), shard_days=5)
+    assert set(checkpoint.status.values()) == {'failed'}
+    checkpoint.plan_shards(date(2024, 1, 1), date(2024, 1, 10), 5)
+    assert set(checkpoint.status.values()) == {'pending'}
+
+
+def test_replan_db(checkpoint):
+    count = checkpoint.plan_shards(date(2020, 1, 1), date(2024, 12, 31), 30)
+    first = checkpoint.shard_ranges()
+    assert count == len(first) == 61, (count, len(first))
+    for shard_id, _, _, _ in first[:10]:
+        checkpoint.complete_shard(shard_id)
+
+    # 같은 계획을 다시 하면 아무것도 추가되지 않음
+    checkpoint.plan_shards(date(2020, 1, 1), date(2024, 12, 31), 30)
+    assert len(checkpoint.shard_ranges()) == len(first)
+
+    # 기간을 넓히면 2019 년을 포함한 새 기간이 추가되고 기존 샤드는 그대로
+    checkpoint.plan_shards(date(2019, 1, 1), date(2024, 12, 31), 30)
+    second = checkpoint.shard_ranges()
+    before = {row[0]: row for row in first}
+    for shard_id, start_date, end_date, status in second:
+        if shard_id in before:
+            assert before[shard_id][1:3] == (start_date, end_date), shard_id
+    assert all_dates(date(2019, 1, 1), date(2024, 12, 31)) <= covered_dates(second)
+    pending = [row for row in second if row[3] == 'pending']
+    assert all_dates(date(2019, 1, 1), date(2019, 12, 31)) <= covered_dates(pending)
+    assert sum(row[3] == 'done' for row in second) == 10
+    print(f"DB 기간 확장: 샤드 {len(first)}개 -> {len(second)}개, 2019 년 대기 중")
+
+    # 실패한 샤드는 다시 계획하면 대기 상태로 돌아감
+    shard_id = checkpoint.claim_shard()[0]
+    checkpoint.fail_shard(shard_id)
+    checkpoint.plan_shards(date(2019, 1, 1), date(2024, 12, 31), 30)
+    status = {row[0]: row[3] for row in checkpoint.shard_ranges()}
+    assert status[shard_id] == 'pending'
+
+    # 샤드 크기를 바꿔도 기간 전체가 다시 덮임
+    checkpoint.plan_shards(date(2019, 1, 1), date(2024, 12, 31), 7)
+    third = checkpoint.shard_ranges()
+    assert all_dates(date(2019, 1, 1), date(2024, 12, 31)) <= covered_dates(
+        [row for row in third if row[3] == 'pending'])
+    assert len({row[0] for row in third}) == len(third)
+    print(f"DB 샤드 크기 변경: 샤드 {len(third)}개")
+
+
+def connect_or_none():
+    try:
+        return db.connect(sslmode=os.getenv("PGSSLMODE") or "require")
+    except psycopg2.OperationalError as e:
+        print(f"DB 연결 불가, DB 테스트 건너뜀: {str(e).strip().splitlines()[0]}")
+        return None
+
+
+def main():
+    test_split_range()
+    test_number_shards()
+    test_run_claimed_split()
+
+    connection = connect_or_none()
+    if connection is not None:
+        checkpoint = BackfillCheckpoint(connection, f"test_replan_{os.getpid()}")
+        checkpoint.ensure_tables()
+        try:
+            test_replan_db(checkpoint)
+        finally:
+            connection.rollback()
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM backfill_shards WHERE job = %s",
+                               (checkpoint.job, ))
+            connection.commit()
+            connection.close()
+    print("모든 테스트 통과")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Best K 계산 백엔드 차등 테스트
+임의 OHLC 데이터로 (1) 순수 파이썬 참조 구현과 NumPy 백엔드, (2) NumPy 백엔드와
+numba 백엔드가 같은 지표를 내는지 확인한다 (numba 가 없으면 (2) 는 건너뜀).
+
+실행: python3 server/services/test-bestk-kernels.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# 현재 디렉토리를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from trading_data import bestk, kernels, sweep
+
+
+def random_prices(tickers, days, seed=0):
+    """종목마다 길이가 다른 (뒤쪽 NaN) 임의 OHLCV 행렬"""
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, (tickers, days)),
+                                     axis=1))
+    open_ = close * np.exp(rng.normal(0, 0.01, (tickers, days)))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.03, (tickers, days)))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.03, (tickers, days)))
+    volume = rng.integers(1000, 100000, (tickers, days)).astype(np.float64)
+    # 변동폭 0 인 날 (건너뛰는 쌍) 섞기
+    flat = rng.random((tickers, days)) < 0.03
+    high[flat] = low[flat]
+    matrices = [np.round(m) for m in (open_, high, low, close)] + [volume]
+    for i, length in enumerate(rng.integers(2, days + 1, tickers)):
+        for matrix in matrices:
+            matrix[i, length:] = np.nan
+    return matrices
+
+
+def reference_trades(open_, high, low, close, k):
+    """simulate_k_value 와 같은 규칙의 종목 하나 거래별 수익률 목록"""
+    returns = []
+    for i in range(1, len(close)):
+        if np.isnan(close[i]):
+            break
+        if high[i - 1] <= low[i - 1]:
+            continue
+        target = open_[i] + (high[i - 1] - low[i - 1]) * k
+        if high[i] >= target and target > open_[i]:
+            returns.append((target - open_[i]) / open_[i] * 100)
+        elif close[i] > 0 and open_[i] > 0:
+            returns.append((close[i] - open_[i]) / open_[i] * 100)
+    return returns
+
+
+def reference_path(returns):
+    """거래별 수익률 -> (복리 MDD %, 최장 연속 손실, 최장 고점 아래 거래 수)"""
+    equity = peak = 1.0
+    worst = 0.0
+    streak = longest_streak = under = longest_under = 0
+    for value in returns:
+        equity *= max(1 + value / 100, 0.0)
+        peak = max(peak, equity)
+        worst = max(worst, 1 - equity / peak)
+        streak = streak + 1 if value < 0 else 0
+        longest_streak = max(longest_streak, streak)
+        under = under + 1 if equity < peak else 0
+        longest_under = max(longest_under, under)
+    return worst * 100, longest_streak, longest_under
+
+
+def assert_metrics_equal(left, right, label):
+    for name in bestk.METRICS:
+        if name in bestk.COUNT_METRICS:
+            np.testing.assert_array_equal(left[name], right[name],
+                                          err_msg=f"{label}: {name}")
+        else:
+            np.testing.assert_allclose(left[name], right[name], rtol=1e-9,
+                                       atol=1e-9, err_msg=f"{label}: {name}")
+
+
+def test_reference():
+    """순수 파이썬 참조 구현 vs NumPy 백엔드"""
+    print("=== 참조 구현 vs NumPy 백엔드 ===")
+    open_, high, low, close, _ = random_prices(50, 120, seed=1)
+    metrics = bestk.evaluate(open_, high, low, close, backend='numpy')
+
+    for k_index, k in enumerate(bestk.K_GRID):
+        for ticker in range(close.shape[0]):
+            returns = reference_trades(open_[ticker], high[ticker],
+                                       low[ticker], close[ticker], k)
+            expected = reference_path(returns) if returns else (0.0, 0, 0)
+            actual = tuple(metrics[name][k_index, ticker]
+                           for name in kernels.PATH_METRICS)
+            np.testing.assert_allclose(actual[0], expected[0], atol=1e-9)
+            assert actual[1:] == expected[1:], (k, ticker, actual, expected)
+    print(f"종목 {close.shape[0]}개 × K {len(bestk.K_GRID)}개 일치")
+
+
+def test_backends():
+    """NumPy 백엔드 vs numba 백엔드 (evaluate, sweep)"""
+    print("=== NumPy 백엔드 vs numba 백엔드 ===")
+    if not kernels.HAVE_NUMBA:
+        print("numba 가 설치되지 않아 건너뜀")
+        return
+
+    open_, high, low, close, volume = random_prices(200, 250, seed=2)
+    timings = {}
+    results = {}
+    for backend in ('numpy', 'numba'):
+        # numba 는 첫 호출에 컴파일하므로 한 번 돌린 뒤 측정
+        bestk.evaluate(open_[:2], high[:2], low[:2], close[:2], backend=backend)
+        started = time.perf_counter()
+        results[backend] = bestk.evaluate(open_, high, low, close,
+                                          backend=backend)
+        timings[backend] = time.perf_counter() - started
+    assert_metrics_equal(results['numpy'], results['numba'], "evaluate")
+    print(f"evaluate 일치: numpy {timings['numpy'] * 1000:.1f}ms, "
+          f"numba {timings['numba'] * 1000:.1f}ms")
+
+    for backend in ('numpy', 'numba'):
+        started = time.perf_counter()
+        results[backend] = sweep.sweep(open_, high, low, close, volume,
+                                       backend=backend)
+        timings[backend] = time.perf_counter() - started
+    assert results['numpy'][0] == results['numba'][0]
+    assert_metrics_equal(results['numpy'][1], results['numba'][1], "sweep")
+    print(f"sweep {len(results['numpy'][0])}개 조합 일치: "
+          f"numpy {timings['numpy']:.2f}초, numba {timings['numba']:.2f}초")
+
+
+def main():
+    test_reference()
+    test_backends()
+    print("모든 테스트 통과")
+
+
+if __name__ == "__main__":
+    main()
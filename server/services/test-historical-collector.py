@@ -4,6 +4,7 @@ PostgreSQL 역사적 데이터 수집 테스트 스크립트
 실제 API 호출로 최근 몇 일간의 데이터를 수집하여 테스트
 """
 
+import importlib.util
 import sys
 import os
 from datetime import datetime, timedelta
@@ -11,12 +12,22 @@ from datetime import datetime, timedelta
 # 현재 디렉토리를 sys.path에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from trading_data.rankings import combine_frames, get_date_frame, get_ranking_frame
+
+
+def load_collector():
+    """historical-data-collector.py 모듈 (파일명에 '-' 가 있어 import 문으로는 불러올 수 없음)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'historical-data-collector.py')
+    spec = importlib.util.spec_from_file_location('historical_data_collector', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 def test_recent_data_collection():
     """최근 데이터 수집 테스트"""
     print("=== 최근 데이터 수집 테스트 ===")
     
-    from historical_data_collector import get_ranking_lists, get_unique_tickers, get_stock_details, combine_data
-    
     # 최근 평일 날짜 찾기 (주말 제외)
     test_date = datetime.now() - timedelta(days=1)
     while test_date.weekday() > 4:  # 주말 제외
@@ -24,61 +35,55 @@ def test_recent_data_collection():
     
     print(f"테스트 날짜: {test_date.strftime('%Y-%m-%d')}")
     
-    # 1. 랭킹 리스트 수집
-    ranking_data = get_ranking_lists(test_date)
-    if ranking_data:
-        print(f"랭킹 데이터 수집 성공: {len(ranking_data)}개")
-        
-        # 랭킹별 개수 확인
-        kospi_cap = len([r for r in ranking_data if r['market']=='KOSPI' and r['rank_type']=='market_cap'])
-        kosdaq_cap = len([r for r in ranking_data if r['market']=='KOSDAQ' and r['rank_type']=='market_cap'])
-        kospi_vol = len([r for r in ranking_data if r['market']=='KOSPI' and r['rank_type']=='volume'])
-        kosdaq_vol = len([r for r in ranking_data if r['market']=='KOSDAQ' and r['rank_type']=='volume'])
-        
-        print(f"  - KOSPI 시가총액: {kospi_cap}개")
-        print(f"  - KOSDAQ 시가총액: {kosdaq_cap}개")
-        print(f"  - KOSPI 거래량: {kospi_vol}개")
-        print(f"  - KOSDAQ 거래량: {kosdaq_vol}개")
-        
-        # 2. 중복 제거
-        unique_tickers = get_unique_tickers(ranking_data)
-        print(f"중복 제거 후 종목 수: {len(unique_tickers)}개")
-        
-        # 3. 상세 데이터 수집 (처음 20개만 테스트)
-        test_tickers = unique_tickers[:20]
-        print(f"상세 데이터 수집 테스트: {len(test_tickers)}개")
-        
-        stock_details = get_stock_details(test_date, test_tickers)
-        if stock_details:
-            print(f"종목 상세 데이터 수집 성공: {len(stock_details)}개")
-            
-            # 4. 데이터 결합
-            combined_data = combine_data(test_date, ranking_data[:80], stock_details)  # 랭킹 20개씩 4개 = 80개
-            print(f"데이터 결합 성공: {len(combined_data)}개")
-            
-            # 샘플 데이터 출력
-            print("\n샘플 데이터:")
-            for i, item in enumerate(combined_data[:5]):
-                print(f"  {i+1}. {item['symbol']} - {item['name']} ({item['market']} {item['rank_type']} {item['rank']}위)")
-                print(f"     종가: {item['close_price']:,.0f}원, 거래량: {item['volume']:,}주")
-            
-            return True
-        else:
-            print("종목 상세 데이터 수집 실패")
-            return False
-    else:
+    # 1. 시장 전체 일자 프레임 (시장별 원격 조회 2회)
+    frame = get_date_frame(test_date)
+    if frame.empty:
+        print("일자 데이터 수집 실패")
+        return False
+    print(f"일자 데이터 수집 성공: {len(frame)}개 종목")
+    
+    # 2. 랭킹 리스트 (일자 프레임에서 계산, 원격 호출 없음)
+    rankings = get_ranking_frame(test_date, frame=frame)
+    if rankings.empty:
         print("랭킹 데이터 수집 실패")
         return False
+    print(f"랭킹 데이터 수집 성공: {len(rankings)}개")
+    
+    # 랭킹별 개수 확인
+    counts = rankings.groupby(['market', 'rank_type']).size()
+    print(f"  - KOSPI 시가총액: {counts.get(('KOSPI', 'market_cap'), 0)}개")
+    print(f"  - KOSDAQ 시가총액: {counts.get(('KOSDAQ', 'market_cap'), 0)}개")
+    print(f"  - KOSPI 거래량: {counts.get(('KOSPI', 'volume'), 0)}개")
+    print(f"  - KOSDAQ 거래량: {counts.get(('KOSDAQ', 'volume'), 0)}개")
+    
+    # 3. 중복 제거
+    print(f"중복 제거 후 종목 수: {rankings['ticker'].nunique()}개")
+    
+    # 4. 데이터 결합 (랭킹별 상위 20개씩만, 종목명 조회를 줄이기 위해)
+    top = rankings.groupby(['market', 'rank_type']).head(20)
+    combined = combine_frames(test_date, top, frame)
+    if combined.empty:
+        print("데이터 결합 실패")
+        return False
+    print(f"데이터 결합 성공: {len(combined)}개")
+    
+    # 샘플 데이터 출력
+    print("\n샘플 데이터:")
+    for i, item in enumerate(combined.head(5).to_dict('records')):
+        print(f"  {i+1}. {item['symbol']} - {item['name']} ({item['market']} {item['rank_type']} {item['rank']}위)")
+        print(f"     종가: {item['close']:,.0f}원, 거래량: {item['volume']:,}주")
+    
+    return True
 
 def test_database_connection():
     """데이터베이스 연결 테스트"""
     print("\n=== 데이터베이스 연결 테스트 ===")
     
     try:
-        from historical_data_collector import get_database_connection, get_data_count
+        collector = load_collector()
         
-        conn = get_database_connection()
-        count = get_data_count(conn)
+        conn = collector.get_database_connection()
+        count = collector.get_data_count(conn)
         print(f"✅ PostgreSQL 연결 성공")
         print(f"현재 데이터 개수: {count:,}개")
         conn.close()
@@ -91,7 +96,7 @@ def test_small_collection():
     """소규모 데이터 수집 테스트"""
     print("\n=== 소규모 데이터 수집 테스트 ===")
     
-    from historical_data_collector import collect_historical_data
+    collector = load_collector()
     
     # 최근 5일간 데이터 수집 테스트
     end_date = datetime.now() - timedelta(days=1)
@@ -103,7 +108,8 @@ def test_small_collection():
     print(f"테스트 기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
     
     try:
-        collect_historical_data(start_date, end_date)
+        # 수집기는 최근 날짜(start)부터 과거(end)로 진행, 별도 job 으로 체크포인트 분리
+        collector.collect_historical_data(end_date, start_date, job='test_historical_collector', shard_days=3)
         print("✅ 소규모 데이터 수집 완료")
         return True
     except Exception as e:
@@ -4,13 +4,19 @@ MySQL 랭킹 데이터 수집 스크립트 테스트 실행
 4개 랭킹 리스트 수집 및 중복 제거 기능 테스트
 """
 
+import importlib.util
 import sys
 import os
 from datetime import datetime, timedelta
 
+import pandas as pd
+
 # 현재 디렉토리를 sys.path에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from trading_data.rankings import (COMBINED_COLUMNS, get_date_frame,
+                                   get_ranking_frame, ticker_name)
+
 # 환경 변수 설정 (테스트용)
 os.environ['DB_HOST'] = 'localhost'
 os.environ['DB_NAME'] = 'stock_db' 
@@ -18,38 +24,41 @@ os.environ['DB_USER'] = 'root'
 os.environ['DB_PASSWORD'] = ''
 os.environ['DB_PORT'] = '3306'
 
+
+def load_collector():
+    """daily-stock-collector-mysql.py 모듈 (파일명에 '-' 가 있어 import 문으로는 불러올 수 없음)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'daily-stock-collector-mysql.py')
+    spec = importlib.util.spec_from_file_location('daily_stock_collector_mysql', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 def test_ranking_lists():
     """랭킹 리스트 수집 함수 테스트"""
     print("=== 랭킹 리스트 수집 테스트 ===")
     
-    # 테스트를 위해 함수 import
-    from daily_stock_collector_mysql import get_ranking_lists
-    
     # 어제 날짜로 테스트
     yesterday = datetime.now() - timedelta(days=1)
     
     print(f"테스트 날짜: {yesterday.strftime('%Y-%m-%d')}")
     
-    # 랭킹 데이터 수집 시도
-    ranking_data = get_ranking_lists(yesterday)
+    # 랭킹 데이터 수집 시도 (long-format DataFrame)
+    rankings = get_ranking_frame(yesterday)
     
-    if ranking_data:
-        print(f"수집된 랭킹 데이터 개수: {len(ranking_data)}")
+    if not rankings.empty:
+        print(f"수집된 랭킹 데이터 개수: {len(rankings)}")
         
         # 랭킹별 개수 확인
-        kospi_cap = len([r for r in ranking_data if r['market']=='KOSPI' and r['rank_type']=='market_cap'])
-        kosdaq_cap = len([r for r in ranking_data if r['market']=='KOSDAQ' and r['rank_type']=='market_cap'])
-        kospi_vol = len([r for r in ranking_data if r['market']=='KOSPI' and r['rank_type']=='volume'])
-        kosdaq_vol = len([r for r in ranking_data if r['market']=='KOSDAQ' and r['rank_type']=='volume'])
-        
-        print(f"  - KOSPI 시가총액: {kospi_cap}개")
-        print(f"  - KOSDAQ 시가총액: {kosdaq_cap}개")
-        print(f"  - KOSPI 거래량: {kospi_vol}개")
-        print(f"  - KOSDAQ 거래량: {kosdaq_vol}개")
+        counts = rankings.groupby(['market', 'rank_type']).size()
+        print(f"  - KOSPI 시가총액: {counts.get(('KOSPI', 'market_cap'), 0)}개")
+        print(f"  - KOSDAQ 시가총액: {counts.get(('KOSDAQ', 'market_cap'), 0)}개")
+        print(f"  - KOSPI 거래량: {counts.get(('KOSPI', 'volume'), 0)}개")
+        print(f"  - KOSDAQ 거래량: {counts.get(('KOSDAQ', 'volume'), 0)}개")
         
         print("샘플 랭킹 데이터:")
-        for i, item in enumerate(ranking_data[:5]):  # 처음 5개만 출력
-            print(f"  {i+1}. {item['code']} - {item['market']} {item['rank_type']} {item['rank']}위")
+        for i, item in enumerate(rankings.head(5).to_dict('records')):  # 처음 5개만 출력
+            print(f"  {i+1}. {item['ticker']} - {item['market']} {item['rank_type']} {item['rank']}위")
     else:
         print("랭킹 데이터 수집 실패")
 
@@ -57,16 +66,14 @@ def test_unique_tickers():
     """중복 제거 함수 테스트"""
     print("\n=== 중복 제거 테스트 ===")
     
-    from daily_stock_collector_mysql import get_ranking_lists, get_unique_tickers
-    
     yesterday = datetime.now() - timedelta(days=1)
-    ranking_data = get_ranking_lists(yesterday)
+    rankings = get_ranking_frame(yesterday)
     
-    if ranking_data:
-        unique_tickers = get_unique_tickers(ranking_data)
-        print(f"전체 랭킹 데이터: {len(ranking_data)}개")
+    if not rankings.empty:
+        unique_tickers = list(rankings['ticker'].unique())
+        print(f"전체 랭킹 데이터: {len(rankings)}개")
         print(f"중복 제거 후 종목: {len(unique_tickers)}개")
-        print(f"중복 제거율: {((len(ranking_data) - len(unique_tickers)) / len(ranking_data) * 100):.1f}%")
+        print(f"중복 제거율: {((len(rankings) - len(unique_tickers)) / len(rankings) * 100):.1f}%")
         
         print("샘플 종목 코드:")
         for i, ticker in enumerate(unique_tickers[:10]):  # 처음 10개만 출력
@@ -78,20 +85,20 @@ def test_stock_details():
     """종목 상세 데이터 수집 테스트"""
     print("\n=== 종목 상세 데이터 수집 테스트 ===")
     
-    from daily_stock_collector_mysql import get_stock_details
-    
     yesterday = datetime.now() - timedelta(days=1)
     # 테스트용 종목 코드 (삼성전자, SK하이닉스, 네이버)
     test_tickers = ['005930', '000660', '035420']
     
     print(f"테스트 종목: {test_tickers}")
     
-    stock_details = get_stock_details(yesterday, test_tickers)
+    # 종목 상세는 시장 전체 일자 프레임에서 꺼냄 (종목별 원격 호출 없음)
+    frame = get_date_frame(yesterday)
+    stock_details = frame[frame.index.isin(test_tickers)]
     
-    if stock_details:
+    if not stock_details.empty:
         print(f"수집된 종목 상세 데이터: {len(stock_details)}개")
-        for ticker, detail in stock_details.items():
-            print(f"  {ticker} - {detail['name']}: {detail['close']:,}원")
+        for ticker, detail in stock_details.iterrows():
+            print(f"  {ticker} - {ticker_name(ticker)}: {detail['종가']:,}원")
     else:
         print("종목 상세 데이터 수집 실패")
 
@@ -100,9 +107,9 @@ def test_database_connection():
     print("\n=== 데이터베이스 연결 테스트 ===")
     
     try:
-        from daily_stock_collector_mysql import get_database_connection
+        collector = load_collector()
         
-        conn = get_database_connection()
+        conn = collector.get_database_connection()
         print("✅ 데이터베이스 연결 성공")
         
         cursor = conn.cursor()
@@ -121,18 +128,18 @@ def test_database_operations():
     print("\n=== 데이터베이스 CRUD 테스트 ===")
     
     try:
-        from daily_stock_collector_mysql import get_database_connection, insert_daily_data, get_data_count
+        collector = load_collector()
         
-        conn = get_database_connection()
+        conn = collector.get_database_connection()
         
         # 현재 데이터 개수 확인
-        initial_count = get_data_count(conn)
+        initial_count = collector.get_data_count(conn)
         print(f"현재 데이터 개수: {initial_count:,}개")
         
-        # 테스트 데이터 생성
-        test_data = [{
+        # 테스트 데이터 생성 (rankings.combine_frames 결과와 같은 컬럼)
+        test_data = pd.DataFrame([{
             'date': '2025-01-01',
-            'code': 'TEST01',
+            'symbol': 'TEST01',
             'market': 'KOSPI',
             'rank_type': 'market_cap',
             'rank': 1,
@@ -143,14 +150,14 @@ def test_database_operations():
             'close': 10500,
             'volume': 1000000,
             'market_cap': 1000000000
-        }]
+        }], columns=COMBINED_COLUMNS)
         
         # 데이터 삽입 테스트
-        inserted = insert_daily_data(conn, test_data)
+        inserted = collector.insert_daily_data(conn, test_data)
         print(f"테스트 데이터 삽입: {inserted}개")
         
         # 삽입 후 개수 확인
-        after_count = get_data_count(conn)
+        after_count = collector.get_data_count(conn)
         print(f"삽입 후 데이터 개수: {after_count:,}개")
         
         # 테스트 데이터 삭제
@@ -160,7 +167,7 @@ def test_database_operations():
         cursor.close()
         
         # 삭제 후 개수 확인
-        final_count = get_data_count(conn)
+        final_count = collector.get_data_count(conn)
         print(f"삭제 후 데이터 개수: {final_count:,}개")
         
         conn.close()
@@ -0,0 +1,28 @@
+"""주식 데이터 수집 공통 라이브러리
+
+server/services 의 스크립트들이 공유하는 수집 엔진, 데이터 소스, 캐시, 속도 제한기.
+스크립트는 `python3 server/services/<script>.py` 로 실행되므로
+스크립트 디렉터리가 sys.path 에 포함되어 `import trading_data` 로 사용할 수 있다.
+"""
+
+from .cache import FileCache
+from .engine import Collector
+from .fundamentals import KrxFundamentals, TickerInfoCache
+from .ratelimit import FileRateLimiter, RateLimiter
+from .records import build_record, rank_symbols, sort_records
+from .sources import PykrxSource, SyntheticSource, YFinanceSource
+
+__all__ = [
+    "Collector",
+    "FileCache",
+    "FileRateLimiter",
+    "KrxFundamentals",
+    "PykrxSource",
+    "RateLimiter",
+    "SyntheticSource",
+    "TickerInfoCache",
+    "YFinanceSource",
+    "build_record",
+    "rank_symbols",
+    "sort_records",
+]
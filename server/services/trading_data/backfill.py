@@ -0,0 +1,192 @@
+"""프로세스 풀 기반 샤드 병렬 백필
+
+- 기간을 샤드로 나눠 BackfillCheckpoint 에 등록하고, 워커 수만큼 샤드를 가져와
+  프로세스 풀에서 동시에 수집한다.
+- 워커는 pykrx 조회만 하고 DB 에 접근하지 않는다. 하루치 결과를 큐로 보내면
+  메인 프로세스(단일 writer)가 daily_stock_data 저장과 체크포인트 기록을 맡는다.
+- 모든 워커는 FileRateLimiter 하나를 공유해 전체 호출 속도가 예산을 넘지 않는다.
+- 워커 1개일 때는 run_claimed 가 같은 샤드 등록/할당 흐름을 이 프로세스 안에서
+  돌린다 (같은 job 으로 여러 프로세스를 띄우면 샤드를 나눠 가짐).
+"""
+
+import logging
+import queue as queue_module
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+
+from .checkpoint import iter_dates_desc
+from .rankings import combine_frames, get_date_frame, get_ranking_frame
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_date(day, rate_limiter=None):
+    """하루치 랭킹 + 종목 상세 결합 DataFrame (데이터가 없으면 None)
+
+    원격 호출은 get_date_frame 의 시장 전체 조회뿐이다.
+    """
+    frame = get_date_frame(day, rate_limiter)
+    rankings = get_ranking_frame(day, frame=frame)
+    if rankings.empty:
+        logger.warning(f"{day.strftime('%Y-%m-%d')} 랭킹 데이터 없음")
+        return None
+
+    logger.info(f"{day.strftime('%Y-%m-%d')} 중복 제거 후 종목 수: {rankings['ticker'].nunique()}개")
+
+    combined = combine_frames(day, rankings, frame)
+    if combined.empty:
+        logger.warning(f"{day.strftime('%Y-%m-%d')} 결합된 데이터 없음")
+        return None
+    return combined
+
+
+def _fetch_shard(shard_id, shard_start, shard_end, skip, rate_limiter,
+                 results):
+    """워커 프로세스: 샤드 안의 날짜를 최근 날짜부터 수집해 큐로 전달"""
+    error = None
+    try:
+        for day in iter_dates_desc(shard_start, shard_end):
+            if day in skip:
+                continue
+            try:
+                results.put(('date', shard_id, (day, fetch_date(day, rate_limiter))))
+            except Exception as e:
+                logger.error(f"{day} 수집 중 오류: {e}")
+                results.put(('error', shard_id, (day, str(e))))
+    except BaseException as e:
+        error = str(e)
+        raise
+    finally:
+        results.put(('shard', shard_id, error))
+
+
+def run_claimed(checkpoint, earliest_date, latest_date, collect, shard_days=30):
+    """[earliest_date, latest_date] 를 샤드로 등록하고 이 프로세스에서 하나씩 처리
+
+    - collect(shard_start, shard_end, heartbeat): 샤드 하나를 수집하고
+      (저장한 날짜 수, 저장 건수, 실패한 날짜 수) 를 반환하는 함수.
+      하루를 처리할 때마다 heartbeat() 를 불러 샤드가 재할당되지 않게 한다.
+    - 실패한 날짜가 있는 샤드는 failed 로 남겨 다음 plan_shards 때 다시 대기.
+
+    반환값: (저장한 날짜 수, 저장 건수)
+    """
+    shard_count = checkpoint.plan_shards(earliest_date, latest_date, shard_days)
+    logger.info(f"샤드 {shard_count}개 등록 ({shard_days}일 단위)")
+
+    saved_dates = 0
+    total_inserted = 0
+    while True:
+        shard = checkpoint.claim_shard()
+        if shard is None:
+            break
+        shard_id, shard_start, shard_end = shard
+        try:
+            dates, inserted, failed = collect(
+                shard_start, shard_end, lambda: checkpoint.heartbeat(shard_id))
+        except BaseException:
+            checkpoint.fail_shard(shard_id)
+            raise
+        saved_dates += dates
+        total_inserted += inserted
+        if failed:
+            checkpoint.fail_shard(shard_id)
+            logger.error(f"샤드 {shard_id} 실패 (오류 {failed}일)")
+        else:
+            checkpoint.complete_shard(shard_id)
+            logger.info(f"샤드 {shard_id} 완료, 전체 현황: {checkpoint.progress()}")
+
+    return saved_dates, total_inserted
+
+
+def run_sharded(checkpoint,
+                earliest_date,
+                latest_date,
+                write,
+                workers=4,
+                shard_days=30,
+                rate_limiter=None,
+                poll_seconds=5):
+    """[earliest_date, latest_date] 를 샤드 병렬로 백필
+
+    - checkpoint: BackfillCheckpoint (메인 프로세스 연결)
+    - write: 하루치 결합 DataFrame 을 저장하고 저장 건수를 반환하는 함수
+    - rate_limiter: 워커에 넘길 전역 속도 제한기 (FileRateLimiter 등 pickle 가능해야 함)
+
+    반환값: (저장한 날짜 수, 저장 건수)
+    """
+    shard_count = checkpoint.plan_shards(earliest_date, latest_date, shard_days)
+    logger.info(f"샤드 {shard_count}개 등록 ({shard_days}일 단위), 워커 {workers}개")
+
+    started = time.time()
+    saved_dates = 0
+    total_inserted = 0
+
+    with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as pool:
+        results = manager.Queue()
+        running = {}
+        failures = {}
+
+        def submit_next():
+            shard = checkpoint.claim_shard()
+            if shard is None:
+                return False
+            shard_id, shard_start, shard_end = shard
+            skip = checkpoint.completed_dates(shard_start, shard_end)
+            running[shard_id] = pool.submit(_fetch_shard, shard_id,
+                                            shard_start, shard_end, skip,
+                                            rate_limiter, results)
+            return True
+
+        for _ in range(workers):
+            if not submit_next():
+                break
+
+        while running:
+            try:
+                kind, shard_id, payload = results.get(timeout=poll_seconds)
+            except queue_module.Empty:
+                # 워커 프로세스가 강제 종료되면 완료 메시지가 오지 않으므로 직접 확인
+                for shard_id, future in list(running.items()):
+                    if future.done() and future.exception() is not None:
+                        logger.error(f"샤드 {shard_id} 워커 실패: {future.exception()}")
+                        running.pop(shard_id)
+                        checkpoint.fail_shard(shard_id)
+                        submit_next()
+                continue
+
+            if kind == 'date':
+                day, rows = payload
+                if rows is None:
+                    checkpoint.mark_done(day, status='empty')
+                else:
+                    try:
+                        inserted = write(rows)
+                    except Exception as e:
+                        logger.error(f"{day} 저장 실패: {e}")
+                        failures[shard_id] = failures.get(shard_id, 0) + 1
+                        continue
+                    checkpoint.mark_done(day, rows=inserted)
+                    saved_dates += 1
+                    total_inserted += inserted
+                checkpoint.heartbeat(shard_id)
+
+                if saved_dates and saved_dates % 10 == 0 and rows is not None:
+                    hours = (time.time() - started) / 3600
+                    logger.info(f"진행 상황: {saved_dates}일 저장, 총 {total_inserted:,}개, "
+                                f"{saved_dates / max(hours, 1e-9):.1f}일/시간")
+            elif kind == 'error':
+                # 실패한 날짜는 기록하지 않으므로 다음 실행에서 다시 수집됨
+                failures[shard_id] = failures.get(shard_id, 0) + 1
+                checkpoint.heartbeat(shard_id)
+            elif kind == 'shard':
+                running.pop(shard_id, None)
+                if payload is None and not failures.get(shard_id):
+                    checkpoint.complete_shard(shard_id)
+                    logger.info(f"샤드 {shard_id} 완료, 전체 현황: {checkpoint.progress()}")
+                else:
+                    checkpoint.fail_shard(shard_id)
+                    logger.error(f"샤드 {shard_id} 실패 (오류 {failures.get(shard_id, 0)}일): {payload}")
+                submit_next()
+
+    return saved_dates, total_inserted
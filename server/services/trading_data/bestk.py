@@ -0,0 +1,177 @@
+"""변동성 돌파(Best K) 전 종목 일괄 평가
+
+best-k-calculator.py 의 simulate_k_value 와 같은 규칙을 (K × 종목 × 거래일)
+텐서로 한 번에 계산한다. 입력은 (종목 수, 거래일 수) OHLC 행렬이며 종목마다
+데이터가 있는 날짜를 앞으로 모은 행렬(뒤쪽은 NaN)을 기준으로 한다.
+가격 큐브처럼 중간에 NaN 이 있는 행렬은 compact_left() 로 먼저 정렬한다.
+
+규칙 (전일 prev, 당일 today 쌍마다)
+- prev 고가 <= 저가 인 쌍은 건너뜀
+- 목표가 = 당일 시가 + 전일 변동폭 × K
+- 당일 고가가 목표가 이상이면 (목표가 - 시가)/시가 수익으로 승리
+- 아니면 시가/종가가 양수일 때 (종가 - 시가)/시가 수익
+- MDD 는 수익률(%) 누적합의 최대 낙폭, sharpe = 평균 수익률 / max(MDD, 0.1)
+- 복리 MDD, 연속 손실, 고점 회복 전 거래 수 같은 경로 지표는 kernels 모듈
+  (numba 또는 NumPy) 로 계산한다
+
+텐서는 chunk_bytes 안에 들어가도록 종목 단위로 나눠 계산한다.
+"""
+
+import numpy as np
+
+from .kernels import PATH_METRICS, path_metrics
+
+K_GRID = np.round(np.arange(0.1, 1.0, 0.1), 1)
+
+METRICS = ('avg_return_pct', 'win_rate_pct', 'mdd_pct', 'trades',
+           'sharpe') + PATH_METRICS
+
+COUNT_METRICS = ('trades', 'max_loss_streak', 'underwater_trades')
+
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+# 종목 하나, K 하나, 거래일 하루에 필요한 float64 임시 배열 수 (대략)
+_TEMPORARIES = 14
+
+
+def stack_series(series, fields=('open', 'high', 'low', 'close')):
+    """종목별 가격 dict 리스트 목록 -> {필드: (종목 수, 최대 길이) float64}
+
+    짧은 종목의 뒤쪽은 NaN.
+    """
+    length = max((len(rows) for rows in series), default=0)
+    arrays = {
+        field: np.full((len(series), length), np.nan) for field in fields
+    }
+    for i, rows in enumerate(series):
+        for field in fields:
+            arrays[field][i, :len(rows)] = [row[field] for row in rows]
+    return arrays
+
+
+def compact_left(*matrices):
+    """종가가 NaN 이 아닌 날짜를 행마다 앞으로 모음 (순서 유지)
+
+    모든 행렬에 같은 재배열을 적용해 튜플로 반환한다.
+    """
+    missing = np.isnan(matrices[-1])
+    order = np.argsort(missing, axis=1, kind='stable')
+    return tuple(np.take_along_axis(matrix, order, axis=1)
+                 for matrix in matrices)
+
+
+def summarize(returns, has_return, wins, traded, backend=None):
+    """거래일 축(마지막 축) 집계 -> {지표: 앞쪽 축 모양 배열}
+
+    - returns: 거래별 수익률(%) (수익이 없는 칸은 0)
+    - has_return, wins: returns 와 같은 모양의 bool
+    - traded: 거래 여부 (returns 모양으로 broadcast 가능)
+    - backend: 경로 지표 계산 백엔드 (kernels.resolve_backend)
+    """
+    trades = np.broadcast_to(traded, returns.shape).sum(axis=-1)
+    count = has_return.sum(axis=-1)
+
+    cumulative = np.cumsum(returns, axis=-1)
+    peak = np.maximum(np.maximum.accumulate(cumulative, axis=-1), 0.0)
+    mdd = (peak - cumulative).max(axis=-1, initial=0.0)
+
+    empty = (count == 0) | (trades == 0)
+    avg = np.where(empty, 0.0, returns.sum(axis=-1) / np.maximum(count, 1))
+    win_rate = np.where(empty, 0.0,
+                        wins.sum(axis=-1) / np.maximum(trades, 1) * 100)
+    mdd = np.where(empty, 0.0, mdd)
+    metrics = {
+        'avg_return_pct': avg,
+        'win_rate_pct': win_rate,
+        'mdd_pct': mdd,
+        'trades': np.where(empty, 0, trades),
+        'sharpe': avg / np.maximum(mdd, 0.1),
+    }
+    for name, values in path_metrics(returns, has_return, backend).items():
+        metrics[name] = np.where(empty, 0, values)
+    return metrics
+
+
+def trade_returns(open_, high, low, close, k_grid=K_GRID):
+    """(종목, 거래일) 행렬 -> K 별 일별 거래 결과 (K, 종목, 거래일 - 1)
+
+    (returns, has_return, hit, traded) 를 반환하며 summarize() 에 그대로
+    넘길 수 있다. i 번째 칸은 전일 = i, 당일 = i + 1 쌍이다.
+    """
+    k_grid = np.asarray(k_grid, dtype=np.float64)
+    prev_high, prev_low = high[:, :-1], low[:, :-1]
+    today_open, today_high, today_close = open_[:, 1:], high[:, 1:], close[:, 1:]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # NaN 비교는 False 이므로 데이터가 없는 쌍은 자연히 제외된다
+        traded = (prev_high > prev_low) & ~np.isnan(today_open)
+        daily_range = prev_high - prev_low
+
+        target = today_open[None] + daily_range[None] * k_grid[:, None, None]
+        hit = traded[None] & (today_high[None] >= target) & (
+            target > today_open[None])
+        valid_price = traded & (today_close > 0) & (today_open > 0)
+        has_return = hit | valid_price[None]
+
+        returns = np.where(
+            hit, (target - today_open[None]) / today_open[None] * 100,
+            np.where(valid_price, (today_close - today_open) / today_open *
+                     100, 0.0)[None])
+        returns = np.where(has_return, returns, 0.0)
+
+    return returns, has_return, hit, traded
+
+
+def _evaluate_chunk(open_, high, low, close, k_grid, backend=None):
+    """(종목, 거래일) 행렬 한 덩어리 -> {지표: (K, 종목)}"""
+    return summarize(*trade_returns(open_, high, low, close, k_grid), backend)
+
+
+def evaluate(open_, high, low, close, k_grid=K_GRID,
+             chunk_bytes=DEFAULT_CHUNK_BYTES, backend=None):
+    """(종목, 거래일) OHLC 행렬 -> {지표: (K, 종목) 배열}
+
+    입력은 float32 도 받으며 계산은 float64 로 한다.
+    """
+    k_grid = np.asarray(k_grid, dtype=np.float64)
+    tickers, days = close.shape
+    per_ticker = max(len(k_grid) * max(days, 1) * 8 * _TEMPORARIES, 1)
+    step = max(1, chunk_bytes // per_ticker)
+
+    results = {
+        name: np.zeros((len(k_grid), tickers),
+                       dtype=np.int64 if name in COUNT_METRICS else np.float64)
+        for name in METRICS
+    }
+    if days < 2:
+        return results
+
+    for start in range(0, tickers, step):
+        rows = slice(start, start + step)
+        chunk = _evaluate_chunk(
+            *(np.asarray(matrix[rows], dtype=np.float64)
+              for matrix in (open_, high, low, close)), k_grid, backend)
+        for name in METRICS:
+            results[name][:, rows] = chunk[name]
+    return results
+
+
+def best_k(metrics, k_grid=K_GRID):
+    """sharpe 최대 K (동률이면 작은 K) -> (K 값 배열, {지표: 종목별 값})"""
+    index = np.argmax(metrics['sharpe'], axis=0)
+    columns = np.arange(index.shape[0])
+    chosen = {name: values[index, columns] for name, values in metrics.items()}
+    return np.asarray(k_grid)[index], chosen
+
+
+def evaluate_cube(price_cube, start_date=None, end_date=None, symbols=None,
+                  k_grid=K_GRID, chunk_bytes=DEFAULT_CHUNK_BYTES,
+                  backend=None):
+    """PriceCube 기간/종목 -> (symbols, metrics, 데이터 일수)"""
+    window = price_cube.window(start_date, end_date, symbols)
+    matrices = compact_left(*(window.field(name)
+                              for name in ('open', 'high', 'low', 'close')))
+    days = (~np.isnan(matrices[-1])).sum(axis=1)
+    return window.symbols, evaluate(*matrices, k_grid=k_grid,
+                                    chunk_bytes=chunk_bytes,
+                                    backend=backend), days
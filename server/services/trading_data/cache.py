@@ -0,0 +1,49 @@
+"""수집 결과 파일 캐시"""
+
+import os
+import pickle
+import time
+
+CACHE_DIR = os.getenv("STOCK_CACHE_DIR", "/tmp/stock_cache")
+CACHE_EXPIRY_HOURS = 24
+
+
+class FileCache:
+    """pickle 파일 기반 캐시 (만료 시간 경과 시 미스 처리)"""
+
+    def __init__(self, directory=CACHE_DIR, expiry_hours=CACHE_EXPIRY_HOURS):
+        self.directory = directory
+        self.expiry_seconds = expiry_hours * 3600
+
+    def _path(self, key):
+        safe_key = "".join(c if c.isalnum() or c in "-_." else "_"
+                           for c in str(key))
+        return os.path.join(self.directory, f"{safe_key}.pkl")
+
+    def get(self, key):
+        """캐시 조회 (없거나 만료/손상 시 None)"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.expiry_seconds:
+                return None
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def set(self, key, value):
+        """캐시 저장 (원자적 교체, 실패는 무시)"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+def request_key(country, market, start_date, end_date, sort_by, limit):
+    """수집 요청 단위 캐시 키"""
+    return f"{country}_{market}_{start_date}_{end_date}_{sort_by}_{limit}"
@@ -0,0 +1,264 @@
+"""장기 백필 작업의 진행 상태 저장 (체크포인트/재시작, 샤드 분배)
+
+- backfill_job_state: 완료된 (작업, 일자, 소스) 단위. 재시작 시 이 일자들은 건너뜀
+- backfill_shards: 기간을 나눈 샤드. 여러 프로세스가
+  FOR UPDATE SKIP LOCKED 로 서로 겹치지 않게 하나씩 가져감. 샤드는 기간
+  (job, start_date, end_date) 으로 식별하므로 기간이나 샤드 크기를 바꿔 다시
+  계획하면 새 기간만 새 shard_id 로 추가된다
+
+테이블 정의는 shared/schema.ts 의 backfillJobState / backfillShards 와 같다.
+"""
+
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# 완료로 간주하는 단위 상태 (empty: 휴장일 등 수집할 데이터가 없던 날)
+DONE_STATUSES = ('done', 'empty')
+
+DDL = """
+CREATE TABLE IF NOT EXISTS backfill_job_state (
+    job TEXT NOT NULL,
+    unit_date DATE NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    completed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (job, unit_date, source)
+);
+CREATE TABLE IF NOT EXISTS backfill_shards (
+    job TEXT NOT NULL,
+    shard_id INTEGER NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, running, done, failed
+    owner TEXT,
+    claimed_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    PRIMARY KEY (job, shard_id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS backfill_shards_range_idx
+    ON backfill_shards (job, start_date, end_date);
+"""
+
+
+def default_owner():
+    """샤드 소유자 식별자 (호스트명:PID)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def split_range(start_date, end_date, shard_days):
+    """[start_date, end_date] 를 shard_days 일 단위 (시작, 끝) 목록으로 분할"""
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    shards = []
+    current = start_date
+    while current <= end_date:
+        shard_end = min(current + timedelta(days=shard_days - 1), end_date)
+        shards.append((current, shard_end))
+        current = shard_end + timedelta(days=1)
+    return shards
+
+
+def number_shards(shards, existing):
+    """계획한 (시작, 끝) 목록에 shard_id 를 붙임
+
+    existing: 이미 등록된 {(start_date, end_date): shard_id}. 같은 기간은 기존
+    번호를 그대로 쓰고, 처음 보는 기간은 기존 최대 번호 다음부터 차례로 받는다.
+    반환값: [(shard_id, start_date, end_date, 새 기간 여부)]
+    """
+    next_id = max(existing.values(), default=-1) + 1
+    numbered = []
+    for shard_start, shard_end in shards:
+        shard_id = existing.get((shard_start, shard_end))
+        if shard_id is None:
+            numbered.append((next_id, shard_start, shard_end, True))
+            next_id += 1
+        else:
+            numbered.append((shard_id, shard_start, shard_end, False))
+    return numbered
+
+
+class BackfillCheckpoint:
+    """psycopg2 연결 하나로 작업 진행 상태를 읽고 쓰는 헬퍼
+
+    - job: 작업 이름 (같은 이름으로 재실행하면 이어서 진행)
+    - source: 데이터 소스 이름 (같은 일자라도 소스별로 따로 기록)
+    """
+
+    def __init__(self, connection, job, source='pykrx'):
+        self.connection = connection
+        self.job = job
+        self.source = source
+
+    def ensure_tables(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(DDL)
+        self.connection.commit()
+
+    def completed_dates(self, start_date=None, end_date=None):
+        """완료된 일자 집합 (start_date/end_date 로 범위 제한 가능)"""
+        query = """
+            SELECT unit_date FROM backfill_job_state
+            WHERE job = %s AND source = %s AND status IN %s
+        """
+        params = [self.job, self.source, DONE_STATUSES]
+        if start_date is not None:
+            query += " AND unit_date >= %s"
+            params.append(_as_date(start_date))
+        if end_date is not None:
+            query += " AND unit_date <= %s"
+            params.append(_as_date(end_date))
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return {row[0] for row in cursor.fetchall()}
+
+    def mark_done(self, unit_date, rows=0, status='done'):
+        """일자 하나를 완료로 기록하고 커밋
+
+        데이터 INSERT 와 별도 커밋이므로 그 사이에 중단되면 해당 일자는 다시
+        수집된다. daily_stock_data 는 ON CONFLICT 로 덮어쓰므로 중복되지 않는다.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO backfill_job_state
+                    (job, unit_date, source, status, row_count, completed_at)
+                VALUES (%s, %s, %s, %s, %s, NOW())
+                ON CONFLICT (job, unit_date, source) DO UPDATE SET
+                    status = EXCLUDED.status,
+                    row_count = EXCLUDED.row_count,
+                    completed_at = EXCLUDED.completed_at
+                """, (self.job, _as_date(unit_date), self.source, status,
+                      rows))
+        self.connection.commit()
+
+    def plan_shards(self, start_date, end_date, shard_days=30):
+        """기간을 샤드로 나눠 등록하고 샤드 수 반환
+
+        같은 기간의 샤드가 이미 있으면 그대로 두되, 실패(failed) 샤드는 다시 대기
+        상태로 돌린다. 처음 보는 기간은 기존 shard_id 다음 번호로 추가한다 (번호
+        사이가 비어도 됨). 이전 계획과 겹치는 날짜는 completed_dates 로 건너뛴다.
+        """
+        shards = split_range(start_date, end_date, shard_days)
+        with self.connection.cursor() as cursor:
+            # 같은 작업을 동시에 계획하는 프로세스끼리 번호가 겹치지 않도록 잠금
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))",
+                           (f"backfill_shards:{self.job}", ))
+            cursor.execute(
+                "SELECT start_date, end_date, shard_id FROM backfill_shards "
+                "WHERE job = %s", (self.job, ))
+            existing = {(row[0], row[1]): row[2] for row in cursor.fetchall()}
+            for shard_id, shard_start, shard_end, new in number_shards(
+                    shards, existing):
+                if new:
+                    cursor.execute(
+                        """
+                        INSERT INTO backfill_shards (job, shard_id, start_date, end_date)
+                        VALUES (%s, %s, %s, %s)
+                        """, (self.job, shard_id, shard_start, shard_end))
+                else:
+                    cursor.execute(
+                        """
+                        UPDATE backfill_shards SET status = 'pending'
+                        WHERE job = %s AND shard_id = %s AND status = 'failed'
+                        """, (self.job, shard_id))
+        self.connection.commit()
+        return len(shards)
+
+    def shard_ranges(self):
+        """등록된 샤드 [(shard_id, start_date, end_date, status)] (shard_id 순)"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT shard_id, start_date, end_date, status FROM backfill_shards
+                WHERE job = %s ORDER BY shard_id
+                """, (self.job, ))
+            return cursor.fetchall()
+
+    def claim_shard(self, owner=None, stale_minutes=30):
+        """대기 중인(또는 하트비트가 끊긴) 샤드 하나를 가져옴
+
+        반환값: (shard_id, start_date, end_date) 또는 남은 샤드가 없으면 None
+        """
+        owner = owner or default_owner()
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE backfill_shards SET
+                    status = 'running',
+                    owner = %s,
+                    claimed_at = NOW(),
+                    heartbeat_at = NOW()
+                WHERE job = %s AND shard_id = (
+                    SELECT shard_id FROM backfill_shards
+                    WHERE job = %s AND (
+                        status = 'pending' OR (
+                            status = 'running' AND
+                            heartbeat_at < NOW() - make_interval(mins => %s)))
+                    ORDER BY shard_id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1)
+                RETURNING shard_id, start_date, end_date
+                """, (owner, self.job, self.job, stale_minutes))
+            row = cursor.fetchone()
+        self.connection.commit()
+        if row:
+            logger.info(f"샤드 {row[0]} 할당: {row[1]} ~ {row[2]} ({owner})")
+        return row
+
+    def heartbeat(self, shard_id):
+        """장시간 처리 중인 샤드가 다른 프로세스에 재할당되지 않도록 갱신"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE backfill_shards SET heartbeat_at = NOW()
+                WHERE job = %s AND shard_id = %s
+                """, (self.job, shard_id))
+        self.connection.commit()
+
+    def complete_shard(self, shard_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE backfill_shards SET status = 'done', completed_at = NOW()
+                WHERE job = %s AND shard_id = %s
+                """, (self.job, shard_id))
+        self.connection.commit()
+
+    def fail_shard(self, shard_id):
+        """실패한 날짜가 남은 샤드 - 다음 plan_shards 때 다시 대기 상태가 됨"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE backfill_shards SET status = 'failed'
+                WHERE job = %s AND shard_id = %s
+                """, (self.job, shard_id))
+        self.connection.commit()
+
+    def progress(self):
+        """샤드 상태별 개수 {status: count}"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT status, COUNT(*) FROM backfill_shards
+                WHERE job = %s GROUP BY status
+                """, (self.job, ))
+            return dict(cursor.fetchall())
+
+
+def iter_dates_desc(start_date, end_date):
+    """end_date 부터 start_date 까지 하루씩 거꾸로 (기존 수집 순서와 동일)"""
+    current = _as_date(end_date)
+    start_date = _as_date(start_date)
+    while current >= start_date:
+        yield current
+        current -= timedelta(days=1)
@@ -0,0 +1,71 @@
+"""data-collector-*.py 공통 CLI 진입점
+
+stdin 으로 dataCollectionRequest JSON 을 받아 stdout 으로 결과 JSON 을 출력한다.
+요청마다 소스 호출/캐시 지표를 스크립트 이름을 job 으로 해 metrics.export() 로
+내보낸다 (실행 보고서 파일은 남기지 않음).
+"""
+
+import json
+import os
+import sys
+import traceback
+
+from . import metrics
+from .engine import Collector, configure_logging
+from .instrument import Recorder
+from .ratelimit import RateLimiter
+from .sources import default_source
+
+
+def run(source_factory=default_source,
+        cache=None,
+        rate=None,
+        burst=1,
+        max_workers=4,
+        retries=1):
+    """요청 JSON 을 읽어 수집 실행 후 결과 출력
+
+    - source_factory: country -> 소스 객체
+    - rate: 초당 최대 소스 호출 수 (None 이면 제한 없음)
+    """
+    configure_logging()
+    recorder = Recorder(os.path.splitext(os.path.basename(sys.argv[0]))[0])
+
+    try:
+        input_data = json.loads(sys.stdin.read())
+
+        start_date = input_data['startDate']
+        end_date = input_data['endDate']
+        country = input_data['country']
+        market = input_data['market']
+        sort_by = input_data.get('sortBy')
+        limit = input_data.get('limit')
+
+        collector = Collector(
+            source_factory(country),
+            cache=cache,
+            rate_limiter=RateLimiter(rate, burst) if rate else None,
+            max_workers=max_workers,
+            retries=retries,
+            recorder=recorder)
+        data = collector.collect(start_date, end_date, market, sort_by, limit)
+        recorder.count("records", len(data))
+        metrics.export(recorder.report())
+
+        print(
+            json.dumps({
+                'success': True,
+                'data': data,
+                'message': f'Successfully collected {len(data)} records'
+            }))
+
+    except Exception as e:
+        metrics.export(recorder.report(succeeded=False))
+        print(
+            json.dumps({
+                'success': False,
+                'data': [],
+                'message': str(e),
+                'traceback': traceback.format_exc()
+            }))
+        sys.exit(1)
@@ -0,0 +1,138 @@
+"""메모리 매핑 가격 큐브 (종목 × 거래일 × OHLCV, float32)
+
+종목별 dict 리스트 대신 거래일 달력에 맞춘 조밀 배열 하나로 가격을 다룬다.
+거래정지 등으로 값이 없는 칸은 NaN 이다.
+
+디렉터리 레이아웃
+- cube.npy: (종목 수, 거래일 수, len(FIELDS)) float32
+- symbols.npy: 종목 코드 (축 0)
+- dates.npy: 거래일 datetime64[D] (축 1)
+
+load() 는 cube.npy 를 읽기 전용 mmap 으로 연다. 프로세스 풀 워커는 경로만 받아
+각자 열기 때문에 가격 데이터를 pickle 로 넘기지 않고, 같은 파일 페이지를 OS 페이지
+캐시에서 공유한다 (init_worker / worker_cube).
+"""
+
+import os
+
+import numpy as np
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+CUBE_FILE = 'cube.npy'
+SYMBOLS_FILE = 'symbols.npy'
+DATES_FILE = 'dates.npy'
+
+_worker_cube = None
+
+
+class PriceCube:
+    """values[i, j, k] = symbols[i] 의 dates[j] 일 FIELDS[k] 값"""
+
+    def __init__(self, values, symbols, dates):
+        if values.shape[:2] != (len(symbols), len(dates)):
+            raise ValueError(f"큐브 크기 {values.shape} 와 인덱스 크기 "
+                             f"({len(symbols)}, {len(dates)}) 가 다름")
+        self.values = values
+        self.symbols = np.asarray(symbols)
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self._positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def field(self, name):
+        """(종목 수, 거래일 수) 뷰 (복사 없음)"""
+        return self.values[:, :, FIELDS.index(name)]
+
+    def index_of(self, symbol):
+        return self._positions[symbol]
+
+    def date_range(self, start_date=None, end_date=None):
+        """[start_date, end_date] 에 해당하는 거래일 slice"""
+        start = 0 if start_date is None else int(
+            np.searchsorted(self.dates, np.datetime64(start_date, 'D'), 'left'))
+        end = len(self.dates) if end_date is None else int(
+            np.searchsorted(self.dates, np.datetime64(end_date, 'D'), 'right'))
+        return slice(start, end)
+
+    def window(self, start_date=None, end_date=None, symbols=None):
+        """기간/종목 부분 큐브 (종목을 지정하지 않으면 뷰, 지정하면 복사)"""
+        dates = self.date_range(start_date, end_date)
+        if symbols is None:
+            return PriceCube(self.values[:, dates], self.symbols,
+                             self.dates[dates])
+        rows = [self.index_of(symbol) for symbol in symbols]
+        return PriceCube(self.values[rows, dates], self.symbols[rows],
+                         self.dates[dates])
+
+    def series(self, symbol):
+        """종목 하나의 (거래일 수, len(FIELDS)) 뷰"""
+        return self.values[self.index_of(symbol)]
+
+    def save(self, directory):
+        """cube.npy + 인덱스 파일 저장 (임시 파일에 쓰고 교체)"""
+        os.makedirs(directory, exist_ok=True)
+        for name, array in ((SYMBOLS_FILE, self.symbols.astype(str)),
+                             (DATES_FILE, self.dates),
+                             (CUBE_FILE, self.values)):
+            path = os.path.join(directory, name)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, np.ascontiguousarray(array, dtype=array.dtype))
+            os.replace(tmp_path, path)
+
+
+def load(directory, mmap_mode='r'):
+    """저장된 큐브를 mmap 으로 열기 (기본 읽기 전용)"""
+    values = np.load(os.path.join(directory, CUBE_FILE), mmap_mode=mmap_mode)
+    symbols = np.load(os.path.join(directory, SYMBOLS_FILE))
+    dates = np.load(os.path.join(directory, DATES_FILE))
+    return PriceCube(values, symbols, dates)
+
+
+def from_columns(symbols, dates, columns):
+    """행 단위 배열 -> PriceCube
+
+    - symbols, dates: 행마다 종목 코드와 날짜
+    - columns: {필드: 행마다 값} (FIELDS 중 없는 필드는 NaN)
+    거래일 달력은 어느 종목이든 데이터가 있는 날짜들이다.
+    """
+    symbols = np.asarray(symbols)
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    symbol_index, symbol_positions = np.unique(symbols, return_inverse=True)
+    date_index, date_positions = np.unique(dates, return_inverse=True)
+
+    values = np.full((len(symbol_index), len(date_index), len(FIELDS)),
+                     np.nan, dtype=np.float32)
+    for k, name in enumerate(FIELDS):
+        if name in columns:
+            values[symbol_positions, date_positions, k] = np.asarray(
+                columns[name], dtype=np.float32)
+    return PriceCube(values, symbol_index, date_index)
+
+
+def from_panel(names, offsets, arrays):
+    """daily_stock.load_panel 결과 -> PriceCube"""
+    symbols = np.repeat(names, np.diff(offsets))
+    return from_columns(symbols, arrays['date'], arrays)
+
+
+def from_frame(frame):
+    """symbol, date, open, ... 컬럼 DataFrame (store.read_frame 결과) -> PriceCube"""
+    return from_columns(frame['symbol'].to_numpy(),
+                        frame['date'].to_numpy().astype('datetime64[D]'),
+                        {name: frame[name].to_numpy()
+                         for name in FIELDS if name in frame})
+
+
+def init_worker(directory):
+    """프로세스 풀 initializer: 워커마다 큐브를 한 번만 mmap 으로 연다"""
+    global _worker_cube
+    _worker_cube = load(directory)
+
+
+def worker_cube():
+    """init_worker 로 연 현재 프로세스의 큐브"""
+    if _worker_cube is None:
+        raise RuntimeError("init_worker 로 큐브를 먼저 열어야 함")
+    return _worker_cube
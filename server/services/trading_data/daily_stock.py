@@ -0,0 +1,308 @@
+"""daily_stock_data 압축 타입 레이아웃과 NumPy 로더
+
+레이아웃 (shared/schema.ts 의 dailyStockData 와 같다)
+- open/high/low/close_price: integer (원화 가격은 정수)
+- volume, market_cap: bigint (market_cap 은 원래 text)
+- market, rank_type: enum stock_market / stock_rank_type (행마다 4바이트 고정폭,
+  SQL 에서는 기존과 같이 'KOSPI', 'market_cap' 같은 문자열로 비교/입력)
+- (종목, date) 인덱스로 CLUSTER 해 종목별 기간 조회가 연속된 페이지를 읽도록 함
+- 변환은 migrate-daily-stock-data.py (ensure_layout) 로만 하고, 수집기는
+  layout_changes() 로 적용 여부만 확인한다 (ALTER TABLE 은 테이블을 잠그고 다시 씀)
+
+load_symbol()/load_panel() 은 COPY ... TO STDOUT (FORMAT binary) 결과를 구조화
+dtype 으로 np.frombuffer 해서 값마다 파이썬 객체를 만들지 않고 배열로 읽는다.
+build_copy_binary() 는 반대로 배열에서 COPY ... FROM STDIN (FORMAT binary) 입력을
+만든다 (fast-data-insert.py --generate).
+"""
+
+import io
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MARKETS = ('KOSPI', 'KOSDAQ', 'KONEX')
+RANK_TYPES = ('market_cap', 'volume')
+
+ENUM_TYPES = {'stock_market': MARKETS, 'stock_rank_type': RANK_TYPES}
+
+# 컬럼 -> (udt_name, SQL 타입, 변환식)
+_ROUND = 'round({column}::numeric)'
+COLUMN_TYPES = {
+    'open_price': ('int4', 'integer', _ROUND),
+    'high_price': ('int4', 'integer', _ROUND),
+    'low_price': ('int4', 'integer', _ROUND),
+    'close_price': ('int4', 'integer', _ROUND),
+    'volume': ('int8', 'bigint', _ROUND),
+    'market_cap': ('int8', 'bigint', "NULLIF(btrim({column}::text), '')::numeric"),
+    'market': ('stock_market', 'stock_market', '{column}::text'),
+    'rank_type': ('stock_rank_type', 'stock_rank_type', '{column}::text'),
+}
+
+# 로더가 읽는 값 컬럼과 COPY binary 에서의 바이트 순서 dtype (NULL 은 0 으로 읽음)
+VALUE_COLUMNS = {
+    'open': ('open_price', '>i4'),
+    'high': ('high_price', '>i4'),
+    'low': ('low_price', '>i4'),
+    'close': ('close_price', '>i4'),
+    'volume': ('volume', '>i8'),
+    'market_cap': ('market_cap', '>i8'),
+}
+
+PG_EPOCH = np.datetime64('2000-01-01', 'D')
+_COPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+
+
+def _columns(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT column_name, udt_name FROM information_schema.columns
+            WHERE table_name = 'daily_stock_data'
+            AND table_schema = current_schema()
+        """)
+        return dict(cursor.fetchall())
+
+
+def symbol_column(columns):
+    """종목 코드 컬럼 (schema.ts 는 symbol, 초기 1년치 수집기는 ticker)"""
+    return 'symbol' if 'symbol' in columns else 'ticker'
+
+
+def table_symbol_column(connection):
+    """현재 DB 의 daily_stock_data 종목 코드 컬럼 (load_symbol/load_panel 인자용)"""
+    return symbol_column(_columns(connection))
+
+
+def _type_changes(columns):
+    return [
+        f"ALTER COLUMN {column} TYPE {sql_type} "
+        f"USING {expression.format(column=column)}::{sql_type}"
+        for column, (udt, sql_type, expression) in COLUMN_TYPES.items()
+        if column in columns and columns[column] != udt
+    ]
+
+
+def layout_changes(connection):
+    """압축 레이아웃까지 남은 변경 목록 (비어 있으면 적용 완료, 읽기만 함)
+
+    수집기는 시작할 때 이것만 확인하고, 실제 변환(테이블 재작성)은
+    migrate-daily-stock-data.py 가 맡는다.
+    """
+    columns = _columns(connection)
+    changes = _type_changes(columns)
+    index = f"daily_stock_data_{symbol_column(columns)}_date_idx"
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT typname FROM pg_type WHERE typname = ANY(%s)",
+                       (list(ENUM_TYPES), ))
+        existing = {row[0] for row in cursor.fetchall()}
+        cursor.execute(
+            "SELECT 1 FROM pg_indexes WHERE indexname = %s "
+            "AND schemaname = current_schema()", (index, ))
+        has_index = cursor.fetchone() is not None
+    connection.rollback()
+    changes = [f"CREATE TYPE {name}" for name in ENUM_TYPES
+               if name not in existing] + changes
+    if not has_index:
+        changes.append(f"CREATE INDEX {index}")
+    return changes
+
+
+def require_layout(connection):
+    """압축 레이아웃이 아니면 마이그레이션 안내와 함께 RuntimeError"""
+    changes = layout_changes(connection)
+    if changes:
+        raise RuntimeError(
+            f"daily_stock_data 가 압축 레이아웃이 아님 ({', '.join(changes)}). "
+            "수집 작업이 없을 때 python3 server/services/migrate-daily-stock-data.py "
+            "를 먼저 실행하세요")
+
+
+def ensure_layout(connection, cluster=False):
+    """타입 변환 + (종목, date) 인덱스 생성 (이미 적용된 부분은 건너뜀)
+
+    타입 변환은 ALTER TABLE 한 번으로 테이블을 한 번만 다시 쓴다.
+    cluster=True 면 인덱스 순서로 CLUSTER 후 ANALYZE (테이블 잠금, 마이그레이션 때만).
+    """
+    columns = _columns(connection)
+    with connection.cursor() as cursor:
+        for name, labels in ENUM_TYPES.items():
+            values = ', '.join(f"'{label}'" for label in labels)
+            cursor.execute(f"""
+                DO $$ BEGIN
+                    CREATE TYPE {name} AS ENUM ({values});
+                EXCEPTION WHEN duplicate_object THEN NULL;
+                END $$
+            """)
+
+        changes = _type_changes(columns)
+        if changes:
+            logger.info(f"daily_stock_data 타입 변환: {len(changes)}개 컬럼")
+            cursor.execute(f"ALTER TABLE daily_stock_data {', '.join(changes)}")
+
+        symbol = symbol_column(columns)
+        index = f"daily_stock_data_{symbol}_date_idx"
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index} "
+                       f"ON daily_stock_data ({symbol}, date)")
+    connection.commit()
+
+    if cluster:
+        logger.info(f"daily_stock_data CLUSTER ({index})")
+        with connection.cursor() as cursor:
+            cursor.execute(f"CLUSTER daily_stock_data USING {index}")
+            cursor.execute("ANALYZE daily_stock_data")
+        connection.commit()
+    return changes
+
+
+def parse_copy_binary(data, dtypes):
+    """NULL 이 없는 고정폭 컬럼만으로 된 COPY binary 결과 -> 컬럼별 배열 dict
+
+    dtypes: [(이름, '>i4' 등 big-endian dtype)] (SELECT 컬럼 순서)
+    """
+    if not data.startswith(_COPY_SIGNATURE):
+        raise ValueError("COPY binary 헤더가 아님")
+    extension = int.from_bytes(data[15:19], 'big')
+    offset = 19 + extension
+    body = len(data) - offset - 2  # 마지막 2바이트는 종료 표시 (-1)
+
+    fields = [('field_count', '>i2')]
+    for name, dtype in dtypes:
+        fields += [(f"{name}_length", '>i4'), (name, dtype)]
+    row_type = np.dtype(fields)
+    if body % row_type.itemsize:
+        raise ValueError("고정폭이 아닌 행이 있음 (NULL 또는 가변 길이 컬럼)")
+
+    rows = np.frombuffer(data, row_type, count=body // row_type.itemsize,
+                         offset=offset)
+    return {name: rows[name].astype(dtype[1:]) for name, dtype in dtypes}
+
+
+def build_copy_binary(columns):
+    """컬럼별 배열 -> COPY ... FROM STDIN (FORMAT binary) 입력 바이트 (NULL 없음)
+
+    columns: [(배열, 형식)] (COPY 컬럼 순서). 형식은 '>i4'/'>i8' 같은 big-endian
+    정수 dtype, 'date' (datetime64[D]), 'text' (text/enum 컬럼, pandas Categorical
+    이면 값 정렬을 건너뜀). 행마다 파이썬 객체를 만들지 않고 바이트 위치를 배열
+    연산으로 계산한다.
+    """
+    rows = len(columns[0][0])
+    fields = []
+    for values, kind in columns:
+        if kind == 'text':
+            if hasattr(values, 'categories'):  # pandas Categorical 는 정렬 없이 사용
+                labels, codes = values.categories, values.codes
+            else:
+                labels, codes = np.unique(np.asarray(values), return_inverse=True)
+            encoded = [str(label).encode() for label in labels]
+            label_lengths = np.array([len(label) for label in encoded], dtype=np.int64)
+            blob = np.frombuffer(b''.join(encoded), np.uint8)
+            lengths = label_lengths[codes]
+            sources = (np.cumsum(label_lengths) - label_lengths)[codes]
+        else:
+            if kind == 'date':
+                values = (np.asarray(values, dtype='datetime64[D]') -
+                          PG_EPOCH).astype(np.int64)
+                kind = '>i4'
+            data = np.ascontiguousarray(np.asarray(values).astype(kind))
+            blob = data.view(np.uint8)
+            lengths = np.full(rows, data.itemsize, dtype=np.int64)
+            sources = np.arange(rows, dtype=np.int64) * data.itemsize
+        fields.append((blob, lengths, sources))
+
+    row_lengths = 2 + sum(4 + lengths for _, lengths, _ in fields)
+    header = _COPY_SIGNATURE + bytes(8)  # 플래그 0, 헤더 확장 길이 0
+    buffer = np.empty(len(header) + int(row_lengths.sum()) + 2, dtype=np.uint8)
+    buffer[:len(header)] = np.frombuffer(header, np.uint8)
+    buffer[-2:] = 0xff  # 종료 표시 (-1)
+
+    position = len(header) + np.cumsum(row_lengths) - row_lengths
+    buffer[position] = 0
+    buffer[position + 1] = len(columns)
+    position = position + 2
+    for blob, lengths, sources in fields:
+        length_bytes = lengths.astype('>i4').view(np.uint8).reshape(rows, 4)
+        buffer[position[:, None] + np.arange(4)] = length_bytes
+        position = position + 4
+        offsets = (np.arange(int(lengths.sum())) -
+                   np.repeat(np.cumsum(lengths) - lengths, lengths))
+        buffer[np.repeat(position, lengths) + offsets] = \
+            blob[np.repeat(sources, lengths) + offsets]
+        position = position + lengths
+    return buffer.tobytes()
+
+
+def _copy(connection, query, params):
+    buffer = io.BytesIO()
+    with connection.cursor() as cursor:
+        sql = cursor.mogrify(query, params).decode()
+        cursor.copy_expert(f"COPY ({sql}) TO STDOUT (FORMAT binary)", buffer)
+    return buffer.getvalue()
+
+
+def _value_select(fields):
+    return ', '.join(f"COALESCE({VALUE_COLUMNS[field][0]}, 0)"
+                     for field in fields)
+
+
+def load_symbol(connection, symbol, start_date, end_date, fields=None,
+                symbol_column='symbol'):
+    """종목 하나의 기간 데이터 -> {'date': datetime64[D], 'open': int32, ...}
+
+    랭킹 종류별로 같은 날짜 행이 여러 개일 수 있으므로 날짜마다 한 행만 읽는다.
+    """
+    fields = list(fields or VALUE_COLUMNS)
+    query = f"""
+        SELECT DISTINCT ON (date) (date - DATE '2000-01-01'), {_value_select(fields)}
+        FROM daily_stock_data
+        WHERE {symbol_column} = %s AND date >= %s AND date <= %s
+        ORDER BY date
+    """
+    dtypes = [('date', '>i4')] + [(field, VALUE_COLUMNS[field][1])
+                                  for field in fields]
+    arrays = parse_copy_binary(
+        _copy(connection, query, (symbol, start_date, end_date)), dtypes)
+    arrays['date'] = PG_EPOCH + arrays['date'].astype('timedelta64[D]')
+    return arrays
+
+
+def load_panel(connection, start_date, end_date, symbols=None, fields=None,
+               symbol_column='symbol'):
+    """여러 종목의 기간 데이터를 (종목, 날짜) 순으로 한 번에 읽음
+
+    반환값: (symbols, offsets, arrays)
+    - symbols[i] 의 행은 arrays[...][offsets[i]:offsets[i + 1]]
+    """
+    fields = list(fields or VALUE_COLUMNS)
+    condition = "date >= %s AND date <= %s"
+    params = [start_date, end_date]
+    if symbols is not None:
+        condition += f" AND {symbol_column} = ANY(%s)"
+        params.append(list(symbols))
+
+    # 종목 코드는 가변 길이라 행 수만 따로 읽고 값 컬럼은 고정폭으로 COPY
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT {symbol_column}, COUNT(DISTINCT date) FROM daily_stock_data
+            WHERE {condition} GROUP BY {symbol_column} ORDER BY {symbol_column}
+            """, params)
+        counts = cursor.fetchall()
+    names = np.array([row[0] for row in counts], dtype=object)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum([row[1] for row in counts], out=offsets[1:])
+
+    query = f"""
+        SELECT DISTINCT ON ({symbol_column}, date) (date - DATE '2000-01-01'),
+            {_value_select(fields)}
+        FROM daily_stock_data
+        WHERE {condition}
+        ORDER BY {symbol_column}, date
+    """
+    dtypes = [('date', '>i4')] + [(field, VALUE_COLUMNS[field][1])
+                                  for field in fields]
+    arrays = parse_copy_binary(_copy(connection, query, params), dtypes)
+    arrays['date'] = PG_EPOCH + arrays['date'].astype('timedelta64[D]')
+    if len(arrays['date']) != offsets[-1]:
+        raise ValueError("종목별 행 수와 COPY 결과 행 수가 다름")
+    return names, offsets, arrays
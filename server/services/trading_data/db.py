@@ -0,0 +1,110 @@
+"""PostgreSQL 접속 공통 모듈
+
+스크립트마다 따로 두던 psycopg2.connect 설정을 한곳에 모은다.
+- 접속 정보: PGHOST / PGDATABASE / PGUSER / PGPASSWORD / PGPORT
+- TCP keepalive, application_name, statement_timeout 을 모든 연결에 적용
+- 작업은 실행마다 connect() 로 연결 하나를 열어 끝까지 쓴다 (스레드/워커가 DB 를
+  공유하지 않으므로 프로세스 안 연결 풀은 두지 않음. 실행 간 재사용은 PgBouncer)
+- execute_prepared(): 반복 실행되는 쿼리를 연결별로 한 번만 PREPARE
+
+환경 변수
+- PGSSLMODE: 스크립트가 sslmode 를 지정하지 않았을 때의 기본값
+- PG_STATEMENT_TIMEOUT_MS: 문장 실행 제한 시간 (기본 0 = 제한 없음)
+- PG_POOL_MODE=pgbouncer: 로컬 PgBouncer(transaction pooling) 뒤에서 실행.
+  원격 TLS 연결은 PgBouncer 가 유지하므로 스크립트는 PGHOST/PGPORT 를 로컬
+  PgBouncer 로 두고 sslmode=disable 로 접속한다. 이 모드에서는 시작 파라미터
+  options 와 서버 측 PREPARE 를 쓰지 않는다 (transaction pooling 과 호환 안 됨).
+"""
+
+import os
+import re
+import sys
+
+import psycopg2
+import psycopg2.extensions
+
+KEEPALIVE = {
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 5
+}
+
+_PLACEHOLDER = re.compile(r'\$(\d+)')
+
+
+def pgbouncer_mode():
+    return os.getenv('PG_POOL_MODE', '').lower() == 'pgbouncer'
+
+
+def default_application_name():
+    """실행 중인 스크립트 파일명 (예: best-k-calculator)"""
+    script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else ''
+    return os.path.splitext(script)[0] or 'trading_data'
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """PREPARE 한 문장 이름을 기억하는 연결"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def connect_kwargs(application_name=None, sslmode=None, statement_timeout_ms=None):
+    """psycopg2.connect 인자 (환경 변수 + 공통 설정)"""
+    kwargs = {
+        'host': os.getenv('PGHOST', 'localhost'),
+        'database': os.getenv('PGDATABASE', 'postgres'),
+        'user': os.getenv('PGUSER', 'postgres'),
+        'password': os.getenv('PGPASSWORD', ''),
+        'port': os.getenv('PGPORT', '5432'),
+        'application_name': application_name or default_application_name(),
+        'connection_factory': PreparingConnection
+    }
+    kwargs.update(KEEPALIVE)
+
+    if pgbouncer_mode():
+        kwargs['sslmode'] = 'disable'
+        return kwargs
+
+    sslmode = sslmode or os.getenv('PGSSLMODE')
+    if sslmode:
+        kwargs['sslmode'] = sslmode
+
+    if statement_timeout_ms is None:
+        statement_timeout_ms = int(os.getenv('PG_STATEMENT_TIMEOUT_MS', '0'))
+    if statement_timeout_ms:
+        kwargs['options'] = f"-c statement_timeout={int(statement_timeout_ms)}"
+    return kwargs
+
+
+def connect(application_name=None, sslmode=None, statement_timeout_ms=None):
+    """공통 설정이 적용된 새 연결 하나 (단발성 스크립트용)"""
+    return psycopg2.connect(
+        **connect_kwargs(application_name, sslmode, statement_timeout_ms))
+
+
+def execute_prepared(cursor, name, sql, params=()):
+    """$1, $2 ... 자리표시자를 쓰는 sql 을 name 으로 PREPARE 해 실행
+
+    같은 연결에서는 PREPARE 를 한 번만 한다. PgBouncer 모드나 PreparingConnection
+    이 아닌 연결에서는 일반 파라미터 쿼리로 실행한다.
+    """
+    conn = cursor.connection
+    prepared = getattr(conn, 'prepared', None)
+    if prepared is None or pgbouncer_mode():
+        cursor.execute(
+            _PLACEHOLDER.sub(r'%(p\1)s', sql.replace('%', '%%')),
+            {f"p{i}": value for i, value in enumerate(params, 1)})
+        return cursor
+
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        prepared.add(name)
+    if params:
+        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})",
+                       tuple(params))
+    else:
+        cursor.execute(f"EXECUTE {name}")
+    return cursor
@@ -0,0 +1,175 @@
+"""통합 수집 엔진"""
+
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .cache import request_key
+from .instrument import Recorder
+from .records import build_record, sort_records
+from .sources import empty_history
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 500
+
+
+class Collector:
+    """소스 하나에 대해 종목 선정 → 병렬 상세 수집 → 정렬을 수행하는 엔진
+
+    - source: sources 모듈의 소스 객체
+    - cache: get/set 을 제공하는 캐시 (None 이면 캐시 미사용)
+    - rate_limiter: acquire() 를 제공하는 속도 제한기 (None 이면 제한 없음)
+    - max_workers: 종목 상세 수집 동시 실행 수
+    - retries: 소스 호출 실패 시 재시도 횟수
+    - recorder: 소스 호출 시간/요청/재시도/속도 제한 대기/캐시 적중을 기록할
+      instrument.Recorder (None 이면 내부용을 만들어 씀)
+    """
+
+    def __init__(self,
+                 source,
+                 cache=None,
+                 rate_limiter=None,
+                 max_workers=4,
+                 retries=1,
+                 retry_delay=1.0,
+                 recorder=None):
+        self.source = source
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_workers = max(1, max_workers)
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        self.recorder = recorder or Recorder("collector-engine")
+        # 지표 레이블 (PykrxSource -> pykrx)
+        self.source_label = type(source).__name__.removesuffix('Source').lower()
+
+    def call(self, func, *args, **kwargs):
+        """속도 제한과 재시도를 적용해 소스 함수 호출"""
+        stage = getattr(func, '__name__', 'call')
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                waited = self.rate_limiter.acquire()
+                if waited:
+                    self.recorder.count("rate_limit_waits")
+                    self.recorder.count("rate_limit_wait_seconds", waited)
+            self.recorder.count("requests", source=self.source_label)
+            try:
+                with self.recorder.stage(stage):
+                    return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.retries:
+                    self.recorder.count("request_errors", source=self.source_label)
+                    raise
+                self.recorder.count("retries", source=self.source_label)
+                logger.warning(
+                    f"[WARNING] Attempt {attempt + 1} failed for "
+                    f"{getattr(func, '__name__', func)}{args}: {e}")
+                time.sleep(self.retry_delay * (attempt + 1))
+
+    def collect(self, start_date, end_date, market, sort_by=None, limit=None):
+        """시장 데이터 수집 후 stockDataResponse 형식 레코드 목록 반환"""
+        end_date = min(end_date, datetime.now().strftime('%Y-%m-%d'))
+        limit = min(limit or DEFAULT_LIMIT, MAX_LIMIT)
+
+        cache_key = request_key(self.source.country, market, start_date,
+                                end_date, sort_by, limit)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached:
+                logger.info(f"[INFO] Cache hit: {cache_key}")
+                self.recorder.count("cache_hits")
+                return cached
+            self.recorder.count("cache_misses")
+
+        market_label = self.source.market_label(market)
+        tickers = self.call(self.source.universe, market, end_date)
+        logger.info(f"[INFO] Found {len(tickers)} tickers in {market_label}")
+
+        # 정렬 기준이 있으면 시장 전체 순위표로 실제 상위 N개를 먼저 고름
+        ranked = None
+        if sort_by and hasattr(self.source, 'rank'):
+            try:
+                ranked = self.call(self.source.rank, tickers, end_date,
+                                   sort_by)
+            except Exception as e:
+                logger.warning(f"[WARNING] Failed to rank by {sort_by}: {e}")
+        if ranked is not None:
+            logger.info(f"[INFO] Ranked {len(ranked)} tickers by {sort_by}")
+            tickers = ranked
+
+        selected = tickers[:limit]
+        logger.info(f"[INFO] Processing {len(selected)} tickers...")
+
+        # 일괄 조회를 지원하는 소스는 가격을 한 번에, 펀더멘털을 병렬로 미리 가져옴
+        histories = None
+        if hasattr(self.source, 'history_many'):
+            histories = self.call(self.source.history_many, selected,
+                                  start_date, end_date)
+        prefetched = hasattr(self.source, 'prefetch')
+        if prefetched:
+            self.source.prefetch(selected, end_date, call=self.call)
+
+        def fetch(symbol):
+            history = None
+            if histories is not None:
+                history = histories.get(symbol, empty_history())
+            return self._collect_symbol(symbol, start_date, end_date,
+                                        market_label, history, prefetched)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(fetch, selected))
+
+        data = [record for record in results if record is not None]
+        logger.info(f"[INFO] Collected {len(data)} records")
+
+        sort_records(data, sort_by)
+
+        if self.cache is not None and data:
+            self.cache.set(cache_key, data)
+        return data
+
+    def _collect_symbol(self,
+                        symbol,
+                        start_date,
+                        end_date,
+                        market_label,
+                        history=None,
+                        prefetched=False):
+        """종목 하나의 레코드 생성 (실패 시 None)
+
+        prefetched 이면 펀더멘털/종목명이 이미 메모리에 있으므로 속도 제한 없이 조회
+        """
+        lookup = (lambda func, *args: func(*args)) if prefetched else self.call
+        try:
+            if history is None:
+                history = self.call(self.source.history, symbol, start_date,
+                                    end_date)
+            if history is None or history.empty:
+                logger.warning(f"[WARNING] No data found for {symbol}")
+                return None
+
+            try:
+                fundamentals = lookup(self.source.fundamentals, symbol,
+                                      end_date)
+            except Exception as e:
+                logger.warning(
+                    f"[WARNING] Failed to get fundamentals for {symbol}: {e}")
+                fundamentals = {}
+
+            name = lookup(self.source.name, symbol, end_date)
+            return build_record(symbol, name, history, fundamentals,
+                                self.source.country, market_label, end_date)
+        except Exception as e:
+            logger.error(f"[ERROR] Error processing {symbol}: {e}")
+            return None
+
+
+def configure_logging():
+    """CLI 수집기 공통 로깅 (stdout 은 JSON 결과 전용이므로 stderr 로 출력)"""
+    logging.basicConfig(level=logging.INFO,
+                        format="%(message)s",
+                        handlers=[logging.StreamHandler(sys.stderr)])
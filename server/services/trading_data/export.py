@@ -0,0 +1,163 @@
+"""대용량 테이블 스트리밍 내보내기
+
+psycopg2 named(서버 측) 커서로 결과를 itersize 행씩 받아 배치 단위로 넘긴다.
+전체 결과를 메모리에 올리지 않으므로 수년치 daily_stock_data 도 일정한 메모리로
+내보낼 수 있고, 첫 배치가 도착하는 즉시 출력이 시작된다.
+
+출력 형식
+- ndjson: 행마다 JSON 객체 한 줄 (배치마다 bytes 청크 하나)
+- arrow: Arrow IPC stream (pyarrow 가 설치된 경우에만). 스키마는 값이 아니라
+  커서의 컬럼 타입 OID 로 정하므로 첫 배치에서 NULL 뿐인 컬럼도 타입이 맞는다.
+"""
+
+import datetime
+import decimal
+import json
+import uuid
+
+DEFAULT_ITERSIZE = 5000
+
+DAILY_STOCK_COLUMNS = [
+    'date', 'symbol', 'name', 'market', 'rank_type', 'rank', 'open_price',
+    'high_price', 'low_price', 'close_price', 'volume', 'market_cap'
+]
+
+# Postgres 타입 OID -> pyarrow 타입 이름 (없는 타입은 문자열, enum 도 문자열)
+ARROW_TYPES = {
+    16: 'bool_',
+    20: 'int64',
+    21: 'int16',
+    23: 'int32',
+    700: 'float32',
+    701: 'float64',
+    1700: 'float64',  # numeric
+    1082: 'date32',
+}
+
+
+def stream_rows(connection, query, params=None, itersize=DEFAULT_ITERSIZE):
+    """서버 측 커서로 (컬럼 목록, 행 목록) 배치를 순서대로 yield
+
+    컬럼 목록은 cursor.description 그대로 ((이름, 타입 OID, ...) 튜플).
+    named 커서는 트랜잭션 안에서만 유지되므로 autocommit 이 아닌 연결이어야 한다.
+    """
+    name = f"export_{uuid.uuid4().hex}"
+    with connection.cursor(name=name) as cursor:
+        cursor.itersize = itersize
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(itersize)
+            if not rows:
+                break
+            yield cursor.description, rows
+
+
+def daily_stock_query(start_date=None, end_date=None, market=None,
+                      rank_type=None):
+    """daily_stock_data 내보내기 쿼리와 파라미터 (조건은 모두 선택)"""
+    conditions = []
+    params = []
+    for column, operator, value in (('date', '>=', start_date),
+                                    ('date', '<=', end_date),
+                                    ('market', '=', market),
+                                    ('rank_type', '=', rank_type)):
+        if value:
+            conditions.append(f"{column} {operator} %s")
+            params.append(value)
+
+    query = f"SELECT {', '.join(DAILY_STOCK_COLUMNS)} FROM daily_stock_data"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY date, market, rank_type, rank"
+    return query, params
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return str(value)
+
+
+def _ndjson_chunk(columns, rows):
+    names = [column[0] for column in columns]
+    lines = [
+        json.dumps(dict(zip(names, row)),
+                   ensure_ascii=False,
+                   default=_json_default) for row in rows
+    ]
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+def arrow_schema(columns):
+    """cursor.description -> pyarrow.Schema (타입 OID 기준)"""
+    import pyarrow as pa
+
+    return pa.schema([(column[0], getattr(pa, ARROW_TYPES.get(column[1], 'string'))())
+                      for column in columns])
+
+
+def _arrow_values(values, arrow_type):
+    import pyarrow as pa
+
+    if pa.types.is_floating(arrow_type):
+        return [None if value is None else float(value) for value in values]
+    if pa.types.is_string(arrow_type):
+        return [None if value is None else _text(value) for value in values]
+    return values
+
+
+def _text(value):
+    """문자열 컬럼 값 (json/jsonb 는 JSON 텍스트, 그 외는 NDJSON 과 같은 표현)"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return _json_default(value)
+
+
+def iter_record_batches(batches):
+    """배치마다 pyarrow.RecordBatch 하나 (스키마는 커서 컬럼 타입 기준)"""
+    import pyarrow as pa
+
+    schema = None
+    for columns, rows in batches:
+        if schema is None:
+            schema = arrow_schema(columns)
+        yield pa.RecordBatch.from_arrays([
+            pa.array(_arrow_values([row[i] for row in rows], field.type),
+                     type=field.type) for i, field in enumerate(schema)
+        ], schema=schema)
+
+
+def write_ndjson(batches, sink):
+    """NDJSON 으로 sink(바이너리 스트림)에 쓰고 배치마다 flush, 행 수 반환"""
+    count = 0
+    for columns, rows in batches:
+        sink.write(_ndjson_chunk(columns, rows))
+        sink.flush()
+        count += len(rows)
+    return count
+
+
+def write_arrow(batches, sink):
+    """Arrow IPC stream 으로 sink 에 쓰고 배치마다 flush, 행 수 반환"""
+    import pyarrow as pa
+
+    count = 0
+    writer = None
+    try:
+        for batch in iter_record_batches(batches):
+            if writer is None:
+                writer = pa.ipc.new_stream(sink, batch.schema)
+            writer.write_batch(batch)
+            sink.flush()
+            count += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+WRITERS = {'ndjson': write_ndjson, 'arrow': write_arrow}
@@ -0,0 +1,152 @@
+"""펀더멘털 조회 계층 (일자 단위 캐시)"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class TickerInfoCache:
+    """종목별 info 조회를 (종목, 일자) 단위로 캐시하고 병렬로 미리 가져옴
+
+    - fetch: symbol -> dict 를 반환하는 조회 함수 (예: yfinance Ticker.info)
+    - cache: get/set 을 제공하는 영속 캐시 (None 이면 메모리만 사용)
+    """
+
+    def __init__(self, fetch, cache=None, max_workers=8, prefix="info"):
+        self.fetch = fetch
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.prefix = prefix
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _cache_key(self, symbol, date):
+        return f"{self.prefix}_{symbol}_{date}"
+
+    def get(self, symbol, date, call=None):
+        """(종목, 일자) info 조회 - 메모리 → 영속 캐시 → 원격 순"""
+        key = (symbol, date)
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+
+        info = None
+        if self.cache is not None:
+            info = self.cache.get(self._cache_key(symbol, date))
+
+        if info is None:
+            info = (call(self.fetch, symbol) if call else
+                    self.fetch(symbol)) or {}
+            if self.cache is not None and info:
+                self.cache.set(self._cache_key(symbol, date), info)
+
+        with self._lock:
+            self._memory[key] = info
+        return info
+
+    def prefetch(self, symbols, date, call=None):
+        """아직 없는 종목의 info 를 병렬로 조회 (개별 실패는 빈 dict)"""
+        with self._lock:
+            missing = [s for s in symbols if (s, date) not in self._memory]
+        if not missing:
+            return
+
+        def fetch_one(symbol):
+            try:
+                self.get(symbol, date, call)
+            except Exception as e:
+                logger.warning(f"[WARNING] Failed to get info for {symbol}: {e}")
+                with self._lock:
+                    self._memory[(symbol, date)] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(fetch_one, missing))
+
+
+class KrxFundamentals:
+    """KRX 시장 전체 시가총액/펀더멘털 표를 일자별로 한 번씩만 조회해 보관
+
+    종목별 get_market_cap_by_date / get_market_fundamental_by_date 호출 대신
+    일자당 get_market_cap_by_ticker / get_market_fundamental_by_ticker 각 1회로
+    전 종목 값을 얻고, 종목 조회는 메모리에서 처리한다.
+    """
+
+    TABLES = {
+        'cap': 'get_market_cap_by_ticker',
+        'fundamental': 'get_market_fundamental_by_ticker'
+    }
+
+    def __init__(self, client, cache=None, market='ALL'):
+        self.client = client
+        self.cache = cache
+        self.market = market
+        self._tables = {}
+        self._business_days = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def business_day(self, day):
+        """'YYYYMMDD' 기준 가장 가까운 이전 거래일"""
+        if day not in self._business_days:
+            try:
+                self._business_days[day] = (
+                    self.client.get_nearest_business_day_in_a_week(day))
+            except Exception:
+                self._business_days[day] = day
+        return self._business_days[day]
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def table(self, kind, day, call=None):
+        """(표 종류, 일자) 시장 전체 DataFrame - 메모리 → 영속 캐시 → 원격 순"""
+        day = self.business_day(day)
+        key = (kind, self.market, day)
+
+        # 같은 표를 여러 스레드가 동시에 요청해도 원격 조회는 한 번만 수행
+        with self._key_lock(key):
+            if key in self._tables:
+                return self._tables[key]
+
+            cache_key = f"krx_{kind}_{self.market}_{day}"
+            frame = self.cache.get(cache_key) if self.cache is not None else None
+            if frame is None:
+                fetch = getattr(self.client, self.TABLES[kind])
+                frame = (call(fetch, day, market=self.market)
+                         if call else fetch(day, market=self.market))
+                if self.cache is not None and frame is not None and not frame.empty:
+                    self.cache.set(cache_key, frame)
+
+            self._tables[key] = frame
+            return frame
+
+    def prefetch(self, day, call=None):
+        for kind in self.TABLES:
+            try:
+                self.table(kind, day, call)
+            except Exception as e:
+                logger.warning(
+                    f"[WARNING] Failed to get KRX {kind} table for {day}: {e}")
+
+    def lookup(self, symbol, day, call=None):
+        """종목 하나의 시가총액/상장주식수/PER/PBR/DIV/EPS"""
+        result = {}
+
+        cap = self.table('cap', day, call)
+        if cap is not None and symbol in cap.index:
+            row = cap.loc[symbol]
+            result['market_cap'] = row.get('시가총액')
+            result['shares_outstanding'] = row.get('상장주식수')
+
+        fundamental = self.table('fundamental', day, call)
+        if fundamental is not None and symbol in fundamental.index:
+            row = fundamental.loc[symbol]
+            result['pe_ratio'] = row.get('PER')
+            result['pbr'] = row.get('PBR')
+            result['dividend_yield'] = row.get('DIV')
+            result['eps'] = row.get('EPS')
+
+        return result
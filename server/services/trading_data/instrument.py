@@ -0,0 +1,249 @@
+"""작업 단계별 시간/카운터 계측과 실행 보고서
+
+수집기와 Best K 계산은 네트워크 조회, DataFrame 변환, DB 쓰기, 커밋, 시뮬레이션
+단계를 거친다. Recorder.stage() 로 단계를 감싸면 단계마다 (그리고 종목마다) 벽시계
+시간과 해당 스레드의 CPU 시간을 모은다. 벽시계 시간에 비해 CPU 시간이 짧으면
+KRX/DB 응답을 기다린 것이고, 비슷하면 우리 코드의 계산이다.
+
+report() 는 단계별 횟수/오류/합계/분위수/히스토그램 (Prometheus 와 같은 누적
+버킷), 카운터, 종목별 단계 시간을 dict 로 돌려준다. 카운터에는 레이블을 붙일 수
+있다 (count("requests", source="pykrx") -> 'requests{source="pykrx"}').
+finish() 는 보고서를 RUN_REPORT_DIR (기본 data/run_reports) 에 JSON 으로 쓰고,
+연결을 주면 job_run_report 테이블에도 한 행으로 남기며, metrics.export() 로
+Prometheus 지표도 내보낸다.
+
+profiled() 는 --profile 옵션용으로 pyinstrument 가 있으면 그것으로, 없으면
+cProfile 로 실행 구간을 기록한다.
+
+테이블 정의는 shared/schema.ts 의 jobRunReport 와 같다.
+"""
+
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+REPORT_DIR = os.getenv("RUN_REPORT_DIR", "data/run_reports")
+
+# 단계 시간 히스토그램 버킷 상한 (초)
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+           60.0, 300.0)
+QUANTILES = (50, 90, 99)
+
+DDL = """
+CREATE TABLE IF NOT EXISTS job_run_report (
+    id SERIAL PRIMARY KEY,
+    job TEXT NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP NOT NULL,
+    wall_seconds DOUBLE PRECISION NOT NULL,
+    cpu_seconds DOUBLE PRECISION NOT NULL,
+    report JSONB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_run_report_job_started_idx
+    ON job_run_report (job, started_at);
+"""
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+
+class Recorder:
+    """단계별 시간/카운터 수집기 (스레드 안전)"""
+
+    def __init__(self, job):
+        self.job = job
+        self.started_at = datetime.now()
+        self._wall_started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._lock = threading.Lock()
+        self._durations = defaultdict(list)
+        self._cpu = defaultdict(float)
+        self._errors = defaultdict(int)
+        self._tickers = defaultdict(lambda: defaultdict(float))
+        self.counters = defaultdict(int)
+
+    @contextlib.contextmanager
+    def stage(self, name, ticker=None):
+        """with 블록을 단계 name 으로 계측 (예외는 오류로 세고 다시 던짐)"""
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - wall,
+                         cpu=time.thread_time() - cpu, ticker=ticker,
+                         failed=failed)
+
+    def observe(self, name, seconds, cpu=0.0, ticker=None, failed=False):
+        """이미 잰 단계 시간 하나를 기록"""
+        with self._lock:
+            self._durations[name].append(seconds)
+            self._cpu[name] += cpu
+            if failed:
+                self._errors[name] += 1
+            if ticker is not None:
+                self._tickers[ticker][name] += seconds
+
+    def count(self, name, value=1, **labels):
+        """카운터 증가 (labels 는 Prometheus 레이블)"""
+        if labels:
+            name += "{" + ",".join(f'{key}="{label}"'
+                                   for key, label in sorted(labels.items())) + "}"
+        with self._lock:
+            self.counters[name] += value
+
+    def stage_stats(self, name):
+        durations = np.array(self._durations[name])
+        stats = {
+            'count': len(durations),
+            'errors': self._errors[name],
+            'total_seconds': float(durations.sum()),
+            'cpu_seconds': self._cpu[name],
+            'max_seconds': float(durations.max()) if len(durations) else 0.0,
+            'buckets': {str(bound): int((durations <= bound).sum())
+                        for bound in BUCKETS},
+        }
+        for q, value in zip(QUANTILES, np.percentile(durations, QUANTILES)
+                            if len(durations) else [0.0] * len(QUANTILES)):
+            stats[f"p{q}_seconds"] = float(value)
+        return stats
+
+    def report(self, slowest=10, succeeded=True):
+        """실행 보고서 dict (JSON 직렬화 가능)"""
+        with self._lock:
+            stages = {name: self.stage_stats(name) for name in self._durations}
+            tickers = {ticker: dict(times) for ticker, times in self._tickers.items()}
+            counters = dict(self.counters)
+        totals = sorted(tickers, key=lambda t: sum(tickers[t].values()),
+                        reverse=True)
+        return {
+            'job': self.job,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'wall_seconds': time.perf_counter() - self._wall_started,
+            'cpu_seconds': time.process_time() - self._cpu_started,
+            'succeeded': succeeded,
+            'stages': stages,
+            'counters': counters,
+            'slowest_tickers': [{'ticker': ticker, **tickers[ticker]}
+                                for ticker in totals[:slowest]],
+            'tickers': tickers,
+        }
+
+    def summary(self, report=None):
+        """로그용 한 줄 요약 (단계별 합계 시간과 CPU 시간)"""
+        report = report or self.report()
+        parts = [f"{name} {stats['total_seconds']:.1f}초 "
+                 f"(CPU {stats['cpu_seconds']:.1f}, {stats['count']}회"
+                 + (f", 오류 {stats['errors']}" if stats['errors'] else "") + ")"
+                 for name, stats in sorted(report['stages'].items(),
+                                           key=lambda item: -item[1]['total_seconds'])]
+        return (f"{self.job} {report['wall_seconds']:.1f}초 "
+                f"(CPU {report['cpu_seconds']:.1f}초): " + ", ".join(parts))
+
+    def finish(self, connection=None, path=None, succeeded=True):
+        """보고서를 JSON 파일 (와 연결이 있으면 job_run_report) 과 지표로 남기고 반환
+
+        보고서 기록 실패는 작업 실패로 보지 않고 경고만 남긴다.
+        """
+        report = self.report(succeeded=succeeded)
+        logger.info(self.summary(report))
+        metrics.export(report)
+        try:
+            path = path or os.path.join(
+                REPORT_DIR, f"{self.job}-{self.started_at:%Y%m%d-%H%M%S}.json")
+            write_report(report, path)
+            logger.info(f"실행 보고서: {path}")
+        except OSError as e:
+            logger.warning(f"실행 보고서 파일 저장 실패: {e}")
+        if connection is not None:
+            try:
+                save_report(connection, report)
+            except Exception as e:
+                logger.warning(f"실행 보고서 DB 저장 실패: {e}")
+                connection.rollback()
+        return report
+
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def ensure_table(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(DDL)
+    connection.commit()
+
+
+def save_report(connection, report):
+    ensure_table(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO job_run_report
+            (job, started_at, finished_at, wall_seconds, cpu_seconds, report)
+            VALUES (%s, %s, %s, %s, %s, %s::jsonb)
+            """, (report['job'], report['started_at'], report['finished_at'],
+                  report['wall_seconds'], report['cpu_seconds'],
+                  json.dumps(report, ensure_ascii=False)))
+    connection.commit()
+
+
+@contextlib.contextmanager
+def profiled(path):
+    """with 블록을 프로파일링해 path 에 저장 (path 가 없으면 아무것도 안 함)
+
+    pyinstrument 가 있으면 .html 이면 HTML, 그 외는 텍스트 보고서를,
+    없으면 cProfile 통계 (pstats / snakeviz 로 열기) 를 쓴다.
+    """
+    if not path:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html() if path.endswith('.html')
+                        else profiler.output_text(unicode=True))
+            logger.info(f"프로파일 (pyinstrument): {path}")
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            logger.info(f"프로파일 (cProfile): {path}")
+
+
+def default_profile_path(job):
+    """--profile 에 경로를 주지 않았을 때의 저장 위치"""
+    extension = 'html' if pyinstrument is not None else 'prof'
+    return os.path.join(REPORT_DIR,
+                        f"{job}-{datetime.now():%Y%m%d-%H%M%S}.{extension}")
@@ -0,0 +1,144 @@
+"""경로 의존 백테스트 지표 커널 (numba 또는 NumPy)
+
+거래 순서에 따라 값이 달라지는 지표를 거래일 축(마지막 축)으로 계산한다.
+- compound_mdd_pct: 복리 자산곡선 (1 + r/100 누적곱) 의 최대 낙폭 %
+- max_loss_streak: 최장 연속 손실 거래 수
+- underwater_trades: 자산이 직전 고점 아래에 머문 최장 연속 거래 수
+
+거래가 없는 칸 (has_return False) 은 연속 횟수를 끊지도 늘리지도 않는다.
+
+numba 가 설치되어 있으면 nopython 루프 커널을, 없으면 같은 결과를 내는 NumPy
+누적 연산을 쓴다. backend 인자나 BESTK_BACKEND 환경변수 (auto, numba, numpy)
+로 고를 수 있다.
+"""
+
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PATH_METRICS = ('compound_mdd_pct', 'max_loss_streak', 'underwater_trades')
+
+BACKENDS = ('auto', 'numba', 'numpy')
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+_numba_kernel = None
+_warned = False
+
+
+def _path_loop(returns, has_return, mdd, streaks, underwater):
+    """(행, 거래일) 2차원 입력을 행마다 한 번 훑음 (numba 로 컴파일됨)"""
+    for row in range(returns.shape[0]):
+        equity = 1.0
+        peak = 1.0
+        worst = 0.0
+        streak = 0
+        longest_streak = 0
+        under = 0
+        longest_under = 0
+        for day in range(returns.shape[1]):
+            if not has_return[row, day]:
+                continue
+            value = returns[row, day]
+            equity *= max(1.0 + value / 100.0, 0.0)
+            if equity > peak:
+                peak = equity
+            drawdown = 1.0 - equity / peak
+            if drawdown > worst:
+                worst = drawdown
+
+            if value < 0:
+                streak += 1
+                if streak > longest_streak:
+                    longest_streak = streak
+            else:
+                streak = 0
+
+            if equity < peak:
+                under += 1
+                if under > longest_under:
+                    longest_under = under
+            else:
+                under = 0
+        mdd[row] = worst * 100.0
+        streaks[row] = longest_streak
+        underwater[row] = longest_under
+
+
+def _run_lengths(flags, resets):
+    """flags 가 연속된 길이의 최댓값 (resets 칸에서 0 으로 돌아감)"""
+    counts = np.cumsum(flags, axis=-1)
+    base = np.maximum.accumulate(np.where(resets, counts, 0), axis=-1)
+    return (counts - base).max(axis=-1, initial=0)
+
+
+def _path_numpy(returns, has_return):
+    factors = np.where(has_return, np.maximum(1.0 + returns / 100.0, 0.0), 1.0)
+    equity = np.cumprod(factors, axis=-1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=-1), 1.0)
+    drawdown = 1.0 - equity / peak
+
+    loss = has_return & (returns < 0)
+    under = has_return & (equity < peak)
+    return {
+        'compound_mdd_pct': drawdown.max(axis=-1, initial=0.0) * 100.0,
+        'max_loss_streak': _run_lengths(loss, has_return & ~loss),
+        'underwater_trades': _run_lengths(under, has_return & ~under),
+    }
+
+
+def _path_numba(returns, has_return):
+    global _numba_kernel
+    if _numba_kernel is None:
+        _numba_kernel = numba.njit(cache=True, nogil=True)(_path_loop)
+
+    shape = returns.shape[:-1]
+    returns = np.ascontiguousarray(returns, dtype=np.float64).reshape(
+        -1, returns.shape[-1])
+    has_return = np.ascontiguousarray(has_return).reshape(returns.shape)
+    rows = returns.shape[0]
+    mdd = np.zeros(rows)
+    streaks = np.zeros(rows, dtype=np.int64)
+    underwater = np.zeros(rows, dtype=np.int64)
+    _numba_kernel(returns, has_return, mdd, streaks, underwater)
+    return {
+        'compound_mdd_pct': mdd.reshape(shape),
+        'max_loss_streak': streaks.reshape(shape),
+        'underwater_trades': underwater.reshape(shape),
+    }
+
+
+def resolve_backend(backend=None):
+    """'auto' / None -> 실제로 쓸 백엔드 이름 ('numba' 또는 'numpy')"""
+    backend = backend or os.getenv("BESTK_BACKEND", "auto")
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 백엔드: {backend} ({', '.join(BACKENDS)})")
+    if backend == 'numba' and not HAVE_NUMBA:
+        global _warned
+        if not _warned:
+            logger.warning("numba 가 없어 NumPy 백엔드로 계산")
+            _warned = True
+        return 'numpy'
+    if backend == 'auto':
+        return 'numba' if HAVE_NUMBA else 'numpy'
+    return backend
+
+
+def path_metrics(returns, has_return, backend=None):
+    """거래일 축 경로 지표 -> {지표: 앞쪽 축 모양 배열}
+
+    returns 는 수익이 없는 칸이 0 인 수익률(%) 배열, has_return 은 같은 모양
+    (또는 broadcast 가능한) bool 배열이다.
+    """
+    has_return = np.broadcast_to(has_return, returns.shape)
+    if resolve_backend(backend) == 'numba':
+        return _path_numba(returns, has_return)
+    return _path_numpy(returns, has_return)
@@ -0,0 +1,59 @@
+"""daily_market_cap 테이블 스키마 보정과 최신 시가총액 상위 조회
+
+market_cap 은 원래 text 컬럼이라 `ORDER BY market_cap::numeric` 으로 정렬했고,
+이 캐스트 때문에 인덱스를 쓸 수 없어 조회할 때마다 전체를 읽고 정렬했다.
+ensure_schema() 는 market_cap 을 bigint 로 바꾸고 (date, market_cap DESC) 인덱스를
+만든다. 인덱스에 조회 컬럼을 INCLUDE 하므로 최신 날짜의 상위 N 개 조회는
+인덱스만 앞에서부터 읽고 끝난다 (MAX(date) 도 같은 인덱스로 처리).
+
+이 테이블은 shared/schema.ts 에 정의되어 있지 않아 여기서 직접 관리한다.
+"""
+
+import logging
+
+from . import db
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'daily_market_cap_date_market_cap_idx'
+
+MIGRATION = f"""
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'daily_market_cap' AND column_name = 'market_cap'
+        ORDER BY table_schema = current_schema() DESC LIMIT 1) <> 'bigint' THEN
+        ALTER TABLE daily_market_cap ALTER COLUMN market_cap TYPE BIGINT
+            USING NULLIF(btrim(market_cap::text), '')::numeric::bigint;
+    END IF;
+END $$;
+CREATE INDEX IF NOT EXISTS {INDEX_NAME}
+    ON daily_market_cap (date, market_cap DESC)
+    INCLUDE (ticker, name, market, close_price);
+"""
+
+# 최신 날짜의 시가총액 상위 종목 ($1 = LIMIT, NULL 이면 전체)
+LATEST_TOP_SQL = """
+    SELECT ticker, name, market, market_cap, close_price
+    FROM daily_market_cap
+    WHERE date = (SELECT MAX(date) FROM daily_market_cap)
+    ORDER BY market_cap DESC
+    LIMIT $1
+"""
+
+
+def ensure_schema(connection):
+    """market_cap bigint 변환 + 정렬 인덱스 생성 (이미 적용된 경우 변경 없음)"""
+    with connection.cursor() as cursor:
+        cursor.execute(MIGRATION)
+    connection.commit()
+    logger.info(f"daily_market_cap 스키마 확인 완료 ({INDEX_NAME})")
+
+
+def latest_top(cursor, limit=None):
+    """최신 날짜 시가총액 상위 limit 개를 조회한 cursor 반환
+
+    행: (ticker, name, market, market_cap, close_price)
+    """
+    return db.execute_prepared(cursor, 'daily_market_cap_latest_top',
+                               LATEST_TOP_SQL, (limit, ))
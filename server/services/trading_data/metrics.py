@@ -0,0 +1,145 @@
+"""Python 작업 지표 (Prometheus 텍스트 형식)
+
+instrument.Recorder 보고서를 Prometheus exposition 텍스트로 바꿔 내보낸다.
+
+- 텍스트 파일: METRICS_DIR (기본 data/metrics) 에 작업마다 <job>.prom 을 원자적으로
+  교체한다 (node_exporter textfile collector 와 같은 형식). Express 의
+  /api/metrics 가 이 파일들을 합쳐 그대로 응답한다.
+- Pushgateway: METRICS_PUSHGATEWAY_URL 이 있으면 <url>/metrics/job/<job> 로 PUT 한다
+  (이때 /api/metrics 는 Pushgateway 의 /metrics 를 대신 전달).
+
+지표 (모두 job 레이블이 붙음)
+- trading_job_stage_seconds: 단계별 시간 히스토그램 (stage 레이블)
+- trading_job_stage_errors_total: 단계별 오류 수
+- trading_job_<카운터>_total: Recorder 카운터 (requests{source}, retries,
+  rate_limit_waits, rate_limit_wait_seconds, rows_upserted, cache_hits 등)
+- trading_job_rows_per_second: rows_upserted / 실행 시간
+- trading_job_cache_hit_ratio: cache_hits / (cache_hits + cache_misses)
+- trading_job_wall_seconds, trading_job_cpu_seconds, trading_job_succeeded,
+  trading_job_last_run_timestamp_seconds
+"""
+
+import logging
+import os
+import re
+import time
+import urllib.parse
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.getenv("METRICS_DIR", "data/metrics")
+PUSHGATEWAY_URL = os.getenv("METRICS_PUSHGATEWAY_URL")
+PREFIX = "trading_job"
+
+_INVALID = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _split(key):
+    """'requests{source="pykrx"}' -> ('requests', 'source="pykrx"')"""
+    if key.endswith("}") and "{" in key:
+        name, labels = key[:-1].split("{", 1)
+        return name, labels
+    return key, ""
+
+
+def _labels(*parts):
+    return "{" + ",".join(part for part in parts if part) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def render(report):
+    """instrument.Recorder.report() -> Prometheus 텍스트"""
+    job = f'job="{_escape(report["job"])}"'
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{PREFIX}_{name}{suffix}{_labels(job, *labels)} {_number(value)}")
+
+    stages = sorted(report["stages"].items())
+    histogram = []
+    for stage, stats in stages:
+        label = f'stage="{_escape(stage)}"'
+        for bound, count in stats["buckets"].items():
+            histogram.append(("_bucket", (label, f'le="{bound}"'), count))
+        histogram.append(("_bucket", (label, 'le="+Inf"'), stats["count"]))
+        histogram.append(("_sum", (label, ), stats["total_seconds"]))
+        histogram.append(("_count", (label, ), stats["count"]))
+    family("stage_seconds", "histogram", "단계별 소요 시간 (초)", histogram)
+    family("stage_errors_total", "counter", "예외로 끝난 단계 수",
+           [("", (f'stage="{_escape(stage)}"', ), stats["errors"])
+            for stage, stats in stages])
+
+    counters = {}
+    for key, value in report["counters"].items():
+        name, labels = _split(key)
+        counters.setdefault(_INVALID.sub("_", name), []).append((labels, value))
+    for name, samples in sorted(counters.items()):
+        family(f"{name}_total", "counter", f"카운터 {name}",
+               [("", (labels, ), value) for labels, value in samples])
+
+    wall = report["wall_seconds"]
+    if "rows_upserted" in counters:
+        rows = sum(value for labels, value in counters["rows_upserted"])
+        family("rows_per_second", "gauge", "실행 시간 초당 저장 행 수",
+               [("", (), rows / wall if wall > 0 else 0.0)])
+    hits = sum(value for labels, value in counters.get("cache_hits", []))
+    misses = sum(value for labels, value in counters.get("cache_misses", []))
+    if hits + misses:
+        family("cache_hit_ratio", "gauge", "캐시 적중 / 조회",
+               [("", (), hits / (hits + misses))])
+    family("wall_seconds", "gauge", "실행 시간 (초)", [("", (), wall)])
+    family("cpu_seconds", "gauge", "프로세스 CPU 시간 (초)",
+           [("", (), report["cpu_seconds"])])
+    family("succeeded", "gauge", "마지막 실행 성공 여부 (1/0)",
+           [("", (), 1 if report.get("succeeded", True) else 0)])
+    family("last_run_timestamp_seconds", "gauge", "마지막 실행 종료 시각 (Unix time)",
+           [("", (), time.time())])
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(text, job, directory=METRICS_DIR):
+    """<directory>/<job>.prom 원자적 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{re.sub(r'[^a-zA-Z0-9_-]', '_', job)}.prom")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return path
+
+
+def push(text, job, url=PUSHGATEWAY_URL, timeout=5):
+    """Pushgateway 로 PUT (같은 job 그룹의 이전 값을 교체)"""
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/metrics/job/{urllib.parse.quote(job, safe='')}", data=text.encode("utf-8"),
+        method="PUT", headers={"Content-Type": "text/plain; version=0.0.4"})
+    with urllib.request.urlopen(request, timeout=timeout):
+        pass
+
+
+def export(report):
+    """텍스트 파일 (와 설정 시 Pushgateway) 로 내보냄 (실패는 경고만)"""
+    text = render(report)
+    try:
+        write_textfile(text, report["job"])
+    except OSError as e:
+        logger.warning(f"지표 파일 저장 실패: {e}")
+    if PUSHGATEWAY_URL:
+        try:
+            push(text, report["job"])
+        except Exception as e:
+            logger.warning(f"Pushgateway 전송 실패: {e}")
+    return text
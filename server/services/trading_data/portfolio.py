@@ -0,0 +1,122 @@
+"""Best K 변동성 돌파 포트폴리오 일별 백테스트
+
+종목별 지표(bestk) 대신 매일 전 종목 신호를 모아 하나의 계좌로 운용한 결과를
+계산한다. 모든 배열은 (거래일, 종목) 방향이며 (PriceCube.field(...).T), 날짜마다
+한 행에서 종목 간(횡단면) 선택을 한다.
+
+규칙
+- 신호: 전일 변동폭 > 0 이고 당일 고가 >= 목표가 (= 시가 + 전일 변동폭 × K,
+  K 는 종목별) 이고 목표가 > 시가
+- 체결: 목표가에 매수, 당일 종가에 매도 (수익률 = 종가 / 목표가 - 1)
+- 선택: 신호가 난 종목 중 score 가 높은 순 (같으면 앞 종목) 으로 최대 positions 개
+- 비중: 종목당 min(1 / positions, max_weight) 고정 슬롯. 그날 신호 수에 맞춰
+  비중을 늘리지 않으므로 (장중에는 신호 수를 미리 알 수 없음) 남는 비중은 현금
+- 비용: fee_pct 는 매수/매도 각각에 적용 (%)
+
+같은 날 청산하는 전략이라 매일 포지션이 비워지며, turnover 는 매수 + 매도
+금액 / 자산 (= 2 × exposure) 이다. 어느 종목 신호가 장중 먼저 났는지는 일봉으로
+알 수 없으므로 score 순서로 근사한다.
+"""
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+def breakout_signals(open_, high, low, k):
+    """(거래일, 종목) 가격 -> (신호 bool, 목표가) - 첫 날은 신호 없음
+
+    k 는 스칼라, (종목,) 또는 (거래일, 종목) 배열.
+    """
+    k = np.asarray(k, dtype=np.float64)
+    days_range = np.full(open_.shape, np.nan)
+    days_range[1:] = high[:-1] - low[:-1]
+    with np.errstate(invalid='ignore'):
+        target = open_ + days_range * k
+        signal = (days_range > 0) & (high >= target) & (target > open_)
+    return signal, target
+
+
+def select(signal, score=None, positions=10):
+    """행마다 신호 중 score 상위 positions 개만 True 로 남김
+
+    score: (종목,) 또는 (거래일, 종목). 없으면 종목 순서가 우선순위.
+    """
+    days, tickers = signal.shape
+    if score is None:
+        score = -np.arange(tickers, dtype=np.float64)
+    score = np.broadcast_to(np.asarray(score, dtype=np.float64),
+                            signal.shape)
+    masked = np.where(signal, np.nan_to_num(score, nan=-np.inf), -np.inf)
+    order = np.argsort(-masked, axis=1, kind='stable')
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(tickers)[None, :], axis=1)
+    return signal & (rank < positions)
+
+
+def backtest(open_, high, low, close, k, score=None, positions=10,
+             max_weight=1.0, fee_pct=0.0):
+    """(거래일, 종목) OHLC 행렬 -> 일별 포트폴리오 결과 dict
+
+    - returns: 일별 수익률, equity: 자산 곡선 (시작 1.0)
+    - exposure: 투자 비중 합, turnover: 매수 + 매도 / 자산
+    - positions: 보유 종목 수, weights: (거래일, 종목) 비중
+    """
+    signal, target = breakout_signals(open_, high, low, k)
+    chosen = select(signal, score, positions)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        trade_returns = close / target - 1 - 2 * fee_pct / 100
+    # 종가가 없는 (거래정지 등) 칸은 거래하지 않은 것으로 봄
+    chosen &= np.isfinite(trade_returns)
+
+    slot = min(1.0 / positions, max_weight)
+    weights = np.where(chosen, slot, 0.0)
+    daily = (weights * np.where(chosen, trade_returns, 0.0)).sum(axis=1)
+    exposure = weights.sum(axis=1)
+    return {
+        'returns': daily,
+        'equity': np.cumprod(1 + daily),
+        'exposure': exposure,
+        'turnover': 2 * exposure,
+        'positions': chosen.sum(axis=1),
+        'weights': weights,
+    }
+
+
+def summary(result):
+    """backtest() 결과 -> 기간 요약 지표 dict (% 는 백분율)"""
+    daily = result['returns']
+    equity = result['equity']
+    days = len(daily)
+    if days == 0:
+        return {'days': 0, 'total_return_pct': 0.0, 'cagr_pct': 0.0,
+                'mdd_pct': 0.0, 'sharpe': 0.0, 'avg_exposure_pct': 0.0,
+                'avg_turnover_pct': 0.0, 'trades': 0}
+
+    peak = np.maximum(np.maximum.accumulate(equity), 1.0)
+    volatility = daily.std()
+    return {
+        'days': days,
+        'total_return_pct': float((equity[-1] - 1) * 100),
+        'cagr_pct': float((max(equity[-1], 0.0) ** (TRADING_DAYS / days) - 1) *
+                          100),
+        'mdd_pct': float((1 - equity / peak).max() * 100),
+        'sharpe': float(daily.mean() / volatility * np.sqrt(TRADING_DAYS))
+        if volatility > 0 else 0.0,
+        'avg_exposure_pct': float(result['exposure'].mean() * 100),
+        'avg_turnover_pct': float(result['turnover'].mean() * 100),
+        'trades': int(result['positions'].sum()),
+    }
+
+
+def backtest_cube(price_cube, k, start_date=None, end_date=None, score=None,
+                  **options):
+    """PriceCube 기간 -> (거래일, backtest 결과)
+
+    k, score 는 price_cube.symbols 순서의 (종목,) 배열 또는 스칼라.
+    """
+    window = price_cube.window(start_date, end_date)
+    matrices = [np.asarray(window.field(name), dtype=np.float64).T
+                for name in ('open', 'high', 'low', 'close')]
+    return window.dates, backtest(*matrices, k=k, score=score, **options)
@@ -0,0 +1,162 @@
+"""일자별 랭킹 리스트 및 종목 상세 수집 (historical-data-collector.py, 백필 워커 공용)
+
+- KOSPI/KOSDAQ 시가총액 상위 500종목
+- KOSPI/KOSDAQ 거래량 상위 500종목
+
+하루치 데이터는 시장별 get_market_ohlcv_by_ticker / get_market_cap_by_ticker
+두 번의 시장 전체 조회로 만든 일자 프레임(get_date_frame) 하나에서 랭킹과
+종목 상세를 모두 뽑는다. 종목별 원격 호출은 없다.
+랭킹은 long-format DataFrame(get_ranking_frame)으로 만들고, 일자 프레임과
+한 번 join(combine_frames)한 뒤 컬럼 배열(to_column_arrays)로 저장한다.
+rate_limiter 를 넘기면 pykrx 원격 호출마다 acquire() 한다.
+"""
+
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MARKETS = ['KOSPI', 'KOSDAQ']
+RANK_TYPES = {'market_cap': '시가총액', 'volume': '거래량'}
+TOP_N = 500
+
+DATE_FRAME_COLUMNS = {
+    '시가': 'open',
+    '고가': 'high',
+    '저가': 'low',
+    '종가': 'close',
+    '거래량': 'volume',
+    '시가총액': 'market_cap'
+}
+
+COMBINED_COLUMNS = [
+    'date', 'symbol', 'market', 'rank_type', 'rank', 'name', 'open', 'high',
+    'low', 'close', 'volume', 'market_cap'
+]
+
+# 종목명은 날짜와 무관하므로 프로세스 단위로 보관
+_names = {}
+
+
+def _call(rate_limiter, func, *args, **kwargs):
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    return func(*args, **kwargs)
+
+
+def _client(client):
+    if client is None:
+        from pykrx import stock as client
+    return client
+
+
+def ticker_name(ticker, client=None):
+    if ticker not in _names:
+        try:
+            _names[ticker] = _client(client).get_market_ticker_name(ticker)
+        except Exception:
+            _names[ticker] = ticker
+    return _names[ticker]
+
+
+def get_market_frame(date, market, rate_limiter=None, client=None):
+    """시장 하나의 전 종목 OHLCV + 시가총액 (시장 전체 조회 2회)
+
+    인덱스는 종목코드, 컬럼은 시가/고가/저가/종가/거래량/시가총액.
+    휴장일처럼 종가가 0 인 종목은 제외한다.
+    """
+    stock = _client(client)
+    date_str = date.strftime('%Y%m%d')
+
+    ohlcv = _call(rate_limiter, stock.get_market_ohlcv_by_ticker, date_str, market=market)
+    cap = _call(rate_limiter, stock.get_market_cap_by_ticker, date_str, market=market)
+    if ohlcv is None or len(ohlcv) == 0:
+        return pd.DataFrame(columns=list(DATE_FRAME_COLUMNS))
+
+    frame = ohlcv[['시가', '고가', '저가', '종가', '거래량']].copy()
+    if cap is not None and len(cap) > 0:
+        frame['시가총액'] = cap['시가총액'].reindex(frame.index).fillna(0)
+    else:
+        frame['시가총액'] = 0
+    return frame[frame['종가'] > 0]
+
+
+def get_date_frame(date, rate_limiter=None, client=None):
+    """KOSPI/KOSDAQ 전 종목 일자 프레임 (market 컬럼 포함, 인덱스 종목코드)"""
+    frames = []
+    for market in MARKETS:
+        logger.info(f"{market} 시장 전체 데이터 수집: {date.strftime('%Y%m%d')}")
+        try:
+            frame = get_market_frame(date, market, rate_limiter, client)
+        except Exception as e:
+            logger.warning(f"{market} 시장 전체 데이터 수집 실패: {e}")
+            continue
+        frames.append(frame.assign(market=market))
+    if not frames:
+        return pd.DataFrame(columns=list(DATE_FRAME_COLUMNS) + ['market'])
+    return pd.concat(frames)
+
+
+def get_ranking_frame(date, rate_limiter=None, frame=None, top_n=TOP_N):
+    """
+    4개 랭킹 리스트를 long-format DataFrame 하나로 생성
+    - KOSPI/KOSDAQ 시가총액 상위 500종목
+    - KOSPI/KOSDAQ 거래량 상위 500종목
+    컬럼: market, rank_type, rank, ticker, value (market/rank_type/rank 순 정렬)
+    frame 을 주면 원격 호출 없이 그 일자 프레임에서 순위를 계산한다.
+    """
+    if frame is None:
+        frame = get_date_frame(date, rate_limiter)
+    frame = frame.rename_axis('ticker').reset_index()
+
+    parts = []
+    for rank_type, column in RANK_TYPES.items():
+        # 시장별 내림차순 순위 (동률은 등장 순서로 구분)
+        ranks = frame.groupby('market')[column].rank(method='first', ascending=False)
+        mask = (ranks <= top_n).to_numpy()
+        parts.append(pd.DataFrame({
+            'market': frame['market'].to_numpy()[mask],
+            'rank_type': rank_type,
+            'rank': ranks.to_numpy()[mask].astype('int64'),
+            'ticker': frame['ticker'].to_numpy()[mask],
+            'value': frame[column].to_numpy()[mask]
+        }))
+
+    if not parts:
+        return pd.DataFrame(columns=['market', 'rank_type', 'rank', 'ticker', 'value'])
+    rankings = pd.concat(parts, ignore_index=True).sort_values(
+        ['market', 'rank_type', 'rank'], ignore_index=True)
+
+    counts = rankings.groupby(['market', 'rank_type']).size()
+    for (market, rank_type), count in counts.items():
+        logger.info(f"{market} {RANK_TYPES[rank_type]} 랭킹: {count}개")
+    return rankings
+
+
+def combine_frames(date, rankings, frame):
+    """랭킹과 일자 프레임을 한 번의 join 으로 결합
+
+    컬럼: date, symbol, market, rank_type, rank, name, open, high, low,
+    close, volume, market_cap (랭킹에 있으나 프레임에 없는 종목은 제외)
+    """
+    details = frame[~frame.index.duplicated()][list(DATE_FRAME_COLUMNS)].rename(
+        columns=DATE_FRAME_COLUMNS)
+    combined = rankings.join(details, on='ticker', how='inner')
+
+    names = {ticker: ticker_name(ticker) for ticker in combined['ticker'].unique()}
+    combined = combined.assign(
+        date=date.strftime('%Y-%m-%d'),
+        name=combined['ticker'].map(names),
+        volume=combined['volume'].fillna(0).astype('int64'),
+        market_cap=combined['market_cap'].fillna(0).astype('int64'))
+
+    combined = combined.rename(columns={'ticker': 'symbol'})[COMBINED_COLUMNS]
+    logger.info(f"데이터 결합 완료: {len(combined)}개")
+    return combined.reset_index(drop=True)
+
+
+def to_column_arrays(combined, columns=None):
+    """결합 프레임을 {컬럼: Python 값 리스트} 로 변환 (bulk INSERT 용)"""
+    columns = columns or list(combined.columns)
+    return {column: combined[column].tolist() for column in columns}
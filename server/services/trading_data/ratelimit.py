@@ -0,0 +1,105 @@
+"""외부 API 호출 속도 제한"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """스레드 안전 토큰 버킷 (초당 rate 회, 최대 burst 회 연속 허용)"""
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기하고 대기한 시간(초)을 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FileRateLimiter:
+    """여러 프로세스가 공유하는 토큰 버킷 (상태를 파일에 두고 flock 으로 보호)
+
+    같은 path 를 쓰는 모든 프로세스의 호출 합계가 초당 rate 회를 넘지 않는다.
+    잠금 대상이 파일뿐이므로 객체를 그대로 pickle 해 워커 프로세스에 넘길 수 있다.
+    """
+
+    def __init__(self, path, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.path = path
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+
+    def _take(self):
+        """토큰을 하나 가져오면 0, 부족하면 기다려야 할 시간(초)을 반환"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            with os.fdopen(os.dup(fd), 'r+') as f:
+                now = time.time()
+                try:
+                    state = json.load(f)
+                    tokens = min(
+                        self.burst,
+                        state['tokens'] + (now - state['updated']) * self.rate)
+                except (ValueError, KeyError, TypeError):
+                    tokens = float(self.burst)
+
+                delay = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    delay = (1 - tokens) / self.rate
+
+                f.seek(0)
+                f.truncate()
+                json.dump({'tokens': tokens, 'updated': now}, f)
+                return delay
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기하고 대기한 시간(초)을 반환"""
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if delay == 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
@@ -0,0 +1,90 @@
+"""수집 결과 레코드 구성 및 정렬"""
+
+import math
+
+# stockDataResponse(shared/schema.ts)가 기대하는 전체 필드 목록
+RECORD_FIELDS = [
+    'symbol', 'name', 'current_price', 'change', 'change_percent', 'volume',
+    'market_cap', 'pe_ratio', 'pbr', 'dividend_yield', 'week_52_high',
+    'week_52_low', 'shares_outstanding', 'eps', 'sector', 'industry', 'beta',
+    'book_value', 'revenue', 'net_income', 'debt_to_equity', 'roe', 'roa',
+    'operating_margin', 'profit_margin', 'revenue_growth', 'earnings_growth',
+    'current_ratio', 'quick_ratio', 'price_to_sales', 'price_to_cash_flow',
+    'enterprise_value', 'ev_to_revenue', 'ev_to_ebitda', 'free_cash_flow',
+    'country', 'market', 'date'
+]
+
+# 오름차순이 유리한 지표 (0/None은 맨 뒤로)
+ASCENDING_KEYS = {'pe_ratio', 'pbr'}
+
+SORT_KEYS = {
+    'current_price', 'market_cap', 'pe_ratio', 'pbr', 'dividend_yield',
+    'volume'
+}
+
+
+def to_number(value):
+    """NumPy/NaN/inf 값을 JSON 직렬화 가능한 Python 숫자(또는 None)로 정리"""
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def build_record(symbol, name, history, fundamentals, country, market, date):
+    """OHLCV 이력과 펀더멘털 정보로 응답 레코드 생성
+
+    history 는 open/high/low/close/volume 컬럼을 가진 날짜 오름차순 DataFrame
+    """
+    latest = history.iloc[-1]
+    prev = history.iloc[-2] if len(history) > 1 else latest
+
+    current_price = float(latest['close'])
+    prev_price = float(prev['close'])
+    change = current_price - prev_price
+    change_percent = (change / prev_price * 100) if prev_price != 0 else 0
+
+    record = dict.fromkeys(RECORD_FIELDS)
+    record.update({
+        'symbol': symbol,
+        'name': name,
+        'current_price': round(current_price, 2),
+        'change': round(change, 2),
+        'change_percent': round(change_percent, 2),
+        'volume': int(latest['volume']) if latest['volume'] else 0,
+        'week_52_high': round(float(history['high'].max()), 2),
+        'week_52_low': round(float(history['low'].min()), 2),
+        'country': country,
+        'market': market,
+        'date': date
+    })
+
+    for key, value in (fundamentals or {}).items():
+        if key in record and value is not None:
+            record[key] = value
+
+    return record
+
+
+def sort_records(data, sort_by):
+    """sortBy 기준으로 레코드 정렬 (기존 수집기와 동일한 규칙)"""
+    if not sort_by or sort_by not in SORT_KEYS or not data:
+        return data
+
+    if sort_by in ASCENDING_KEYS:
+        data.sort(key=lambda x: x.get(sort_by) or float('inf'))
+    else:
+        data.sort(key=lambda x: x.get(sort_by) or 0, reverse=True)
+    return data
+
+
+def rank_symbols(values, sort_by):
+    """{symbol: 값} 을 sort_records 와 같은 규칙으로 정렬한 종목 목록"""
+    rows = [{'symbol': symbol, sort_by: to_number(value)}
+            for symbol, value in values.items()]
+    return [row['symbol'] for row in sort_records(rows, sort_by)]
@@ -0,0 +1,339 @@
+"""녹화된 응답으로 동작하는 오프라인 클라이언트
+
+record_yfinance() 로 실제 yfinance 응답을 디렉터리에 한 번 저장해 두면
+ReplayYFinance 가 같은 인터페이스(download / Ticker(...).info / .history)로
+네트워크 없이 응답한다. YFINANCE_REPLAY_DIR 환경 변수로 수집기에 연결된다.
+
+pykrx 는 RecordingPykrx 가 pykrx.stock 함수 호출 결과를 (함수, 인자) 별로
+저장하고, ReplayPykrx 가 같은 함수 이름으로 그 결과를 돌려준다. 수집기는
+pykrx_stock() 으로 stock 모듈을 얻으며 PYKRX_RECORD_DIR / PYKRX_REPLAY_DIR
+환경 변수로 녹화/재생이 켜진다.
+
+재생 클라이언트에는 FaultInjector 로 지연, 오류, 호출 속도 제한(throttling)을
+넣을 수 있다 (REPLAY_* 환경 변수). 오류/지연 여부는 (seed, 호출 키, 같은 키 호출
+순번) 으로 정해지므로 스레드 실행 순서와 관계없이 재현된다.
+
+디렉터리 구조:
+    <dir>/history/<SYMBOL>.pkl   종목별 일봉 DataFrame (yfinance 원본 컬럼)
+    <dir>/info/<SYMBOL>.json     종목별 Ticker.info
+    <dir>/pykrx/<함수>/<키>.pkl   pykrx.stock 호출별 {'args', 'kwargs', 'result'}
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayError(RuntimeError):
+    """FaultInjector 가 넣은 오류"""
+
+
+class ReplayThrottled(ReplayError):
+    """FaultInjector 호출 속도 제한 초과 (KRX/Yahoo 의 차단 응답 대용)"""
+
+
+class ReplayMiss(KeyError):
+    """녹화되지 않은 pykrx 호출 (DataFrame 을 돌려주는 함수가 아닐 때)"""
+
+
+class FaultInjector:
+    """재생 클라이언트 호출마다 지연/오류/속도 제한을 넣음
+
+    - latency_ms, jitter_ms: 호출마다 latency_ms ± jitter_ms 만큼 대기
+    - error_rate: 이 확률로 ReplayError
+    - throttle_rate, throttle_burst: 초당 throttle_rate 회 (최대 burst 회 연속)
+      를 넘는 호출은 ReplayThrottled
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 throttle_rate=None, throttle_burst=1, seed=0):
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.throttle_rate = float(throttle_rate) if throttle_rate else None
+        self.throttle_burst = max(1, int(throttle_burst))
+        self.seed = int(seed)
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self._counts = {}
+        self._tokens = float(self.throttle_burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(latency_ms=float(os.getenv('REPLAY_LATENCY_MS', '0')),
+                   jitter_ms=float(os.getenv('REPLAY_JITTER_MS', '0')),
+                   error_rate=float(os.getenv('REPLAY_ERROR_RATE', '0')),
+                   throttle_rate=float(os.getenv('REPLAY_THROTTLE_RATE', '0')),
+                   throttle_burst=int(os.getenv('REPLAY_THROTTLE_BURST', '1')),
+                   seed=int(os.getenv('REPLAY_SEED', '0')))
+
+    def _throttle(self):
+        """토큰이 있으면 True (없으면 토큰을 쓰지 않고 False)"""
+        now = time.monotonic()
+        self._tokens = min(self.throttle_burst,
+                           self._tokens + (now - self._updated) *
+                           self.throttle_rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def call(self, key):
+        """호출 하나 전에 실행 (대기하거나 예외를 던짐)"""
+        with self._lock:
+            self.calls += 1
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            allowed = self.throttle_rate is None or self._throttle()
+            if not allowed:
+                self.throttled += 1
+
+        rng = np.random.default_rng(
+            [self.seed, zlib.crc32(key.encode('utf-8')), count])
+        delay = self.latency_ms + self.jitter_ms * rng.uniform(-1, 1)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if not allowed:
+            raise ReplayThrottled(f"호출 속도 제한 초과: {key}")
+        if rng.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise ReplayError(f"주입된 오류: {key}")
+
+    def stats(self):
+        return {'calls': self.calls, 'errors': self.errors,
+                'throttled': self.throttled}
+
+
+def _history_path(directory, symbol):
+    return os.path.join(directory, "history", f"{symbol}.pkl")
+
+
+def _info_path(directory, symbol):
+    return os.path.join(directory, "info", f"{symbol}.json")
+
+
+def record_yfinance(symbols, start_date, end_date, directory, client=None):
+    """실제 yfinance 응답을 녹화 (종목별 history + info)"""
+    if client is None:
+        import yfinance as client
+
+    os.makedirs(os.path.join(directory, "history"), exist_ok=True)
+    os.makedirs(os.path.join(directory, "info"), exist_ok=True)
+
+    for symbol in symbols:
+        ticker = client.Ticker(symbol)
+        hist = ticker.history(start=start_date, end=end_date, auto_adjust=False)
+        hist.to_pickle(_history_path(directory, symbol))
+        with open(_info_path(directory, symbol), "w", encoding="utf-8") as f:
+            json.dump(ticker.info or {}, f, ensure_ascii=False, default=str)
+
+
+class _ReplayTicker:
+
+    def __init__(self, replay, symbol):
+        self._replay = replay
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        return self._replay.info(self.symbol)
+
+    def history(self, start=None, end=None, **kwargs):
+        return self._replay.history(self.symbol, start, end)
+
+
+class ReplayYFinance:
+    """yfinance 모듈 대용 (녹화 디렉터리 기반)
+
+    download 호출 횟수는 download_calls 로 확인할 수 있다.
+    """
+
+    def __init__(self, directory, faults=None):
+        self.directory = directory
+        self.faults = faults
+        self.download_calls = 0
+
+    def _fault(self, key):
+        if self.faults is not None:
+            self.faults.call(key)
+
+    def Ticker(self, symbol):
+        return _ReplayTicker(self, symbol)
+
+    def info(self, symbol):
+        self._fault(f"info:{symbol}")
+        try:
+            with open(_info_path(self.directory, symbol),
+                      encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def history(self, symbol, start=None, end=None):
+        """[start, end) 구간 일봉 (yfinance 와 동일하게 end 미포함)"""
+        self._fault(f"history:{symbol}")
+        return self._history(symbol, start, end)
+
+    def _history(self, symbol, start=None, end=None):
+        try:
+            hist = pd.read_pickle(_history_path(self.directory, symbol))
+        except FileNotFoundError:
+            return pd.DataFrame()
+
+        index = hist.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        mask = np.ones(len(hist), dtype=bool)
+        if start is not None:
+            mask &= index >= pd.Timestamp(start)
+        if end is not None:
+            mask &= index < pd.Timestamp(end)
+        return hist[mask]
+
+    def download(self, tickers, start=None, end=None, group_by="ticker", **kwargs):
+        """여러 종목을 (symbol, field) MultiIndex 컬럼 하나의 DataFrame 으로 반환"""
+        self.download_calls += 1
+        if isinstance(tickers, str):
+            tickers = tickers.split()
+        self._fault(f"download:{' '.join(tickers)}")
+
+        frames = {}
+        for symbol in tickers:
+            hist = self._history(symbol, start, end)
+            if not hist.empty:
+                frames[symbol] = hist
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+
+def _call_key(args, kwargs):
+    text = repr((tuple(str(arg) for arg in args),
+                 sorted((name, str(value)) for name, value in kwargs.items())))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _pykrx_path(directory, function, key):
+    return os.path.join(directory, 'pykrx', function, f"{key}.pkl")
+
+
+class RecordingPykrx:
+    """pykrx.stock 대용: 실제 함수를 호출하고 결과를 녹화 디렉터리에 저장"""
+
+    def __init__(self, directory, client=None):
+        if client is None:
+            from pykrx import stock as client
+        self.directory = directory
+        self.client = client
+
+    def __getattr__(self, function):
+        target = getattr(self.client, function)
+
+        def record(*args, **kwargs):
+            result = target(*args, **kwargs)
+            path = _pykrx_path(self.directory, function,
+                               _call_key(args, kwargs))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'args': args, 'kwargs': kwargs,
+                             'result': result}, f)
+            os.replace(tmp_path, path)
+            return result
+
+        return record
+
+
+class ReplayPykrx:
+    """pykrx.stock 대용 (RecordingPykrx 녹화 디렉터리 기반)
+
+    녹화되지 않은 호출은 misses 에 세고, 같은 함수의 녹화 결과가 DataFrame 이면
+    빈 DataFrame 을, 아니면 (종목 이름, 거래일 문자열 등) ReplayMiss 를 던져 호출하는
+    쪽의 예외 처리 경로를 타게 한다. DataFrame 결과는 호출마다 복사본을 돌려준다.
+    """
+
+    def __init__(self, directory, faults=None):
+        self.directory = directory
+        self.faults = faults
+        self.misses = 0
+        self._cache = {}
+        self._frame_functions = {}
+        self._lock = threading.Lock()
+
+    def _returns_frame(self, function):
+        """같은 함수의 녹화 결과 하나가 DataFrame 인지 (녹화가 없으면 False)"""
+        if function not in self._frame_functions:
+            directory = os.path.dirname(_pykrx_path(self.directory, function, ''))
+            names = sorted(name for name in os.listdir(directory)
+                           if name.endswith('.pkl')) if os.path.isdir(directory) else []
+            returns_frame = False
+            if names:
+                with open(os.path.join(directory, names[0]), 'rb') as f:
+                    returns_frame = isinstance(pickle.load(f)['result'],
+                                               pd.DataFrame)
+            self._frame_functions[function] = returns_frame
+        return self._frame_functions[function]
+
+    def _load(self, function, key):
+        with self._lock:
+            if (function, key) in self._cache:
+                result = self._cache[function, key]
+                if result is ReplayMiss:
+                    raise ReplayMiss(f"녹화되지 않은 pykrx 호출: {function}")
+                return result
+        try:
+            with open(_pykrx_path(self.directory, function, key), 'rb') as f:
+                result = pickle.load(f)['result']
+        except FileNotFoundError:
+            logger.debug(f"녹화되지 않은 pykrx 호출: {function} ({key})")
+            with self._lock:
+                self.misses += 1
+                result = (pd.DataFrame() if self._returns_frame(function)
+                          else ReplayMiss)
+        with self._lock:
+            self._cache[function, key] = result
+        if result is ReplayMiss:
+            raise ReplayMiss(f"녹화되지 않은 pykrx 호출: {function}")
+        return result
+
+    def __getattr__(self, function):
+        if function.startswith('_'):
+            raise AttributeError(function)
+
+        def replay(*args, **kwargs):
+            key = _call_key(args, kwargs)
+            if self.faults is not None:
+                self.faults.call(f"{function}:{key}")
+            result = self._load(function, key)
+            return result.copy() if isinstance(result, pd.DataFrame) else result
+
+        return replay
+
+
+def pykrx_stock():
+    """수집기용 pykrx.stock (PYKRX_REPLAY_DIR 이면 재생, PYKRX_RECORD_DIR 이면 녹화)"""
+    replay_dir = os.getenv('PYKRX_REPLAY_DIR')
+    if replay_dir:
+        logger.info(f"pykrx 재생 모드: {replay_dir}")
+        return ReplayPykrx(replay_dir, FaultInjector.from_env())
+    record_dir = os.getenv('PYKRX_RECORD_DIR')
+    if record_dir:
+        logger.info(f"pykrx 녹화 모드: {record_dir}")
+        return RecordingPykrx(record_dir)
+    from pykrx import stock
+    return stock
@@ -0,0 +1,382 @@
+"""데이터 소스 (pykrx / yfinance / synthetic)
+
+모든 소스는 동일한 인터페이스를 제공한다.
+- universe(market, date): 시장 종목 코드 목록
+- name(symbol, date): 종목명
+- history(symbol, start_date, end_date): open/high/low/close/volume 컬럼의 DataFrame
+- fundamentals(symbol, date): 레코드에 병합할 펀더멘털 필드 dict
+- rank(symbols, date, sort_by) [선택]: 시장 전체 표로 정렬한 종목 목록
+  (지원하지 않는 정렬 기준이면 None)
+날짜 인자는 모두 'YYYY-MM-DD' 문자열이다.
+"""
+
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .cache import FileCache
+from .fundamentals import KrxFundamentals, TickerInfoCache
+from .records import rank_symbols, to_number
+
+HISTORY_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+KRX_COLUMNS = {
+    '시가': 'open',
+    '고가': 'high',
+    '저가': 'low',
+    '종가': 'close',
+    '거래량': 'volume'
+}
+
+US_MARKET_SYMBOLS = {
+    'sp500': [
+        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'BRK-B', 'V',
+        'JNJ', 'WMT', 'JPM', 'PG', 'UNH', 'HD', 'CVX', 'MA', 'PFE', 'BAC',
+        'ABBV', 'KO', 'AVGO', 'PEP', 'COST', 'TMO', 'DHR', 'ABT', 'VZ', 'ADBE',
+        'NKE', 'CRM', 'LLY', 'CMCSA', 'NFLX', 'INTC', 'T', 'AMD', 'TXN',
+        'QCOM', 'NEE', 'HON', 'PM', 'UNP', 'IBM', 'RTX', 'LOW', 'SPGI', 'INTU',
+        'GS', 'CAT'
+    ],
+    'nasdaq': [
+        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'AVGO', 'NFLX',
+        'ADBE', 'CRM', 'PYPL', 'INTC', 'CMCSA', 'PEP', 'COST', 'CSCO', 'TXN',
+        'QCOM', 'AMGN', 'INTU', 'ISRG', 'BKNG', 'MU', 'GILD', 'REGN', 'VRTX',
+        'LRCX', 'AMAT', 'KLAC', 'CHTR', 'MELI', 'MRVL', 'ORLY', 'CTAS', 'NTES',
+        'WDAY', 'FAST', 'PAYX', 'VRSK', 'EBAY', 'MNST', 'CTSH', 'DXCM', 'ROST',
+        'PCAR', 'SNPS', 'CDNS'
+    ],
+    'dow': [
+        'AAPL', 'MSFT', 'UNH', 'GS', 'HD', 'CAT', 'AMGN', 'MCD', 'V', 'BA',
+        'CRM', 'TRV', 'AXP', 'JPM', 'JNJ', 'WMT', 'CVX', 'NKE', 'PG', 'IBM',
+        'MMM', 'DIS', 'MRK', 'KO', 'HON', 'VZ', 'CSCO', 'WBA', 'DOW', 'INTC'
+    ],
+    'russell2000': [
+        'IWM', 'VTWO', 'URTY', 'TNA', 'SCHA', 'GME', 'AMC', 'PLTR', 'BB',
+        'CLOV', 'SOFI', 'HOOD', 'LCID', 'RIVN', 'RBLX', 'COIN', 'ROKU', 'BYND'
+    ]
+}
+US_MARKET_SYMBOLS['russell'] = US_MARKET_SYMBOLS['russell2000']
+
+# yfinance info 키 -> 레코드 필드
+US_INFO_FIELDS = {
+    'market_cap': 'marketCap',
+    'pbr': 'priceToBook',
+    'eps': 'trailingEps',
+    'dividend_yield': 'dividendYield',
+    'beta': 'beta',
+    'shares_outstanding': 'sharesOutstanding',
+    'book_value': 'bookValue',
+    'revenue': 'totalRevenue',
+    'net_income': 'netIncomeToCommon',
+    'debt_to_equity': 'debtToEquity',
+    'roe': 'returnOnEquity',
+    'roa': 'returnOnAssets',
+    'operating_margin': 'operatingMargins',
+    'profit_margin': 'profitMargins',
+    'revenue_growth': 'revenueGrowth',
+    'earnings_growth': 'earningsGrowth',
+    'current_ratio': 'currentRatio',
+    'quick_ratio': 'quickRatio',
+    'price_to_sales': 'priceToSalesTrailing12Months',
+    'price_to_cash_flow': 'priceToFreeCashflow',
+    'enterprise_value': 'enterpriseValue',
+    'ev_to_revenue': 'enterpriseToRevenue',
+    'ev_to_ebitda': 'enterpriseToEbitda',
+    'free_cash_flow': 'freeCashflow',
+    'sector': 'sector',
+    'industry': 'industry'
+}
+
+
+def krx_date(date):
+    """'YYYY-MM-DD' -> 'YYYYMMDD'"""
+    return date.replace('-', '')
+
+
+def empty_history():
+    return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+
+# 정렬 기준 -> (KrxFundamentals 표 종류, 컬럼)
+KRX_RANK_COLUMNS = {
+    'market_cap': ('cap', '시가총액'),
+    'volume': ('cap', '거래량'),
+    'current_price': ('cap', '종가'),
+    'pe_ratio': ('fundamental', 'PER'),
+    'pbr': ('fundamental', 'PBR'),
+    'dividend_yield': ('fundamental', 'DIV')
+}
+
+
+class PykrxSource:
+    """pykrx 기반 한국 시장 소스"""
+
+    source_name = 'pykrx'
+    country = 'Korea'
+    markets = {
+        'kospi': 'KOSPI',
+        'kosdaq': 'KOSDAQ',
+        'konex': 'KONEX',
+        'etf': 'ETF'
+    }
+
+    def __init__(self, client=None, snapshot_cache=None):
+        if client is None:
+            from pykrx import stock as client
+        self.client = client
+        self.snapshot = KrxFundamentals(client, cache=snapshot_cache)
+
+    def market_label(self, market):
+        if market not in self.markets:
+            raise ValueError(f"Unknown Korean market: {market}")
+        return self.markets[market]
+
+    def universe(self, market, date):
+        label = self.market_label(market)
+        if label == 'ETF':
+            return list(self.client.get_etf_ticker_list(krx_date(date)))
+        return list(
+            self.client.get_market_ticker_list(krx_date(date), market=label))
+
+    def name(self, symbol, date=None):
+        try:
+            return self.client.get_market_ticker_name(symbol)
+        except Exception:
+            return symbol
+
+    def history(self, symbol, start_date, end_date):
+        df = self.client.get_market_ohlcv_by_date(krx_date(start_date),
+                                                  krx_date(end_date), symbol)
+        if df is None or df.empty:
+            return empty_history()
+        return df.rename(columns=KRX_COLUMNS)[HISTORY_COLUMNS]
+
+    def prefetch(self, symbols, date, call=None):
+        """일자별 시장 전체 시가총액/펀더멘털 표 선조회 (표당 1회)"""
+        self.snapshot.prefetch(krx_date(date), call)
+
+    def rank(self, symbols, date, sort_by):
+        """해당 일자 시장 전체 표 하나로 종목 순위 결정 (종목별 조회 없음)"""
+        if sort_by not in KRX_RANK_COLUMNS:
+            return None
+        kind, column = KRX_RANK_COLUMNS[sort_by]
+        table = self.snapshot.table(kind, krx_date(date))
+        if table is None or column not in table.columns:
+            return None
+        return rank_symbols(table[column].reindex(symbols).to_dict(), sort_by)
+
+    def fundamentals(self, symbol, date):
+        values = self.snapshot.lookup(symbol, krx_date(date))
+        return {key: to_number(value) for key, value in values.items()}
+
+
+class YFinanceSource:
+    """yfinance 기반 미국 시장 소스
+
+    가격은 history_many 로 전체 종목을 한 번에 내려받고,
+    info 는 TickerInfoCache 가 (종목, 일자) 단위로 캐시/병렬 조회한다.
+    """
+
+    source_name = 'yfinance'
+    country = 'USA'
+    markets = US_MARKET_SYMBOLS
+
+    def __init__(self, client=None, info_cache=None, max_workers=8):
+        if client is None:
+            import yfinance as client
+        self.client = client
+        self.infos = TickerInfoCache(self._fetch_info,
+                                     cache=info_cache,
+                                     max_workers=max_workers,
+                                     prefix='yf_info')
+
+    def market_label(self, market):
+        if market not in self.markets:
+            raise ValueError(f"Unknown US market: {market}")
+        return market.upper()
+
+    def universe(self, market, date):
+        self.market_label(market)
+        return list(self.markets[market])
+
+    def name(self, symbol, date):
+        info = self.infos.get(symbol, date)
+        return info.get('longName', info.get('shortName', symbol))
+
+    def history(self, symbol, start_date, end_date):
+        return self.history_many([symbol], start_date,
+                                 end_date).get(symbol, empty_history())
+
+    def history_many(self, symbols, start_date, end_date):
+        """여러 종목 가격을 단일 download 요청으로 조회 -> {symbol: DataFrame}"""
+        frame = self.client.download(list(symbols),
+                                     start=start_date,
+                                     end=end_date,
+                                     group_by='ticker',
+                                     auto_adjust=False,
+                                     threads=True,
+                                     progress=False)
+        if frame is None or frame.empty:
+            return {}
+
+        histories = {}
+        for symbol in symbols:
+            if isinstance(frame.columns, pd.MultiIndex):
+                if symbol not in frame.columns.get_level_values(0):
+                    continue
+                hist = frame[symbol]
+            else:
+                hist = frame
+            hist = hist.rename(columns=str.lower)[HISTORY_COLUMNS].dropna(
+                subset=['close'])
+            if not hist.empty:
+                histories[symbol] = hist
+        return histories
+
+    def prefetch(self, symbols, date, call=None):
+        """info 병렬 선조회"""
+        self.infos.prefetch(symbols, date, call)
+
+    def fundamentals(self, symbol, date):
+        info = self.infos.get(symbol, date)
+        result = {
+            field: info.get(key)
+            for field, key in US_INFO_FIELDS.items() if info.get(key) is not None
+        }
+        pe_ratio = info.get('forwardPE', info.get('trailingPE'))
+        if pe_ratio is not None:
+            result['pe_ratio'] = pe_ratio
+        return result
+
+    def _fetch_info(self, symbol):
+        return self.client.Ticker(symbol).info or {}
+
+
+# 오프라인/테스트용 샘플 종목 (종목코드, 종목명, 기준가, 시가총액, PER, PBR, 배당수익률)
+SYNTHETIC_UNIVERSE = {
+    'kospi': [
+        ('005930', '삼성전자', 75000, 460000000000000, 22.5, 1.8, 2.1),
+        ('000660', 'SK하이닉스', 130000, 95000000000000, 18.3, 1.5, 1.8),
+        ('373220', 'LG에너지솔루션', 450000, 107000000000000, 21.7, 2.1, 0.0),
+        ('207940', '삼성바이오로직스', 850000, 69000000000000, 45.2, 8.1, 0.0),
+        ('051910', 'LG화학', 520000, 36000000000000, 15.7, 1.1, 1.2),
+        ('035420', 'NAVER', 190000, 31000000000000, 28.1, 2.2, 0.5),
+        ('005490', 'POSCO홀딩스', 380000, 31000000000000, 12.3, 0.9, 3.2),
+        ('006400', '삼성SDI', 420000, 28000000000000, 19.2, 1.9, 0.8),
+        ('035720', '카카오', 65000, 26000000000000, 35.8, 2.7, 0.0),
+        ('068270', '셀트리온', 180000, 23000000000000, 25.4, 3.2, 0.0),
+    ],
+    'kosdaq': [
+        ('086520', '에코프로', 78000, 12000000000000, 28.9, 3.5, 0.0),
+        ('247540', '에코프로비엠', 190000, 18000000000000, 60.1, 9.2, 0.0),
+        ('028300', 'HLB', 60000, 7800000000000, 0.0, 6.1, 0.0),
+        ('196170', '알테오젠', 280000, 14000000000000, 0.0, 30.2, 0.0),
+        ('263750', '펄어비스', 32000, 2100000000000, 0.0, 2.0, 0.0),
+    ],
+    'sp500': [
+        ('AAPL', 'Apple Inc.', 195.0, 3000000000000, 29.2, 46.8, 0.5),
+        ('MSFT', 'Microsoft Corp.', 415.0, 3100000000000, 35.1, 13.2, 0.7),
+        ('GOOGL', 'Alphabet Inc.', 142.0, 1800000000000, 26.8, 5.9, 0.0),
+        ('AMZN', 'Amazon.com Inc.', 155.0, 1600000000000, 52.1, 8.4, 0.0),
+        ('NVDA', 'NVIDIA Corp.', 135.0, 3300000000000, 65.8, 28.5, 0.03),
+        ('META', 'Meta Platforms Inc.', 485.0, 1200000000000, 25.2, 7.8, 0.4),
+        ('TSLA', 'Tesla Inc.', 245.0, 780000000000, 62.5, 9.1, 0.0),
+        ('JNJ', 'Johnson & Johnson', 155.0, 410000000000, 15.2, 5.8, 2.9),
+    ],
+}
+
+
+class SyntheticSource:
+    """네트워크 없이 결정적인 가격을 생성하는 샘플 소스"""
+
+    source_name = 'synthetic'
+
+    def __init__(self, country='Korea', seed=0, volatility=0.02):
+        self.country = country
+        self.seed = seed
+        self.volatility = volatility
+        self._stocks = {}
+        for market, rows in SYNTHETIC_UNIVERSE.items():
+            for row in rows:
+                self._stocks[row[0]] = row
+
+    def market_label(self, market):
+        return market.upper()
+
+    def universe(self, market, date):
+        default_market = 'kospi' if self.country == 'Korea' else 'sp500'
+        rows = SYNTHETIC_UNIVERSE.get(market,
+                                      SYNTHETIC_UNIVERSE[default_market])
+        return [row[0] for row in rows]
+
+    def name(self, symbol, date=None):
+        return self._stocks[symbol][1] if symbol in self._stocks else symbol
+
+    def _rng(self, symbol):
+        return np.random.default_rng(
+            [self.seed, zlib.crc32(symbol.encode('utf-8'))])
+
+    def history(self, symbol, start_date, end_date):
+        dates = pd.bdate_range(start_date, end_date)
+        if len(dates) == 0:
+            return empty_history()
+
+        base_price = self._stocks.get(symbol, (symbol, symbol, 10000))[2]
+        rng = self._rng(symbol)
+        n = len(dates)
+
+        log_returns = rng.normal(0, self.volatility, n)
+        close = base_price * np.exp(np.cumsum(log_returns))
+        open_ = close * np.exp(rng.normal(0, self.volatility / 2, n))
+        spread = np.abs(rng.normal(0, self.volatility / 2, (2, n)))
+        high = np.maximum(open_, close) * (1 + spread[0])
+        low = np.minimum(open_, close) * (1 - spread[1])
+        volume = rng.lognormal(13, 0.5, n).astype(np.int64)
+
+        return pd.DataFrame(
+            {
+                'open': open_,
+                'high': high,
+                'low': low,
+                'close': close,
+                'volume': volume
+            },
+            index=dates)
+
+    def rank(self, symbols, date, sort_by):
+        values = {
+            symbol: self.fundamentals(symbol, date).get(sort_by)
+            for symbol in symbols
+        }
+        if all(value is None for value in values.values()):
+            return None
+        return rank_symbols(values, sort_by)
+
+    def fundamentals(self, symbol, date):
+        if symbol not in self._stocks:
+            return {}
+        _, _, _, market_cap, pe_ratio, pbr, dividend_yield = self._stocks[
+            symbol]
+        return {
+            'market_cap': market_cap,
+            'pe_ratio': pe_ratio or None,
+            'pbr': pbr or None,
+            'dividend_yield': dividend_yield
+        }
+
+
+def default_source(country):
+    """country 값('korea'/'usa')에 맞는 기본 소스"""
+    if country == 'korea':
+        from .replay import pykrx_stock
+        return PykrxSource(client=pykrx_stock(), snapshot_cache=FileCache())
+    if country == 'usa':
+        replay_dir = os.getenv('YFINANCE_REPLAY_DIR')
+        if replay_dir:
+            from .replay import FaultInjector, ReplayYFinance
+            return YFinanceSource(client=ReplayYFinance(
+                replay_dir, FaultInjector.from_env()))
+        return YFinanceSource(info_cache=FileCache())
+    raise ValueError(f"Unknown country: {country}")
@@ -0,0 +1,110 @@
+"""수집 현황 요약 테이블 (collection_status)
+
+/api/collection-status 는 대시보드가 몇 초마다 호출한다. 예전에는 호출할 때마다
+daily_stock_data, best_k_analysis 를 daily_market_cap 과 조인해 집계했다.
+이제는 각 작업이 끝날 때 한 번 집계해 id = 1 인 한 행에 기록하고, API 는 그 행을
+기본 키로 읽기만 한다.
+
+- 시가총액 수집 (collector_market_cap.py): market_cap_date, market_cap_count
+- OHLCV 수집 (collector.py): ohlcv_date, ohlcv_ticker_count
+- Best K 계산 (best-k-calculator.py): best_k_count, best_k_periods
+
+OHLCV / Best K 집계는 그 시점의 시가총액 기준일(*_basis_date)을 같이 기록한다.
+시가총액이 새 날짜로 수집되면 기준일이 달라지므로 API 는 이전 집계를 미완료로 본다.
+
+테이블 정의는 shared/schema.ts 의 collectionStatus 와 같다.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+DDL = """
+CREATE TABLE IF NOT EXISTS collection_status (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    market_cap_date DATE,
+    market_cap_count INTEGER NOT NULL DEFAULT 0,
+    ohlcv_basis_date DATE,
+    ohlcv_date DATE,
+    ohlcv_ticker_count INTEGER NOT NULL DEFAULT 0,
+    best_k_basis_date DATE,
+    best_k_count INTEGER NOT NULL DEFAULT 0,
+    best_k_periods JSONB NOT NULL DEFAULT '{}',  -- {period_type: count}
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+INSERT INTO collection_status (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+"""
+
+# 최신 시가총액 기준일 (daily_market_cap 의 (date, market_cap) 인덱스로 처리)
+_BASIS_DATE = "SELECT MAX(date) FROM daily_market_cap"
+
+
+def ensure_table(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(DDL)
+    connection.commit()
+
+
+def _update(connection, assignments, params):
+    ensure_table(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE collection_status SET {assignments}, updated_at = NOW() "
+            "WHERE id = 1", params)
+    connection.commit()
+
+
+def refresh_market_cap(connection):
+    """시가총액 수집 결과 집계 (시가총액 수집 완료 후 호출)"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT MAX(date), COUNT(*) FROM daily_market_cap
+            WHERE market_cap IS NOT NULL AND market_cap > 0
+        """)
+        latest_date, count = cursor.fetchone()
+    _update(connection, "market_cap_date = %s, market_cap_count = %s",
+            (latest_date, count))
+    logger.info(f"수집 현황 갱신: 시가총액 {latest_date} {count}개")
+
+
+def refresh_ohlcv(connection):
+    """시가총액 기준일 종목의 최근 30일 OHLCV 집계 (OHLCV 수집 완료 후 호출)"""
+    with connection.cursor() as cursor:
+        cursor.execute(_BASIS_DATE)
+        basis_date = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            SELECT MAX(ds.date), COUNT(DISTINCT ds.ticker)
+            FROM daily_stock_data ds
+            INNER JOIN daily_market_cap dm ON ds.ticker = dm.ticker
+            WHERE dm.date = %(basis)s
+            AND ds.date >= %(basis)s - INTERVAL '30 days'
+            """, {'basis': basis_date})
+        latest_date, ticker_count = cursor.fetchone()
+    _update(
+        connection, "ohlcv_basis_date = %s, ohlcv_date = %s, "
+        "ohlcv_ticker_count = %s", (basis_date, latest_date, ticker_count))
+    logger.info(f"수집 현황 갱신: OHLCV {latest_date} {ticker_count}개 종목")
+
+
+def refresh_best_k(connection):
+    """시가총액 기준일 종목의 Best K 결과를 기간별로 집계 (Best K 계산 후 호출)"""
+    with connection.cursor() as cursor:
+        cursor.execute(_BASIS_DATE)
+        basis_date = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            SELECT bka.period_type, COUNT(*)
+            FROM best_k_analysis bka
+            INNER JOIN daily_market_cap dm ON bka.ticker = dm.ticker
+            WHERE dm.date = %(basis)s
+            AND bka.analysis_date = %(basis)s
+            GROUP BY bka.period_type
+            """, {'basis': basis_date})
+        periods = dict(cursor.fetchall())
+    _update(
+        connection, "best_k_basis_date = %s, best_k_count = %s, "
+        "best_k_periods = %s::jsonb",
+        (basis_date, sum(periods.values()), json.dumps(periods)))
+    logger.info(f"수집 현황 갱신: Best K {periods}")
@@ -0,0 +1,254 @@
+"""로컬 컬럼형 OHLCV 저장소 (Parquet, 분석용 읽기 복제본)
+
+수집기가 실행을 마칠 때마다 일별 OHLCV 를 Parquet 로 추가하고, 분석 작업은
+Postgres/KRX 대신 이 저장소를 읽는다.
+
+레이아웃: {root}/year=YYYY/market=KOSPI/part-{tag}.parquet (hive 파티션)
+- 같은 tag 로 다시 쓰면 같은 파일을 덮어쓰므로 같은 날짜/실행을 다시 추가해도
+  파일이 늘어나지 않는다. 행마다 저장 시각 written_at (ns) 을 기록하므로 서로
+  다른 tag 에 같은 (symbol, date) 가 있으면 read_frame() 은 가장 나중에 쓴 행을
+  남긴다 (written_at 이전 파일의 행은 가장 오래된 것으로 봄).
+- compact() 는 파티션 하나를 (symbol, date) 로 정렬된 파일 하나로 합친다.
+  중복 행은 가장 나중에 쓴 행만 남기고 written_at 은 그대로 둔다.
+  정렬되어 있으면 row group 통계로 종목 조건도 건너뛸 수 있다.
+- 읽기는 mmap 으로 파일을 열고 year 파티션과 row group 통계로 symbol/date
+  조건을 미리 걸러낸다 (predicate pushdown).
+
+pyarrow 가 설치된 경우에만 사용할 수 있다.
+"""
+
+import logging
+import os
+import time
+import uuid
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.getenv("OHLCV_STORE_DIR", "data/ohlcv_store")
+
+COLUMNS = ['date', 'symbol', 'market', 'open', 'high', 'low', 'close',
+           'volume', 'market_cap']
+KEY_COLUMNS = ['symbol', 'date']
+WRITTEN_AT = 'written_at'
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('date', pa.date32()),
+        ('symbol', pa.string()),
+        ('open', pa.int64()),
+        ('high', pa.int64()),
+        ('low', pa.int64()),
+        ('close', pa.int64()),
+        ('volume', pa.int64()),
+        ('market_cap', pa.int64()),
+        (WRITTEN_AT, pa.int64()),
+    ])
+
+
+def _dataset_schema():
+    """파일 스키마 + hive 파티션 컬럼 (written_at 이 없는 이전 파일은 null 로 읽음)"""
+    import pyarrow as pa
+
+    return _schema().append(pa.field('year', pa.int32())).append(
+        pa.field('market', pa.string()))
+
+
+def _filesystem():
+    from pyarrow import fs
+
+    return fs.LocalFileSystem(use_mmap=True)
+
+
+def normalize_frame(frame):
+    """수집 결과 DataFrame -> 저장소 컬럼 (종목/날짜당 한 행)
+
+    rankings.combine_frames 결과처럼 랭킹 종류별로 같은 종목이 여러 번 나오는
+    프레임도 받는다. market 이 없으면 'UNKNOWN', market_cap 이 없으면 0.
+    written_at 이 있으면 그대로 둔다 (없으면 저장할 때 채움).
+    """
+    frame = frame.rename(columns={
+        'ticker': 'symbol',
+        'open_price': 'open',
+        'high_price': 'high',
+        'low_price': 'low',
+        'close_price': 'close'
+    })
+    frame = frame.assign(
+        date=pd.to_datetime(frame['date']).dt.date,
+        market=frame['market'] if 'market' in frame else 'UNKNOWN',
+        market_cap=frame['market_cap'] if 'market_cap' in frame else 0)
+    columns = COLUMNS + [WRITTEN_AT] if WRITTEN_AT in frame else COLUMNS
+    frame = frame[columns].drop_duplicates(KEY_COLUMNS, keep='last')
+    for column in ('open', 'high', 'low', 'close', 'volume', 'market_cap'):
+        frame[column] = frame[column].fillna(0).round().astype('int64')
+    return frame
+
+
+class ParquetStore:
+    """연도/시장 파티션 Parquet 데이터셋"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def _partition(self, year, market):
+        return os.path.join(self.root, f"year={year}", f"market={market}")
+
+    def _write_part(self, directory, tag, part):
+        """정규화된 파티션 행을 {directory}/part-{tag}.parquet 로 원자적으로 저장
+
+        임시 파일은 '_' 로 시작해 pyarrow 데이터셋 탐색에서 제외되므로 읽는 쪽이
+        반쯤 쓴 파일을 보지 않는다.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{tag}.parquet")
+        if WRITTEN_AT not in part:
+            part = part.assign(**{WRITTEN_AT: time.time_ns()})
+        table = pa.Table.from_pandas(
+            part.sort_values(KEY_COLUMNS)[_schema().names],
+            schema=_schema(),
+            preserve_index=False)
+        tmp_path = os.path.join(directory, f"_tmp-{tag}-{os.getpid()}.parquet")
+        pq.write_table(table, tmp_path, row_group_size=64 * 1024)
+        os.replace(tmp_path, path)
+        return path
+
+    def append(self, frame, tag=None):
+        """frame 을 연도/시장 파티션별 파일로 저장하고 저장한 행 수 반환
+
+        tag: 파일 이름 구분자 (같은 tag 로 다시 쓰면 덮어씀). 없으면 임의 값.
+        """
+        frame = normalize_frame(frame)
+        if frame.empty:
+            return 0
+
+        tag = tag or uuid.uuid4().hex[:12]
+        years = pd.to_datetime(frame['date']).dt.year
+        for (year, market), part in frame.groupby([years, 'market']):
+            self._write_part(self._partition(year, market), tag, part)
+
+        logger.info(f"OHLCV 저장소 추가: {len(frame)}행 (tag={tag})")
+        return len(frame)
+
+    def compact(self, year, market):
+        """파티션 하나를 (symbol, date) 정렬된 파일 하나로 합침"""
+        import pyarrow.parquet as pq
+
+        directory = self._partition(year, market)
+        paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith('part-') and name.endswith('.parquet'))
+        if len(paths) <= 1:
+            return
+        frames = []
+        for path in paths:
+            part = pq.read_table(path).to_pandas()
+            if WRITTEN_AT not in part:  # written_at 이전 파일은 수정 시각으로 대신함
+                part[WRITTEN_AT] = os.stat(path).st_mtime_ns
+            frames.append(part)
+        # 파일 이름 순서가 아니라 저장 시각 순으로 정렬해 가장 나중에 쓴 행을 남김
+        frame = pd.concat(frames, ignore_index=True).sort_values(
+            WRITTEN_AT, kind='stable')
+        # 합친 파일을 먼저 완성한 뒤 나머지를 지움. 그 사이 읽는 쪽은 같은 행을
+        # 두 번 볼 수 있지만 (read_frame 이 한 행만 남김) 빠진 행은 보지 않는다.
+        target = self._write_part(directory, "compact",
+                                  normalize_frame(frame.assign(market=market)))
+        for path in paths:
+            if path != target:
+                os.remove(path)
+        logger.info(f"OHLCV 저장소 압축: year={year} market={market} "
+                    f"{len(paths)}개 파일 -> 1개")
+
+    def dataset(self):
+        import pyarrow.dataset as ds
+
+        return ds.dataset(self.root,
+                          schema=_dataset_schema(),
+                          format='parquet',
+                          partitioning='hive',
+                          filesystem=_filesystem())
+
+    def read(self, symbols=None, start_date=None, end_date=None,
+             columns=None, market=None):
+        """조건에 맞는 행을 pyarrow.Table 로 읽음 (symbol, date 순 정렬)"""
+        import pyarrow.dataset as ds
+
+        if not os.path.isdir(self.root):
+            return None
+
+        condition = None
+
+        def both(left, right):
+            return right if left is None else left & right
+
+        if symbols is not None:
+            condition = both(condition, ds.field('symbol').isin(list(symbols)))
+        if start_date is not None:
+            start_date = pd.Timestamp(start_date).date()
+            condition = both(condition, ds.field('year') >= start_date.year)
+            condition = both(condition, ds.field('date') >= start_date)
+        if end_date is not None:
+            end_date = pd.Timestamp(end_date).date()
+            condition = both(condition, ds.field('year') <= end_date.year)
+            condition = both(condition, ds.field('date') <= end_date)
+        if market is not None:
+            condition = both(condition, ds.field('market') == market)
+
+        if columns is not None:
+            columns = list(dict.fromkeys(KEY_COLUMNS + list(columns) + [WRITTEN_AT]))
+        table = self.dataset().to_table(columns=columns, filter=condition)
+        return table.sort_by([('symbol', 'ascending'), ('date', 'ascending')])
+
+    def read_frame(self, symbols=None, start_date=None, end_date=None,
+                   columns=None, market=None):
+        """read() 결과를 DataFrame 으로 ((symbol, date) 중복은 가장 나중에 쓴 행만)"""
+        table = self.read(symbols, start_date, end_date, columns, market)
+        if table is None:
+            return pd.DataFrame(columns=columns or COLUMNS)
+        frame = table.to_pandas()
+        frame = frame.sort_values(KEY_COLUMNS + [WRITTEN_AT], kind='stable',
+                                  na_position='first')
+        return frame.drop_duplicates(KEY_COLUMNS, keep='last').drop(
+            columns=WRITTEN_AT).reset_index(drop=True)
+
+    def read_arrays(self, symbol, start_date=None, end_date=None):
+        """종목 하나 -> {'date': datetime64[D], 'open': int64, ...}
+
+        daily_stock.load_symbol 과 같은 형태라 분석 코드가 둘을 바꿔 쓸 수 있다.
+        """
+        frame = self.read_frame([symbol], start_date, end_date)
+        arrays = {
+            column: frame[column].to_numpy()
+            for column in ('open', 'high', 'low', 'close', 'volume',
+                           'market_cap')
+        }
+        arrays['date'] = frame['date'].to_numpy().astype('datetime64[D]')
+        return arrays
+
+
+def append_frame(frame, tag=None, store=None):
+    """수집기 실행 결과를 저장소에 추가 (실패해도 수집은 계속)"""
+    if frame is None or frame.empty:
+        return 0
+    try:
+        return (store or ParquetStore()).append(frame, tag)
+    except ImportError:
+        logger.warning("pyarrow 가 없어 OHLCV 저장소 추가를 건너뜀")
+    except Exception as e:
+        logger.warning(f"OHLCV 저장소 추가 실패: {e}")
+    return 0
+
+
+def append_rows(rows, market=None, tag=None, store=None):
+    """append_frame 의 dict 행 목록 버전 (market 이 없는 행에 market 지정)"""
+    frame = pd.DataFrame(rows)
+    if market is not None and 'market' not in frame:
+        frame['market'] = market
+    return append_frame(frame, tag, store)
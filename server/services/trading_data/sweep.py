@@ -0,0 +1,186 @@
+"""변동성 돌파 파라미터 스윕 (K + 청산/필터 규칙)
+
+파라미터 (GRID 기본값)
+- k: 목표가 = 당일 시가 + 전일 변동폭 × k
+- take_profit_mult: 익절가 = 시가 + take_profit_mult × (목표가 - 시가)
+  (1.0 이면 simulate_k_value 와 같이 목표가에서 익절)
+- stop_loss_pct: 시가 대비 손절 % (0 이면 손절 없음). 같은 날 익절가와 손절가에
+  모두 닿으면 보수적으로 손절로 본다
+- volume_ratio: 전일 거래량 / 전일까지 VOLUME_WINDOW 일 평균 거래량이 이 값
+  이상인 날만 거래 (0 이면 필터 없음)
+- ma_window: 전일 종가가 전일까지 ma_window 일 이동평균 위일 때만 거래
+  (0 이면 필터 없음)
+
+종목 전체에 공통인 중간값 (전일 변동폭, 이동평균, 거래량 비율) 은 한 번만 만들고,
+필터 조합마다 (k × take_profit × stop_loss × 종목 × 거래일) 텐서를 마스크로 계산한다.
+k_grid 만 바꾸고 나머지가 기본 규칙이면 bestk.evaluate 와 결과가 같다.
+"""
+
+import itertools
+
+import numpy as np
+
+from .bestk import (COUNT_METRICS, DEFAULT_CHUNK_BYTES, K_GRID, METRICS,
+                    summarize)
+
+PARAMETERS = ('k', 'take_profit_mult', 'stop_loss_pct', 'volume_ratio',
+              'ma_window')
+
+GRID = {
+    'k': K_GRID,
+    'take_profit_mult': (1.0, 1.5, 2.0),
+    'stop_loss_pct': (0, 2, 4),
+    'volume_ratio': (0, 1.0, 1.5),
+    'ma_window': (0, 5, 20, 60),
+}
+
+VOLUME_WINDOW = 20
+
+_TEMPORARIES = 16
+
+
+def rolling_mean(matrix, window):
+    """행마다 window 일 이동평균 (앞쪽 window - 1 칸과 NaN 이후는 NaN)"""
+    result = np.full(matrix.shape, np.nan)
+    if window > matrix.shape[1]:
+        return result
+    cumulative = np.cumsum(np.nan_to_num(matrix), axis=1)
+    sums = cumulative[:, window - 1:].copy()
+    sums[:, 1:] -= cumulative[:, :-window]
+    result[:, window - 1:] = sums / window
+    result[np.isnan(matrix)] = np.nan
+    return result
+
+
+def prepare(open_, high, low, close, volume=None, ma_windows=(),
+            volume_window=VOLUME_WINDOW):
+    """스윕 전체가 공유하는 (종목, 거래일 - 1) 중간값
+
+    i 번째 칸은 전일 = i, 당일 = i + 1 쌍이다.
+    """
+    shared = {
+        'open': open_[:, 1:],
+        'high': high[:, 1:],
+        'low': low[:, 1:],
+        'close': close[:, 1:],
+        'range': high[:, :-1] - low[:, :-1],
+        'prev_close': close[:, :-1],
+        'ma': {window: rolling_mean(close, window)[:, :-1]
+               for window in ma_windows if window},
+    }
+    if volume is not None:
+        average = rolling_mean(volume, volume_window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            shared['volume_ratio'] = (volume / average)[:, :-1]
+    return shared
+
+
+def _filter_mask(shared, volume_ratio, ma_window):
+    with np.errstate(invalid='ignore'):
+        mask = (shared['range'] > 0) & ~np.isnan(shared['open'])
+        if volume_ratio:
+            mask &= shared['volume_ratio'] >= volume_ratio
+        if ma_window:
+            mask &= shared['prev_close'] > shared['ma'][ma_window]
+    return mask
+
+
+def _evaluate_filter(shared, traded, k_grid, take_profits, stop_losses,
+                     backend=None):
+    """필터 조합 하나 -> {지표: (k, take_profit, stop_loss, 종목)}"""
+    today_open, high, low, close = (shared['open'], shared['high'],
+                                    shared['low'], shared['close'])
+    k = k_grid[:, None, None, None, None]
+    take_profit = take_profits[None, :, None, None, None]
+    stop_loss = stop_losses[None, None, :, None, None]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        distance = shared['range'] * k
+        take_price = today_open + take_profit * distance
+        stop_price = today_open * (1 - stop_loss / 100)
+
+        stopped = traded & (stop_loss > 0) & (low <= stop_price) & (
+            today_open > 0)
+        hit = traded & ~stopped & (high >= take_price) & (
+            take_price > today_open)
+        valid_price = traded & (close > 0) & (today_open > 0)
+        has_return = stopped | hit | valid_price
+
+        returns = np.where(
+            stopped, -stop_loss,
+            np.where(hit, (take_price - today_open) / today_open * 100,
+                     np.where(valid_price,
+                              (close - today_open) / today_open * 100, 0.0)))
+        returns = np.where(has_return, returns, 0.0)
+        returns = np.broadcast_to(returns, has_return.shape)
+
+    return summarize(returns, has_return, hit, traded, backend)
+
+
+def sweep(open_, high, low, close, volume=None, grid=None, in_period=None,
+          chunk_bytes=DEFAULT_CHUNK_BYTES, backend=None):
+    """(종목, 거래일) 행렬 -> (파라미터 조합 목록, {지표: (조합 수, 종목 수)})
+
+    - grid: GRID 중 바꿀 항목만 넘겨도 된다
+    - in_period: (종목, 거래일) bool. 당일이 True 인 날만 거래 (이동평균
+      계산용으로 앞쪽에 더 읽어 둔 날짜를 제외할 때)
+    - backend: 경로 지표 계산 백엔드 (kernels.resolve_backend)
+    조합 순서는 itertools.product(*[grid[p] for p in PARAMETERS]) 와 같다.
+    """
+    grid = dict(GRID, **(grid or {}))
+    values = {name: np.asarray(grid[name], dtype=np.float64)
+              for name in PARAMETERS}
+    values['ma_window'] = values['ma_window'].astype(np.int64)
+    ma_windows = values['ma_window'].tolist()
+    if volume is None and np.any(values['volume_ratio']):
+        raise ValueError("volume_ratio 필터에는 volume 행렬이 필요함")
+
+    combos = list(itertools.product(*(values[name].tolist()
+                                      for name in PARAMETERS)))
+    tickers, days = close.shape
+    shape = (len(values['k']), len(values['take_profit_mult']),
+             len(values['stop_loss_pct']), len(values['volume_ratio']),
+             len(values['ma_window']), tickers)
+    results = {
+        name: np.zeros(shape,
+                       dtype=np.int64 if name in COUNT_METRICS else np.float64)
+        for name in METRICS
+    }
+
+    if days >= 2:
+        per_ticker = (len(values['k']) * len(values['take_profit_mult']) *
+                      len(values['stop_loss_pct']) * days * 8 * _TEMPORARIES)
+        step = max(1, chunk_bytes // max(per_ticker, 1))
+        for start in range(0, tickers, step):
+            rows = slice(start, start + step)
+            matrices = [None if matrix is None else np.asarray(
+                matrix[rows], dtype=np.float64)
+                        for matrix in (open_, high, low, close, volume)]
+            shared = prepare(*matrices, ma_windows=ma_windows)
+            period = None if in_period is None else np.asarray(
+                in_period[rows])[:, 1:]
+
+            for (v, volume_ratio), (m, ma_window) in itertools.product(
+                    enumerate(values['volume_ratio']),
+                    enumerate(ma_windows)):
+                traded = _filter_mask(shared, volume_ratio, ma_window)
+                if period is not None:
+                    traded &= period
+                chunk = _evaluate_filter(shared, traded, values['k'],
+                                         values['take_profit_mult'],
+                                         values['stop_loss_pct'], backend)
+                for name in METRICS:
+                    results[name][:, :, :, v, m, rows] = chunk[name]
+
+    return combos, {
+        name: array.reshape(len(combos), tickers)
+        for name, array in results.items()
+    }
+
+
+def best_combos(combos, metrics):
+    """종목별 sharpe 최대 조합 -> (조합 목록, {지표: 종목별 값})"""
+    index = np.argmax(metrics['sharpe'], axis=0)
+    columns = np.arange(index.shape[0])
+    chosen = {name: values[index, columns] for name, values in metrics.items()}
+    return [combos[i] for i in index], chosen
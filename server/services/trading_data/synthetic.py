@@ -0,0 +1,302 @@
+"""결정적 합성 OHLCV 생성기 (벤치마크/테스트용)
+
+sources.SyntheticSource 는 고정 종목 몇 개를 종목별로 만든다. 여기서는 종목 수,
+거래일 수, 변동성 국면을 정해 (종목, 거래일) 행렬을 한 번에 만든다. 같은 인자와
+seed 면 항상 같은 값이 나온다.
+
+- 국면: regimes 에 나열한 국면이 거래일을 같은 길이로 나눠 차례로 이어진다
+  (예: ('calm', 'volatile', 'crash'))
+- 수익률: 시장 공통 요인 × 종목 베타 + 종목 고유 요인 (국면별 평균/변동성)
+- 가격: 종목별 시작가에서 로그 수익률 누적, 원 단위 정수로 반올림
+- suspend_ratio: 거래정지로 비는 칸 (NaN) 비율
+
+universe() 는 여기에 갭, 가격제한폭, 여러 날 이어지는 거래정지, 기간 중 상장/
+상장폐지와 시장/시가총액을 더한 종목 유니버스를 만들고, ranking_frames() 가 이를
+daily_stock_data 행 (시장별 시가총액/거래량 순위) 으로 바꾼다 (fast-data-insert.py).
+"""
+
+import numpy as np
+import pandas as pd
+
+# 국면 이름 -> (일 평균 수익률, 일 변동성)
+REGIMES = {
+    'calm': (0.0003, 0.008),
+    'normal': (0.0002, 0.015),
+    'volatile': (0.0, 0.03),
+    'crash': (-0.004, 0.045),
+}
+
+START_DATE = '2020-01-02'
+
+
+def symbols(tickers):
+    """합성 종목 코드 (실제 6자리 코드와 겹치지 않도록 9 로 시작)"""
+    return np.array([f"9{i:05d}" for i in range(tickers)])
+
+
+def regime_labels(days, regimes=('normal', )):
+    """거래일마다 국면 이름"""
+    blocks = np.array_split(np.arange(days), len(regimes))
+    labels = np.empty(days, dtype=object)
+    for name, block in zip(regimes, blocks):
+        labels[block] = name
+    return labels
+
+
+def generate(tickers, days, seed=0, regimes=('normal', ), suspend_ratio=0.0,
+             start_date=START_DATE):
+    """합성 시장 -> {'symbols', 'dates', 'regimes', 'open', ..., 'volume'}
+
+    가격/거래량은 (종목 수, 거래일 수) float64 행렬이다.
+    """
+    unknown = set(regimes) - set(REGIMES)
+    if unknown:
+        raise ValueError(f"알 수 없는 국면: {', '.join(sorted(unknown))} "
+                         f"({', '.join(REGIMES)})")
+
+    rng = np.random.default_rng(seed)
+    labels = regime_labels(days, regimes)
+    drift = np.array([REGIMES[label][0] for label in labels])
+    volatility = np.array([REGIMES[label][1] for label in labels])
+
+    market = rng.normal(drift, volatility * 0.6, days)
+    beta = rng.uniform(0.5, 1.5, (tickers, 1))
+    idiosyncratic = rng.normal(0.0, 1.0, (tickers, days)) * volatility * 0.8
+    log_returns = market * beta + idiosyncratic
+
+    start = np.exp(rng.uniform(np.log(1000), np.log(500000), (tickers, 1)))
+    close = start * np.exp(np.cumsum(log_returns, axis=1))
+    gap = rng.normal(0.0, 1.0, (tickers, days)) * volatility * 0.3
+    open_ = np.concatenate([start, close[:, :-1]], axis=1) * np.exp(gap)
+    spread = np.abs(rng.normal(0.0, 1.0, (2, tickers, days))) * volatility * 0.5
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+
+    base_volume = np.exp(rng.uniform(np.log(1e4), np.log(1e7), (tickers, 1)))
+    volume = np.round(base_volume * rng.lognormal(0.0, 0.4, (tickers, days)) *
+                      (volatility / 0.015))
+
+    data = {
+        'symbols': symbols(tickers),
+        'dates': pd.bdate_range(start_date, periods=days).values.astype(
+            'datetime64[D]'),
+        'regimes': labels,
+        'open': np.round(open_),
+        'high': np.round(high),
+        'low': np.round(low),
+        'close': np.round(close),
+        'volume': volume,
+    }
+    if suspend_ratio > 0:
+        suspended = rng.random((tickers, days)) < suspend_ratio
+        for field in ('open', 'high', 'low', 'close', 'volume'):
+            data[field][suspended] = np.nan
+    return data
+
+
+def to_series(data):
+    """generate() 결과 -> 종목별 가격 dict 리스트 목록 (simulate_k_value 입력 형태)
+
+    거래정지 (NaN) 칸은 건너뛴다.
+    """
+    dates = pd.to_datetime(data['dates']).date
+    series = []
+    for i in range(len(data['symbols'])):
+        valid = ~np.isnan(data['close'][i])
+        series.append([{
+            'date': date,
+            'open': float(open_price),
+            'high': float(high),
+            'low': float(low),
+            'close': float(close),
+            'volume': int(volume)
+        } for date, open_price, high, low, close, volume in zip(
+            dates[valid], data['open'][i][valid], data['high'][i][valid],
+            data['low'][i][valid], data['close'][i][valid],
+            data['volume'][i][valid])])
+    return series
+
+
+def to_frame(data):
+    """generate() 결과 -> symbol, date, open, ... 긴 형태 DataFrame (NaN 칸 제외)
+
+    store.ParquetStore.append / cube.from_frame 에 그대로 넘길 수 있다.
+    """
+    tickers, days = data['close'].shape
+    frame = pd.DataFrame({
+        'symbol': np.repeat(data['symbols'], days),
+        'date': np.tile(data['dates'], tickers),
+        **{field: data[field].ravel()
+           for field in ('open', 'high', 'low', 'close', 'volume')}
+    })
+    return frame.dropna(subset=['close']).reset_index(drop=True)
+
+
+# 유가증권/코스닥 가격제한폭 (전일 종가 대비 ±30%)
+PRICE_LIMIT = 0.30
+
+
+def _runs(rng, shape, start_ratio, mean_length):
+    """평균 mean_length 일 이어지는 구간 마스크 (구간 시작 확률 start_ratio)"""
+    rows, cols = np.nonzero(rng.random(shape) < start_ratio)
+    lengths = rng.geometric(1.0 / mean_length, len(rows))
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths,
+                                                   lengths)
+    cols = np.repeat(cols, lengths) + offsets
+    rows = np.repeat(rows, lengths)
+    inside = cols < shape[1]
+    mask = np.zeros(shape, dtype=bool)
+    mask[rows[inside], cols[inside]] = True
+    return mask
+
+
+def universe(tickers, days, seed=0, regimes=('normal', ), start_date=START_DATE,
+             listing_ratio=0.1, delisting_ratio=0.05, gap_ratio=0.02,
+             suspend_ratio=0.001, suspend_days=3, kospi_ratio=0.4):
+    """상장/상장폐지가 있는 합성 시장 (daily_stock_data 적재용)
+
+    generate() 의 국면별 GBM 위에 다음을 더한다.
+    - 시가 갭: gap_ratio 확률로 큰 갭 (일 변동성의 수 배)
+    - 가격제한폭: 시가/고가/저가/종가는 전일 종가 대비 ±PRICE_LIMIT 안으로 자름
+      (큰 갭이나 급등락이 제한폭에 닿으면 상한가/하한가로 마감)
+    - 거래정지: suspend_ratio 확률로 시작해 평균 suspend_days 일 이어지며, 정지
+      동안 가격은 그대로이고 재개일 시가 갭이 커진다
+    - 상장/상장폐지: listing_ratio 종목은 기간 중 신규 상장, delisting_ratio 종목은
+      기간 중 상장폐지 (상장 전/폐지 후 칸은 NaN)
+
+    반환값: generate() 의 키 + 'names', 'markets', 'market_cap', 'listed'
+    ('listed' 는 상장 기간이면서 거래정지가 아닌 칸)
+    """
+    unknown = set(regimes) - set(REGIMES)
+    if unknown:
+        raise ValueError(f"알 수 없는 국면: {', '.join(sorted(unknown))} "
+                         f"({', '.join(REGIMES)})")
+
+    rng = np.random.default_rng(seed)
+    labels = regime_labels(days, regimes)
+    drift = np.array([REGIMES[label][0] for label in labels])
+    volatility = np.array([REGIMES[label][1] for label in labels])
+    shape = (tickers, days)
+
+    # 상장 기간 [first, last)
+    first = np.where(rng.random(tickers) < listing_ratio,
+                     rng.integers(1, max(days, 2), tickers), 0)
+    last = np.where(rng.random(tickers) < delisting_ratio,
+                    rng.integers(first + 1, days + 1), days)
+    day = np.arange(days)
+    in_range = (day >= first[:, None]) & (day < last[:, None])
+    suspended = _runs(rng, shape, suspend_ratio, suspend_days) & in_range
+
+    market = rng.normal(drift, volatility * 0.6, days)
+    beta = rng.uniform(0.5, 1.5, (tickers, 1))
+    sigma = volatility * rng.uniform(0.6, 1.6, (tickers, 1))
+    log_returns = market * beta + rng.standard_normal(shape) * sigma * 0.8
+
+    # 장중 종가 수익률 (시가 대비) 과 시가 갭 (전일 종가 대비) 으로 나눔
+    big_gaps = rng.random(shape) < gap_ratio
+    gap = rng.standard_normal(shape) * sigma * np.where(big_gaps, 6.0, 0.3)
+    resumed = np.zeros(shape, dtype=bool)
+    resumed[:, 1:] = suspended[:, :-1] & ~suspended[:, 1:]
+    gap[resumed] *= 4.0
+    limit = np.log1p(PRICE_LIMIT), np.log1p(-PRICE_LIMIT)
+    gap = np.clip(gap, limit[1], limit[0])
+    total = np.clip(gap + log_returns, limit[1], limit[0])
+    total[suspended] = 0.0
+    gap[suspended] = 0.0
+
+    start = np.exp(rng.uniform(np.log(1000), np.log(500000), (tickers, 1)))
+    close = start * np.exp(np.cumsum(total, axis=1))
+    previous = np.concatenate([start, close[:, :-1]], axis=1)
+    open_ = previous * np.exp(gap)
+    spread = np.abs(rng.standard_normal((2, tickers, days))) * sigma * 0.5
+    upper, lower = previous * (1 + PRICE_LIMIT), previous * (1 - PRICE_LIMIT)
+    high = np.minimum(np.maximum(open_, close) * (1 + spread[0]), upper)
+    low = np.maximum(np.minimum(open_, close) * (1 - spread[1]), lower)
+
+    # 거래량은 변동이 큰 날 (갭/제한폭) 에 늘어남
+    base_volume = np.exp(rng.uniform(np.log(1e4), np.log(1e7), (tickers, 1)))
+    volume = np.round(base_volume * rng.lognormal(0.0, 0.4, shape) *
+                      (1 + np.abs(total) / sigma * 0.5))
+    shares = np.round(np.exp(rng.uniform(np.log(3e10), np.log(3e13), (tickers, 1)))
+                      / start)
+
+    # 원 단위 반올림 뒤에도 반올림된 전일 종가 기준 제한폭 안에 두도록 다시 자름
+    prices = {field: np.round(values) for field, values in
+              (('open', open_), ('high', high), ('low', low), ('close', close))}
+    previous = np.concatenate([np.round(start), prices['close'][:, :-1]], axis=1)
+    upper = np.floor(previous * (1 + PRICE_LIMIT))
+    lower = np.ceil(previous * (1 - PRICE_LIMIT))
+    for field in prices:
+        np.clip(prices[field], lower, upper, out=prices[field])
+
+    listed = in_range & ~suspended
+    data = {
+        'symbols': symbols(tickers),
+        'names': np.array([f"합성종목{i:05d}" for i in range(tickers)]),
+        'markets': np.where(rng.random(tickers) < kospi_ratio, 'KOSPI', 'KOSDAQ'),
+        'dates': pd.bdate_range(start_date, periods=days).values.astype(
+            'datetime64[D]'),
+        'regimes': labels,
+        **prices,
+        'volume': volume,
+        'listed': listed,
+    }
+    data['market_cap'] = data['close'] * shares
+    for field in ('open', 'high', 'low', 'close', 'volume', 'market_cap'):
+        data[field][~listed] = np.nan
+    return data
+
+
+def rank_matrix(values, groups):
+    """(종목, 거래일) 값 -> 같은 그룹 (시장) 안에서 거래일별 내림차순 순위 (1부터)
+
+    NaN 칸은 순위 0.
+    """
+    ranks = np.zeros(values.shape, dtype=np.int64)
+    for group in np.unique(groups):
+        member = groups == group
+        subset = values[member]
+        order = np.argsort(-np.nan_to_num(subset, nan=-np.inf), axis=0,
+                           kind='stable')
+        group_ranks = np.empty_like(order)
+        np.put_along_axis(group_ranks, order,
+                          np.arange(1, len(subset) + 1)[:, None], axis=0)
+        group_ranks[np.isnan(subset)] = 0
+        ranks[member] = group_ranks
+    return ranks
+
+
+def ranking_frames(data, top_n=None, day_chunk=60):
+    """universe() 결과 -> daily_stock_data 행 DataFrame 을 거래일 묶음마다 yield
+
+    랭킹 종류마다 (시장, 거래일) 별 순위 행을 만든다 (top_n 이 있으면 상위 top_n 개만).
+    컬럼: date, symbol, name, market, rank_type, rank, open_price, ..., market_cap
+    (문자열 컬럼은 종목/시장 단위 pandas Categorical)
+    """
+    ranks = {
+        'market_cap': rank_matrix(data['market_cap'], data['markets']),
+        'volume': rank_matrix(data['volume'], data['markets']),
+    }
+    markets, market_codes = np.unique(data['markets'], return_inverse=True)
+    days = len(data['dates'])
+    for begin in range(0, days, day_chunk):
+        window = slice(begin, min(begin + day_chunk, days))
+        parts = []
+        for rank_type, rank in ranks.items():
+            rank = rank[:, window]
+            keep = (rank > 0) & (rank <= top_n) if top_n else rank > 0
+            rows, cols = np.nonzero(keep)
+            parts.append(pd.DataFrame({
+                'date': data['dates'][window][cols],
+                'symbol': pd.Categorical.from_codes(rows, data['symbols']),
+                'name': pd.Categorical.from_codes(rows, data['names']),
+                'market': pd.Categorical.from_codes(market_codes[rows], markets),
+                'rank_type': pd.Categorical([rank_type] * len(rows),
+                                            categories=list(ranks)),
+                'rank': rank[rows, cols],
+                **{f"{field}_price": data[field][:, window][rows, cols].astype('int64')
+                   for field in ('open', 'high', 'low', 'close')},
+                'volume': data['volume'][:, window][rows, cols].astype('int64'),
+                'market_cap': data['market_cap'][:, window][rows, cols].astype('int64'),
+            }))
+        yield pd.concat(parts, ignore_index=True)
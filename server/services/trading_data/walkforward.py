@@ -0,0 +1,132 @@
+"""Best K 워크포워드 (표본 외) 평가
+
+종목별 Best K 를 같은 기간 성과로 고르면 그 기간 지표는 표본 내 값이다.
+여기서는 [t - train, t) 구간으로 K 를 고르고 바로 뒤 [t, t + test) 구간 성과만
+집계하며, t 를 test 일씩 앞으로 옮긴다.
+
+K 별 일별 거래 결과 (bestk.trade_returns) 는 종목 덩어리마다 한 번만 계산하고,
+폴드마다는 그 배열을 잘라 bestk.summarize 로 집계만 한다.
+
+K 선택 규칙은 best-k-calculator 와 같다: sharpe 최대 K, 학습 구간 평균 수익률이
+0 이하이면 그 폴드는 거래하지 않음.
+"""
+
+import numpy as np
+
+from .bestk import (COUNT_METRICS, DEFAULT_CHUNK_BYTES, K_GRID, METRICS,
+                    summarize, trade_returns)
+
+# 종목 하나, K 하나, 거래일 하루에 필요한 float64 임시 배열 수 (대략)
+_TEMPORARIES = 16
+
+
+def folds(days, train_days, test_days):
+    """거래일 수 -> [(학습 시작, 평가 시작, 평가 끝)] (끝은 제외, 마지막은 짧을 수 있음)"""
+    return [(start - train_days, start, min(start + test_days, days))
+            for start in range(train_days, days, test_days)]
+
+
+def _empty(shape):
+    return {
+        name: np.zeros(shape,
+                       dtype=np.int64 if name in COUNT_METRICS else np.float64)
+        for name in METRICS
+    }
+
+
+def _walk_chunk(open_, high, low, close, k_grid, splits, backend):
+    returns, has_return, hit, traded = trade_returns(open_, high, low, close,
+                                                     k_grid)
+    traded = np.broadcast_to(traded, returns.shape)
+    tickers = returns.shape[1]
+    columns = np.arange(tickers)
+
+    chosen = np.full((len(splits), tickers), -1, dtype=np.int64)
+    in_sample = _empty((len(splits), tickers))
+    out_of_sample = _empty((len(splits), tickers))
+    # 폴드마다 고른 K 의 평가 구간 결과를 이어 붙인 표본 외 전체 경로
+    stitched = [np.zeros(returns.shape[1:], dtype=dtype)
+                for dtype in (np.float64, bool, bool, bool)]
+
+    for f, (train_start, test_start, test_end) in enumerate(splits):
+        # 거래일 i 는 (전일 i - 1, 당일 i) 쌍 = trade_returns 의 i - 1 번째 칸
+        train = slice(max(train_start - 1, 0), test_start - 1)
+        test = slice(test_start - 1, test_end - 1)
+
+        trained = summarize(returns[..., train], has_return[..., train],
+                            hit[..., train], traded[..., train], backend)
+        best = np.argmax(trained['sharpe'], axis=0)
+        usable = (trained['avg_return_pct'][best, columns] > 0) & (
+            trained['trades'][best, columns] > 0)
+
+        for name in METRICS:
+            in_sample[name][f] = trained[name][best, columns]
+        chosen[f] = np.where(usable, best, -1)
+
+        picked = [array[best, columns, test] for array in
+                  (returns, has_return, hit, traded)]
+        for array in picked[1:]:
+            array &= usable[:, None]
+        picked[0] = np.where(usable[:, None], picked[0], 0.0)
+
+        tested = summarize(*picked, backend=backend)
+        for name in METRICS:
+            out_of_sample[name][f] = tested[name]
+        for target, array in zip(stitched, picked):
+            target[:, test] = array
+
+    return chosen, in_sample, out_of_sample, summarize(*stitched,
+                                                      backend=backend)
+
+
+def evaluate(open_, high, low, close, train_days, test_days, k_grid=K_GRID,
+             chunk_bytes=DEFAULT_CHUNK_BYTES, backend=None):
+    """(종목, 거래일) OHLC 행렬 -> 워크포워드 결과 dict
+
+    - folds: [(학습 시작, 평가 시작, 평가 끝)] 거래일 위치
+    - k: (폴드, 종목) 고른 K (거래하지 않은 폴드는 NaN)
+    - in_sample: {지표: (폴드, 종목)} 학습 구간에서 고른 K 의 성과
+    - out_of_sample: {지표: (폴드, 종목)} 평가 구간 성과
+    - combined: {지표: (종목,)} 평가 구간을 이어 붙인 전체 표본 외 성과
+    """
+    k_grid = np.asarray(k_grid, dtype=np.float64)
+    tickers, days = close.shape
+    if train_days < 2 or test_days < 1:
+        raise ValueError("train_days 는 2 이상, test_days 는 1 이상이어야 함")
+    splits = folds(days, train_days, test_days)
+
+    result = {
+        'folds': splits,
+        'k': np.full((len(splits), tickers), np.nan),
+        'in_sample': _empty((len(splits), tickers)),
+        'out_of_sample': _empty((len(splits), tickers)),
+        'combined': _empty(tickers),
+    }
+    if not splits:
+        return result
+
+    per_ticker = max(len(k_grid) * days * 8 * _TEMPORARIES, 1)
+    step = max(1, chunk_bytes // per_ticker)
+    for start in range(0, tickers, step):
+        rows = slice(start, start + step)
+        chosen, in_sample, out_of_sample, combined = _walk_chunk(
+            *(np.asarray(matrix[rows], dtype=np.float64)
+              for matrix in (open_, high, low, close)), k_grid, splits,
+            backend)
+        result['k'][:, rows] = np.where(chosen >= 0, k_grid[chosen], np.nan)
+        for name in METRICS:
+            result['in_sample'][name][:, rows] = in_sample[name]
+            result['out_of_sample'][name][:, rows] = out_of_sample[name]
+            result['combined'][name][rows] = combined[name]
+    return result
+
+
+def daily_k(result, days):
+    """evaluate() 결과 -> (거래일, 종목) 그날 쓸 K (평가 구간 밖은 NaN)
+
+    portfolio.backtest 의 k 로 넘기면 표본 외 K 로만 운용한다.
+    """
+    k = np.full((days, result['k'].shape[1]), np.nan)
+    for f, (_, test_start, test_end) in enumerate(result['folds']):
+        k[test_start:test_end] = result['k'][f]
+    return k
@@ -5,6 +5,8 @@ import {
   type InsertStockData,
   type DailyStockData,
   type InsertDailyStockData,
+  type StockMarket,
+  type StockRankType,
 } from "@shared/schema";
 import { db } from "./db";
 import { eq, desc, and } from "drizzle-orm";
@@ -29,8 +31,8 @@ export interface IStorage {
   getDailyStockDataBySymbol(symbol: string): Promise<DailyStockData[]>;
   getDailyStockDataByDate(date: string): Promise<DailyStockData[]>;
   getDailyStockDataByMarketAndRank(
-    market: string,
-    rankType: string,
+    market: StockMarket,
+    rankType: StockRankType,
     date: string,
   ): Promise<DailyStockData[]>;
   createDailyStockData(data: InsertDailyStockData): Promise<DailyStockData>;
@@ -107,8 +109,8 @@ export class DatabaseStorage implements IStorage {
   }
 
   async getDailyStockDataByMarketAndRank(
-    market: string,
-    rankType: string,
+    market: StockMarket,
+    rankType: StockRankType,
     date: string,
   ): Promise<DailyStockData[]> {
     const result = await db
@@ -154,8 +156,8 @@ export class DatabaseStorage implements IStorage {
   }
 
   async getDailyStockDataByMarketAndRank(
-    market: string,
-    rankType: string,
+    market: StockMarket,
+    rankType: StockRankType,
     date: string,
   ): Promise<DailyStockData[]> {
     const result = await db
@@ -1,4 +1,4 @@
-import { pgTable, text, serial, timestamp, decimal, integer, date, real } from "drizzle-orm/pg-core";
+import { pgTable, pgEnum, text, serial, timestamp, decimal, integer, bigint, date, real, doublePrecision, primaryKey, jsonb, index, uniqueIndex } from "drizzle-orm/pg-core";
 import { createInsertSchema } from "drizzle-zod";
 import { z } from "zod";
 
@@ -45,24 +45,30 @@ export const stockData = pgTable("stock_data", {
   createdAt: timestamp("created_at").defaultNow(),
 });
 
-// 5년치 일일 데이터 저장 테이블
+// 시장 / 랭킹 종류 enum (server/services/trading_data/daily_stock.py 와 같은 순서)
+export const stockMarket = pgEnum("stock_market", ["KOSPI", "KOSDAQ", "KONEX"]);
+export const stockRankType = pgEnum("stock_rank_type", ["market_cap", "volume"]);
+
+// 5년치 일일 데이터 저장 테이블 (원화 정수 가격, (symbol, date) 로 CLUSTER)
 export const dailyStockData = pgTable("daily_stock_data", {
   id: serial("id").primaryKey(),
   symbol: text("symbol").notNull(),
   name: text("name").notNull(),
   date: date("date").notNull(),
-  market: text("market").notNull(), // KOSPI, KOSDAQ
-  rank_type: text("rank_type").notNull(), // market_cap, volume
+  market: stockMarket("market").notNull(),
+  rank_type: stockRankType("rank_type").notNull(),
   rank: integer("rank").notNull(),
-  open_price: decimal("open_price", { precision: 10, scale: 2 }),
-  high_price: decimal("high_price", { precision: 10, scale: 2 }),
-  low_price: decimal("low_price", { precision: 10, scale: 2 }),
-  close_price: decimal("close_price", { precision: 10, scale: 2 }),
-  volume: integer("volume"),
-  market_cap: text("market_cap"),
+  open_price: integer("open_price"),
+  high_price: integer("high_price"),
+  low_price: integer("low_price"),
+  close_price: integer("close_price"),
+  volume: bigint("volume", { mode: "number" }),
+  market_cap: bigint("market_cap", { mode: "number" }),
   best_k_value: decimal("best_k_value", { precision: 10, scale: 4 }), // 알고리즘 계산 결과
   createdAt: timestamp("created_at").defaultNow(),
-});
+}, (table) => [
+  index("daily_stock_data_symbol_date_idx").on(table.symbol, table.date),
+]);
 
 // 데이터 수집 작업 로그 테이블
 export const dataCollectionLog = pgTable("data_collection_log", {
@@ -76,6 +82,84 @@ export const dataCollectionLog = pgTable("data_collection_log", {
   createdAt: timestamp("created_at").defaultNow(),
 });
 
+// 장기 백필 체크포인트: 완료된 (작업, 일자, 소스) 단위 (server/services/trading_data/checkpoint.py)
+export const backfillJobState = pgTable("backfill_job_state", {
+  job: text("job").notNull(),
+  unit_date: date("unit_date").notNull(),
+  source: text("source").notNull(),
+  status: text("status").notNull(), // done, empty
+  row_count: integer("row_count").notNull().default(0),
+  completed_at: timestamp("completed_at").notNull().defaultNow(),
+}, (table) => [
+  primaryKey({ columns: [table.job, table.unit_date, table.source] }),
+]);
+
+// 백필 기간 샤드 (여러 프로세스가 하나씩 가져가 처리)
+export const backfillShards = pgTable("backfill_shards", {
+  job: text("job").notNull(),
+  shard_id: integer("shard_id").notNull(),
+  start_date: date("start_date").notNull(),
+  end_date: date("end_date").notNull(),
+  status: text("status").notNull().default("pending"), // pending, running, done, failed
+  owner: text("owner"),
+  claimed_at: timestamp("claimed_at"),
+  heartbeat_at: timestamp("heartbeat_at"),
+  completed_at: timestamp("completed_at"),
+}, (table) => [
+  primaryKey({ columns: [table.job, table.shard_id] }),
+  uniqueIndex("backfill_shards_range_idx").on(table.job, table.start_date, table.end_date),
+]);
+
+// 대시보드 수집 현황 요약 (id = 1 한 행, 수집 작업이 끝날 때 갱신)
+export const collectionStatus = pgTable("collection_status", {
+  id: integer("id").primaryKey().default(1),
+  market_cap_date: date("market_cap_date"),
+  market_cap_count: integer("market_cap_count").notNull().default(0),
+  ohlcv_basis_date: date("ohlcv_basis_date"),
+  ohlcv_date: date("ohlcv_date"),
+  ohlcv_ticker_count: integer("ohlcv_ticker_count").notNull().default(0),
+  best_k_basis_date: date("best_k_basis_date"),
+  best_k_count: integer("best_k_count").notNull().default(0),
+  best_k_periods: jsonb("best_k_periods").notNull().default({}), // {period_type: count}
+  updated_at: timestamp("updated_at").notNull().defaultNow(),
+});
+
+// 변동성 돌파 파라미터 스윕 결과 (server/services/best-k-sweep.py)
+export const bestKSweep = pgTable("best_k_sweep", {
+  analysis_date: date("analysis_date").notNull(),
+  period_type: text("period_type").notNull(), // month_1, month_3, half_year, year_1
+  ticker: text("ticker").notNull(),
+  k: real("k").notNull(),
+  take_profit_mult: real("take_profit_mult").notNull(),
+  stop_loss_pct: real("stop_loss_pct").notNull(), // 0 = 손절 없음
+  volume_ratio: real("volume_ratio").notNull(), // 0 = 필터 없음
+  ma_window: integer("ma_window").notNull(), // 0 = 필터 없음
+  avg_return_pct: real("avg_return_pct").notNull(),
+  win_rate_pct: real("win_rate_pct").notNull(),
+  mdd_pct: real("mdd_pct").notNull(),
+  total_trades: integer("total_trades").notNull(),
+  sharpe_ratio: real("sharpe_ratio").notNull(),
+  compound_mdd_pct: real("compound_mdd_pct").notNull().default(0),
+  max_loss_streak: integer("max_loss_streak").notNull().default(0),
+  underwater_trades: integer("underwater_trades").notNull().default(0),
+}, (table) => [
+  primaryKey({ columns: [table.analysis_date, table.period_type, table.ticker, table.k,
+    table.take_profit_mult, table.stop_loss_pct, table.volume_ratio, table.ma_window] }),
+]);
+
+// Python 작업 실행 보고서 (server/services/trading_data/instrument.py)
+export const jobRunReport = pgTable("job_run_report", {
+  id: serial("id").primaryKey(),
+  job: text("job").notNull(), // collector, best-k-calculator
+  started_at: timestamp("started_at").notNull(),
+  finished_at: timestamp("finished_at").notNull(),
+  wall_seconds: doublePrecision("wall_seconds").notNull(),
+  cpu_seconds: doublePrecision("cpu_seconds").notNull(),
+  report: jsonb("report").notNull(), // 단계별 시간/히스토그램, 카운터, 종목별 시간
+}, (table) => [
+  index("job_run_report_job_started_idx").on(table.job, table.started_at),
+]);
+
 export const dataCollectionRequest = z.object({
   startDate: z.string().regex(/^\d{4}-\d{2}-\d{2}$/),
   endDate: z.string().regex(/^\d{4}-\d{2}-\d{2}$/),
@@ -141,5 +225,12 @@ export type StockData = typeof stockData.$inferSelect;
 export type InsertStockData = typeof stockData.$inferInsert;
 export type DailyStockData = typeof dailyStockData.$inferSelect;
 export type InsertDailyStockData = typeof dailyStockData.$inferInsert;
+export type StockMarket = (typeof stockMarket.enumValues)[number];
+export type StockRankType = (typeof stockRankType.enumValues)[number];
 export type DataCollectionLog = typeof dataCollectionLog.$inferSelect;
 export type InsertDataCollectionLog = typeof dataCollectionLog.$inferInsert;
+export type BackfillJobState = typeof backfillJobState.$inferSelect;
+export type BackfillShard = typeof backfillShards.$inferSelect;
+export type CollectionStatus = typeof collectionStatus.$inferSelect;
+export type BestKSweep = typeof bestKSweep.$inferSelect;
+export type JobRunReport = typeof jobRunReport.$inferSelect;